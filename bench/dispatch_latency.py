@@ -0,0 +1,89 @@
+"""
+Compare the per-request dispatch latency of the two WebApplication.DispatchMode's, without any HTTP in the way.
+
+Each sample times one trip through the same path the route handlers take: a trivial coroutine is handed to the
+main loop that owns all handlers and its result awaited.  Run as:
+
+.. code-block:: bash
+
+    % python bench/dispatch_latency.py --requests 2000 --concurrency 1 16 128
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+if True:
+    sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from asynciomultiplexer import asynciomultiplexer  # noqa: E402
+
+from bantam.http import WebApplication  # noqa: E402
+
+
+async def _handler():
+    return None
+
+
+async def _queued(main_thread) -> None:
+    resp_q = asynciomultiplexer.AsyncAdaptorQueue(1)
+    await main_thread.start(_handler(), resp_q)
+    await resp_q.get()
+
+
+async def _direct(main_thread) -> None:
+    await main_thread.dispatch(_handler())
+
+
+async def _measure(mode: WebApplication.DispatchMode, requests: int, concurrency: int):
+    main_thread = WebApplication.MainThread
+    main_task = asyncio.create_task(main_thread.main(None, mode))
+    call = _direct if mode == WebApplication.DispatchMode.DIRECT else _queued
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call(main_thread)
+            latencies.append(time.perf_counter() - start)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    main_task.cancel()
+    latencies.sort()
+    return {
+        'mode': mode.value,
+        'concurrency': concurrency,
+        'requests': requests,
+        'throughput_rps': requests / wall,
+        'cpu_seconds': cpu,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 128])
+    args = parser.parse_args()
+    results = []
+    for concurrency in args.concurrency:
+        for mode in (WebApplication.DispatchMode.QUEUED, WebApplication.DispatchMode.DIRECT):
+            result = asyncio.run(_measure(mode, args.requests, concurrency))
+            results.append(result)
+            print(f"{result['mode']:>7} c={concurrency:<4} p50={result['p50_ms']:9.3f}ms "
+                  f"p99={result['p99_ms']:9.3f}ms {result['throughput_rps']:12.1f} req/s", file=sys.stderr)
+    json.dump(results, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
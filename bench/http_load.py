@@ -0,0 +1,213 @@
+"""
+End-to-end HTTP load benchmark over the example web api's used by the test suite.
+
+A *WebApplication* serving the *class_rest_get*, *class_rest_post* and *class_js_test* example modules is started in a
+subprocess, and a closed-loop load generator then drives each scenario (GET and POST calls to class methods,
+constructors, instance methods and a streamed response) at each requested concurrency level.  Throughput and
+p50/p99/p999 latencies are written as JSON so that runs can be compared over time.  Run as:
+
+.. code-block:: bash
+
+    % python bench/http_load.py --requests 2000 --concurrency 1 16 64 --output bench-results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+ROOT = Path(__file__).parent.parent
+MODULES = ['class_rest_get', 'class_rest_post', 'class_js_test']
+BASIC_PARAMS = {'param1': 42, 'param2': True, 'param3': 992.123}
+BASIC_QUERY = {'param1': '42', 'param2': 'true', 'param3': '992.123'}
+STREAM_COUNT = 100
+
+Request = Callable[[aiohttp.ClientSession], Awaitable[None]]
+
+
+def serve(port: int, workers: int) -> None:
+    sys.path.insert(0, str(ROOT / 'src'))
+    sys.path.insert(0, str(ROOT / 'test' / 'example'))
+    from bantam.http import WebApplication
+    app = WebApplication()
+    asyncio.run(app.start(host='127.0.0.1', port=port, modules=MODULES, workers=workers))
+
+
+async def _check(resp: aiohttp.ClientResponse) -> bytes:
+    body = await resp.read()
+    if resp.status != 200:
+        raise RuntimeError(f"{resp.method} {resp.url.path} returned {resp.status}")
+    return body
+
+
+async def _scenarios(session: aiohttp.ClientSession, base_url: str) -> Dict[str, Request]:
+    async with session.get(f'{base_url}/RestAPIExampleAsync/explicit_constructor', params={'val': '42'}) as resp:
+        get_instance = json.loads(await _check(resp))['uuid']
+    async with session.post(f'{base_url}/RestAPIExampleAsyncPost/explicit_constructor', json={'val': 42}) as resp:
+        post_instance = json.loads(await _check(resp))['uuid']
+
+    def get(path: str, params: Dict[str, str]) -> Request:
+        async def request(session_: aiohttp.ClientSession) -> None:
+            async with session_.get(base_url + path, params=params) as resp_:
+                await _check(resp_)
+        return request
+
+    def post(path: str, body: Dict[str, Any]) -> Request:
+        async def request(session_: aiohttp.ClientSession) -> None:
+            async with session_.post(base_url + path, json=body) as resp_:
+                await _check(resp_)
+        return request
+
+    return {
+        'get_class_method': get('/RestAPIExampleAsync/api_get_basic', BASIC_QUERY),
+        'post_class_method': post('/RestAPIExampleAsyncPost/api_post_basic', BASIC_PARAMS),
+        'get_constructor': get('/RestAPIExampleAsync/explicit_constructor', {'val': '42'}),
+        'post_constructor': post('/RestAPIExampleAsyncPost/explicit_constructor', {'val': 42}),
+        'get_instance_method': get('/RestAPIExampleAsync/my_value', {'self': get_instance}),
+        'post_instance_method': post('/RestAPIExampleAsyncPost/my_value', {'self': post_instance}),
+        'post_instance_stream': post('/RestAPIExampleAsyncPost/my_value_repeated',
+                                     {'self': post_instance, 'count': STREAM_COUNT}),
+        'get_static_method': get('/RestAPIExample/api_get_basic', BASIC_QUERY),
+        'post_static_method': post('/RestAPIExample/api_post_basic', BASIC_PARAMS),
+    }
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+async def _measure(name: str, request: Request, base_url: str, requests: int, concurrency: int,
+                   warmup: int) -> Dict[str, Any]:
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for _ in range(warmup):
+            await request(session)
+        latencies: List[float] = []
+        errors = 0
+        remaining = requests
+
+        async def client():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    await request(session)
+                except Exception:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(concurrency)])
+        wall = time.perf_counter() - wall_start
+    latencies.sort()
+    result: Dict[str, Any] = {
+        'scenario': name,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': errors,
+        'throughput_rps': len(latencies) / wall,
+    }
+    if latencies:
+        result.update({
+            'mean_ms': statistics.mean(latencies) * 1000,
+            'p50_ms': _percentile(latencies, 0.50) * 1000,
+            'p99_ms': _percentile(latencies, 0.99) * 1000,
+            'p999_ms': _percentile(latencies, 0.999) * 1000,
+        })
+    return result
+
+
+async def _wait_for_server(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server did not start listening on port {port} within {timeout} seconds")
+            await asyncio.sleep(0.1)
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    base_url = f'http://127.0.0.1:{args.port}'
+    await _wait_for_server(args.port, timeout=30)
+    async with aiohttp.ClientSession() as session:
+        scenarios = await _scenarios(session, base_url)
+    results = []
+    for name, request in scenarios.items():
+        if args.scenarios and name not in args.scenarios:
+            continue
+        for concurrency in args.concurrency:
+            result = await _measure(name, request, base_url, args.requests, concurrency, args.warmup)
+            results.append(result)
+            print(f"{name:>22} c={concurrency:<4} {result['throughput_rps']:10.1f} req/s "
+                  f"p50={result.get('p50_ms', math.nan):8.3f}ms p99={result.get('p99_ms', math.nan):8.3f}ms "
+                  f"p999={result.get('p999_ms', math.nan):8.3f}ms errors={result['errors']}", file=sys.stderr)
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help="requests per scenario and concurrency level")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--warmup', type=int, default=50, help="unmeasured requests before each measurement")
+    parser.add_argument('--scenarios', nargs='*', help="names of scenarios to run (default: all)")
+    parser.add_argument('--workers', type=int, default=1, help="number of server worker processes")
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--output', type=Path, default=Path('bench-results.json'))
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.port, args.workers)
+        return
+    args.port = args.port or _free_port()
+    server = subprocess.Popen([sys.executable, __file__, '--serve', '--port', str(args.port),
+                               '--workers', str(args.workers)])
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'workers': args.workers,
+        'requests': args.requests,
+        'stream_count': STREAM_COUNT,
+        'results': results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,11 @@ setuptools.setup(
         line for line in open(os.path.join(os.path.dirname(__file__), 'requirements.txt')).read().splitlines() if
          not 'pytest' in line
     ],
+    extras_require={
+        # faster json engines (see bantam.json_backends)
+        'orjson': ['orjson>=3.6'],
+        'msgspec': ['msgspec>=0.18'],
+    },
     long_description="""
 Bantam is a Python package for building http-based micro-services.
 It abstracts away any knowledge of routes, mappings and translations
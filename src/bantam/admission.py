@@ -0,0 +1,121 @@
+"""
+Admission control for incoming requests.
+
+A `ConcurrencyLimiter` caps how many requests are serviced at once, either across a whole *WebApplication*
+(its *max_concurrency* parameter) or for a single route (the *max_concurrency* parameter of *@web_api*).  Requests
+beyond the cap wait their turn, first-come-first-served, for a bounded time; those that cannot be admitted in that time
+are rejected so that the server responds with a quick 503 rather than building up unbounded latency.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted within the allotted wait
+
+    :param retry_after: suggested number of seconds before the client retries
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server busy; retry after {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Limits the number of requests serviced concurrently, with a bounded first-come-first-served wait for the rest
+
+    :param limit: maximum number of requests serviced at once
+    :param max_queued: if provided, maximum number of requests waiting for admission, beyond which requests are
+       rejected immediately
+    :param retry_after: seconds suggested to rejected clients before retrying
+    """
+
+    def __init__(self, limit: int, max_queued: Optional[int] = None, retry_after: int = 1):
+        if limit < 1:
+            raise ValueError("Concurrency limit must be a positive number")
+        self._limit = limit
+        self._max_queued = max_queued
+        self._retry_after = retry_after
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0  # cumulative seconds admitted requests spent waiting
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        """
+        :return: number of requests currently admitted
+        """
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """
+        :return: number of requests currently waiting for admission
+        """
+        return len(self._waiters)
+
+    async def acquire(self, timeout: Optional[float]) -> float:
+        """
+        Wait for admission; each successful call must be paired with a call to `release`
+
+        :param timeout: maximum seconds to wait, or None to wait indefinitely
+        :return: seconds spent waiting
+        :raises AdmissionRejected: if not admitted within the timeout (or too many requests are already waiting)
+        """
+        if self._in_flight < self._limit and not self._waiters:
+            self._in_flight += 1
+            self.admitted += 1
+            return 0.0
+        if (self._max_queued is not None and len(self._waiters) >= self._max_queued) or \
+                (timeout is not None and timeout <= 0):
+            self.rejected += 1
+            raise AdmissionRejected(self._retry_after)
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # admission was handed over just as the wait timed out
+            else:
+                self._discard(waiter)
+            self.rejected += 1
+            raise AdmissionRejected(self._retry_after)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # admission was handed over, but the caller is gone
+            else:
+                self._discard(waiter)
+            raise
+        wait = time.monotonic() - start
+        self.admitted += 1
+        self.total_wait += wait
+        return wait
+
+    def release(self) -> None:
+        """
+        Release an admission, handing it directly to the longest-waiting request if any
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
@@ -1,19 +1,186 @@
+import codecs
 import inspect
+import pickle
+import traceback
+import types
 import typing
 from enum import Enum
-from typing import Callable, Awaitable, AsyncGenerator, Dict, List, Optional, Type, TypeVar
+from functools import partial
+from typing import (
+    Any, Callable, Awaitable, AsyncGenerator, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Tuple, Type,
+    TypeVar,
+)
 
 from aiohttp import ClientTimeout
 
+from .admission import ConcurrencyLimiter
+from .compression import DEFAULT_MIN_SIZE as DEFAULT_COMPRESS_MIN_SIZE
+from .conversions import is_opaque, json_decoder, str_decoder, to_json, to_str
+
 AsyncChunkIterator = Callable[[int], Awaitable[AsyncGenerator[None, bytes]]]
 AsyncLineIterator = AsyncGenerator[None, str]
 
 
+OCTET_STREAM = 'application/octet-stream'
+MSGPACK = 'application/msgpack'
+
+
 class RestMethod(Enum):
     GET = 'GET'
     POST = 'POST'
 
 
+def _convert_request_param(value: str, typ: Type, decode: Optional[Callable[[str], Any]] = None) -> Any:
+    """
+    Convert rest request string value for parameter to given Python type, returning an instance of that type
+
+    :param value: value to convert
+    :param typ: Python Type to convert to
+    :param decode: decoder compiled for typ, if already looked up
+    :return: converted instance, of the given type
+    :raises: TypeError if value can not be converted/deserialized
+    """
+    try:
+        return (decode or str_decoder(typ))(value)
+    except Exception as e:
+        text = traceback.format_exc()
+        raise TypeError(f"Converting web request string {value} of {type(value)} to Python type {typ}: {e}\n {text}")
+
+
+def _serialize_return_value(value: Any, encoding: str) -> bytes:
+    """
+    Serialize a Python value into bytes to return through a Rest API.  If a basic type such as str, int or float, a
+    simple str conversion is done, then converted to bytes.  If more complex, the conversion will invoke the
+    '__str__' method of the value, raising TypeError if such a method does not exist or does not have a bare
+    (no-parameter) signature.
+
+    :param value: value to convert
+    :return: bytes serialized from value
+    """
+    try:
+        if value is None:
+            return bytes()
+        if type(value) is bytes:
+            return value
+        if type(value) in (dict, list, tuple) and encoding == 'utf-8':
+            return to_json(value)
+        return to_str(value).encode(encoding)
+    except Exception as e:
+        raise TypeError(f"Converting response '{value}' from Python type '{type(value)}' to string: {e}")
+
+
+def _serialize_opaque_value(value: Any) -> bytes:
+    """
+    Serialize a Python value of a type with no other representation into (pickled) bytes, to return as a
+    raw application/octet-stream body
+    """
+    return pickle.dumps(value) if value is not None else bytes()
+
+
+class HandlerTimeouts(NamedTuple):
+    """
+    Server-enforced limits, in seconds, on servicing a request (None for no limit)
+    """
+    deadline: Optional[float] = None  # for the handler to return, when the response is not streamed
+    first_item: Optional[float] = None  # for a streamed response to produce its first item
+    idle: Optional[float] = None  # between subsequent items of a streamed response
+
+
+class StreamBuffering(NamedTuple):
+    """
+    Limits on coalescing the items of a streamed response into fewer, larger writes
+    """
+    max_size: int = 64 * 1024  # bytes held before writing them out
+    max_delay: float = 0.01  # seconds an item is held before writing it out
+
+
+class ClientCaching(NamedTuple):
+    """
+    Limits on caching the responses to calls of a (GET) web api in its clients
+    """
+    ttl: float = 60.0  # seconds a response is used before checking back with the server
+    max_size: int = 256  # responses (to distinct arguments) kept, least recently used evicted first
+
+
+class InvocationPlan(NamedTuple):
+    """
+    Immutable plan for invoking an API, compiled once at registration so that servicing a request involves no
+    reflection on the underlying function
+    """
+    encoding: str
+    allowed_params: FrozenSet[str]
+    query_decoders: Mapping[str, Callable[[str], Any]]
+    json_decoders: Mapping[str, Callable[[Any], Any]]
+    streamed_param: Optional[str]
+    vararg: Optional[str]
+    varkw: Optional[str]
+    serialize: Callable[[Any], bytes]  # for items of a streamed response
+    serialize_response: Callable[[Any], bytes]  # for a whole (non-streamed) response
+    response_content_type: Optional[str]  # overriding the declared one, if provided
+    decode_return: Callable[[str], Any]
+    decode_return_data: Callable[[Any], Any]  # from json or MessagePack decoded data
+
+    @classmethod
+    def compile(cls, func: Callable, content_type: str, arg_annotations: Dict[str, Type],
+                async_arg_annotations: Dict[str, Type], return_type: Type) -> 'InvocationPlan':
+        encoding = 'utf-8'
+        for item in content_type.split(';'):
+            item = item.strip().lower()
+            if item.startswith('charset='):
+                encoding = item.replace('charset=', '')
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            # e.g., x-user-defined used for streamed responses is not a Python codec
+            encoding = 'utf-8'
+        vararg = varkw = None
+        # noinspection PyBroadException
+        try:
+            for name, param in inspect.signature(func).parameters.items():
+                if param.kind == inspect.Parameter.VAR_POSITIONAL:
+                    vararg = name
+                elif param.kind == inspect.Parameter.VAR_KEYWORD:
+                    varkw = name
+        except Exception:
+            pass
+        opaque_return = is_opaque(return_type)
+        return InvocationPlan(
+            encoding=encoding,
+            allowed_params=frozenset(arg_annotations) | {'self'},
+            query_decoders=types.MappingProxyType({
+                name: partial(_convert_request_param, typ=typ, decode=str_decoder(typ))
+                for name, typ in arg_annotations.items()
+                if name not in async_arg_annotations
+            }),
+            json_decoders=types.MappingProxyType({
+                name: json_decoder(typ) for name, typ in arg_annotations.items()
+            }),
+            streamed_param=next(iter(async_arg_annotations), None),
+            vararg=vararg,
+            varkw=varkw,
+            serialize=partial(_serialize_return_value, encoding=encoding),
+            serialize_response=_serialize_opaque_value if opaque_return else
+            partial(_serialize_return_value, encoding=encoding),
+            response_content_type=OCTET_STREAM if opaque_return else None,
+            decode_return=str_decoder(return_type),
+            decode_return_data=json_decoder(return_type),
+        )
+
+    def bind(self, kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Tuple[Any, ...]]:
+        """
+        transforms kwargs for the call as needed for any varargs or varkwargs in the call
+
+        :param kwargs: keyword arguments, keyed by parameter name, including any vararg/varkw parameter by name
+        :return: keyword arguments and positional (var)args to make the call with
+        """
+        varargs = tuple()
+        if self.varkw is not None and self.varkw in kwargs:
+            kwargs.update(kwargs.pop(self.varkw))
+        if self.vararg is not None and self.vararg in kwargs:
+            varargs = kwargs.pop(self.vararg)
+        return kwargs, varargs
+
+
 class API:
 
     def __init__(self, clazz, func, method: RestMethod, content_type: str, is_instance_method: bool,
@@ -21,7 +188,17 @@ class API:
                  is_constructor: bool,
                  on_disconnect: Optional[Callable[[], None]] = None,
                  timeout: Optional[ClientTimeout] = None,
-                 expire_on_exit: bool = False, uuid_param: Optional[str] = None):
+                 expire_on_exit: bool = False, uuid_param: Optional[str] = None,
+                 max_concurrency: Optional[int] = None,
+                 deadline: Optional[float] = None,
+                 first_item_timeout: Optional[float] = None,
+                 idle_timeout: Optional[float] = None,
+                 stream_buffer_size: Optional[int] = None,
+                 stream_flush_delay: Optional[float] = None,
+                 compress: Optional[bool] = None,
+                 compress_min_size: Optional[int] = None,
+                 cache_ttl: Optional[float] = None,
+                 cache_size: Optional[int] = None):
         annotations = func.__annotations__
         self._clazz = clazz
         self._on_disconnect = on_disconnect
@@ -33,6 +210,16 @@ class API:
         self._real_func = func
         self._method = method
         self._timeout = timeout or ClientTimeout()
+        self._limiter = ConcurrencyLimiter(max_concurrency) if max_concurrency is not None else None
+        self._handler_timeouts = HandlerTimeouts(deadline, first_item_timeout, idle_timeout)
+        self._stream_buffering: Optional[StreamBuffering] = None
+        if stream_buffer_size is not None or stream_flush_delay is not None:
+            self._stream_buffering = StreamBuffering(
+                *(default if limit is None else limit
+                  for limit, default in zip((stream_buffer_size, stream_flush_delay), StreamBuffering()))
+            )
+        self._compress = True if compress is None and compress_min_size is not None else compress
+        self._compress_min_size = compress_min_size
         self._vararg = None
         self._varkwds = None
         if 'return' not in annotations:
@@ -66,6 +253,59 @@ class API:
         if is_constructor:
             self._return_type = str
         self._uuid_param = uuid_param
+        self._client_caching: Optional[ClientCaching] = None
+        if cache_ttl is not None or cache_size is not None:
+            if method != RestMethod.GET or is_instance_method or is_constructor or self._has_streamed_response:
+                raise ValueError(f"Responses of {func.__qualname__} cannot be cached: only those of GET class or "
+                                 "static methods not streaming their response can be")
+            self._client_caching = ClientCaching(
+                *(default if limit is None else limit for limit, default in zip((cache_ttl, cache_size),
+                                                                                 ClientCaching()))
+            )
+        self._plan = InvocationPlan.compile(func, content_type, self._arg_annotations, self._async_arg_annotations,
+                                            self._return_type)
+
+    @property
+    def plan(self) -> InvocationPlan:
+        return self._plan
+
+    @property
+    def limiter(self) -> Optional[ConcurrencyLimiter]:
+        return self._limiter
+
+    def handler_timeouts(self, default: Optional[float] = None) -> HandlerTimeouts:
+        """
+        :param default: limit applied to any of the timeouts not specified for this api
+        :return: server-side limits on servicing a request to this api
+        """
+        if default is None:
+            return self._handler_timeouts
+        return HandlerTimeouts(*(default if limit is None else limit for limit in self._handler_timeouts))
+
+    @property
+    def stream_buffering(self) -> Optional[StreamBuffering]:
+        """
+        :return: limits on coalescing items of a streamed response, or None to write each item as it is produced
+        """
+        return self._stream_buffering
+
+    @property
+    def client_caching(self) -> Optional[ClientCaching]:
+        """
+        :return: limits on caching responses to this api in clients, or None to not cache them
+        """
+        return self._client_caching
+
+    def compress_min_size(self, default: Optional[int] = None) -> Optional[int]:
+        """
+        :param default: minimum size of responses compressed by the application, or None if it does not compress them
+        :return: minimum size in bytes of (non-streamed) responses to this api to compress, or None to not compress
+        """
+        if self._compress is False or (self._compress is None and default is None):
+            return None
+        if self._compress_min_size is not None:
+            return self._compress_min_size
+        return default if default is not None else DEFAULT_COMPRESS_MIN_SIZE
 
     @property
     def clazz(self):
@@ -158,19 +398,7 @@ class API:
         """
         takes list of kwargs for the call and transforms as needed for any varargs  or varkwargs in call
         """
-        sig = inspect.signature(self._func)
-        updated = kwargs
-        varargs = tuple()
-        for name, param in sig.parameters.items():
-            if name not in kwargs:
-                continue
-            if param.kind == inspect.Parameter.VAR_KEYWORD:
-                del updated[name]
-                updated.update(**kwargs[name])
-            elif param.kind == inspect.Parameter.VAR_POSITIONAL:
-                varargs = kwargs[name]
-                del updated[name]
-        return updated, varargs
+        return self._plan.bind(kwargs)
 
 
 class APIDoc:
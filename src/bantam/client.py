@@ -96,19 +96,27 @@ an "Interface" suffix, you will have to specify *impl_name=<name-of-concrete-cla
 method above.  The *end_point* parameter specifies the base url to the server that serves up MyServceApi class.
 
 """
+import asyncio
 import inspect
-import json
 import sys
+import time
 from abc import ABC
+from collections import OrderedDict
+from contextvars import ContextVar, Token
 from functools import wraps
-from typing import Any, Dict, TypeVar, Optional, Type, Generic, Mapping, Iterator
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, TypeVar, List, Optional, Tuple, Type, Generic, Mapping, Iterator,
+    NamedTuple, Set, Union,
+)
 
 import aiohttp
 
-from bantam import conversions
-from bantam.api import API, RestMethod
+from bantam import conversions, json_backends
+from bantam.api import API, ClientCaching, MSGPACK, OCTET_STREAM, RestMethod
+from bantam.framing import FRAMED, FrameDecoder, SeparatedDecoder
+from bantam.json_backends import JsonBackend
 
-__all__ = ["WebInterface"]
+__all__ = ["WebInterface", "PoolOptions", "ClientBatch"]
 
 C = TypeVar('C', bound="WebInterface")
 
@@ -124,81 +132,406 @@ class InvocationError(Exception):
         return self.message
 
 
+class PoolOptions(NamedTuple):
+    """
+    Settings of the pool of connections a client keeps to an end point
+    """
+    limit: int = 100  # maximum connections open at once (0 for no limit)
+    limit_per_host: int = 0  # maximum connections open at once to any one host (0 for no limit)
+    keepalive_timeout: float = 15.0  # seconds an idle connection is kept open for reuse
+    dns_cache_ttl: Optional[int] = 10  # seconds host name resolutions are cached (None to cache them indefinitely)
+
+
+class _SessionPool:
+    """
+    Long-lived http session, and so pool of kept-alive connections, shared by all calls to an end point; created on
+    first use, and again if closed or if used from another event loop than the one it was created in
+    """
+
+    def __init__(self, headers: Optional[dict], options: PoolOptions):
+        self._headers = headers
+        self._options = options
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None:
+                self._release(self._session, self._loop)
+            connector = aiohttp.TCPConnector(limit=self._options.limit,
+                                             limit_per_host=self._options.limit_per_host,
+                                             keepalive_timeout=self._options.keepalive_timeout,
+                                             ttl_dns_cache=self._options.dns_cache_ttl)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self._headers)
+            self._loop = loop
+        return self._session
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    async def close(self) -> None:
+        session, self._session = self._session, None
+        if session is None or session.closed:
+            return
+        if self._loop is asyncio.get_running_loop():
+            await session.close()
+        else:
+            self._release(session, self._loop)
+
+    @staticmethod
+    def _release(session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """
+        Release a session from outside the loop it was created in, as only that loop can close its connections: the
+        loop is handed the closing if not closed itself (done once the loop runs), else the connections went with it
+        """
+        if session.closed:
+            return
+        if loop is not None and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            session.detach()
+
+
+class ClientCallPlan(NamedTuple):
+    """
+    Plan for calling a web api through a client, compiled once as the client class is created so that a call involves
+    no reflection on the api's signature
+    """
+    route: str  # of the api on the server
+    url: str  # of the api, sans query
+    is_get: bool
+    positional: Tuple[str, ...]  # names of the parameters positional arguments bind to, in order
+    vararg: Optional[str]  # name of the parameter taking all positional arguments, if the api takes *args
+    encoders: Mapping[str, Callable[[Any], Optional[str]]]  # string images of arguments, by parameter name
+
+    @staticmethod
+    def compile(api: API, end_point: str, route: str) -> 'ClientCallPlan':
+        # noinspection PyBroadException
+        try:
+            arg_spec = inspect.getfullargspec(api._func)
+        except Exception:
+            arg_spec = inspect.getfullargspec(api._func.__func__)
+        return ClientCallPlan(
+            route=route,
+            url=end_point + route,
+            is_get=api.method.value == RestMethod.GET.value,
+            positional=tuple(arg_spec.args[1:]),  # past cls or self
+            vararg=arg_spec.varargs,
+            encoders={name: conversions.str_encoder(typ) for name, typ in api.arg_annotations.items()},
+        )
+
+    def bind(self, name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :return: kwargs, updated with the given positional arguments under the names of their parameters
+        """
+        if self.vararg is not None:
+            kwargs[self.vararg] = args
+        elif len(args) > len(self.positional):
+            raise TypeError(f"Too many arguments supplied in call to {name}")
+        elif args:
+            kwargs.update(zip(self.positional, args))
+        return kwargs
+
+    def image(self, name: str, value: Any) -> Optional[str]:
+        encode = self.encoders.get(name)
+        return encode(value) if encode is not None else conversions.to_str(value)
+
+    def query(self, kwargs: Dict[str, Any], self_id: Optional[str] = None) -> str:
+        """
+        :return: url of a GET request with the given arguments
+        """
+        if self_id is None and not kwargs:
+            return self.url
+        return self.url + (f'?self={self_id}&' if self_id is not None else '?') + \
+            '&'.join([f"{k}={self.image(k, v)}" for k, v in kwargs.items() if v is not None])
+
+
+class _CacheEntry(NamedTuple):
+    expires: float  # monotonic time after which the response is revalidated
+    etag: Optional[str]  # entity tag the server gave the response, if any
+    value: Any  # decoded response
+
+
+_NOT_MODIFIED = object()  # outcome of revalidating a cached response the server reports as unchanged
+
+
+class _ResponseCache:
+    """
+    Cache of the responses to calls of one web api at one end point, keyed on the url called (so on the arguments of
+    the call).  Concurrent calls missing the cache share a single request, and expired responses that the server tagged
+    are revalidated with it rather than fetched anew.  Cached values are shared among callers, so are not to be
+    mutated.
+    """
+
+    def __init__(self, caching: ClientCaching):
+        self._caching = caching
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    async def get(self, key: str, load: Callable[[Optional[str]], Awaitable[Tuple[Optional[str], Any]]]) -> Any:
+        """
+        :param key: key of the response
+        :param load: called (if the response is not cached, or has expired) with the entity tag of any expired response
+           to request the response, returning its entity tag and value, or _NOT_MODIFIED if the expired one is current
+        :return: value of the response
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry.value
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(key, entry, load))
+            self._loading[key] = loading
+        # shielded so that cancelling one call does not fail the others sharing the request
+        return await asyncio.shield(loading)
+
+    async def _load(self, key: str, entry: Optional[_CacheEntry],
+                    load: Callable[[Optional[str]], Awaitable[Tuple[Optional[str], Any]]]) -> Any:
+        try:
+            etag, value = await load(entry.etag if entry is not None else None)
+            if value is _NOT_MODIFIED:
+                value = entry.value
+            self._entries[key] = _CacheEntry(time.monotonic() + self._caching.ttl, etag, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._caching.max_size:
+                self._entries.popitem(last=False)
+            return value
+        finally:
+            del self._loading[key]
+
+
+class ClientBatch:
+    """
+    Context within which calls through a client to an end point are collected and sent together, in one request to the
+    server's batch route (see the *batch_route* parameter of *WebApplication*), rather than each in a request of its
+    own.  Calls made concurrently (e.g. through *asyncio.gather*) are sent in one batch once all have been made, and
+    each completes as soon as the server reports its outcome.  Calls of constructors and of api's streaming their
+    response are made on their own as usual.
+
+    >>> async with client_mapping.batch('https://blahblahblah') :
+    ...     results = await asyncio.gather(*[Client.class_method_api(str(n)) for n in range(200)])
+    """
+
+    def __init__(self, pool: '_SessionPool', url: str, max_size: int):
+        self._pool = pool
+        self._url = url
+        self._max_size = max_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._scheduled: Optional[asyncio.Handle] = None
+        self._sending: Set[asyncio.Task] = set()
+        self._token: Optional[Token] = None
+
+    @property
+    def pool(self) -> '_SessionPool':
+        return self._pool
+
+    async def __aenter__(self) -> 'ClientBatch':
+        self._token = _current_batch.set(self)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        _current_batch.reset(self._token)
+        await self.flush()
+
+    async def call(self, api: API, route: str, params: Dict[str, Any]) -> Any:
+        """
+        :return: result of a call of the api at the given route, made as part of this batch
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(({'route': route, 'params': params}, future))
+        if len(self._pending) >= self._max_size:
+            self._send_pending()
+        elif self._scheduled is None:
+            # once all calls made concurrently with this one have been made
+            self._scheduled = asyncio.get_running_loop().call_soon(self._send_pending)
+        outcome = await future
+        if outcome['status'] != 200:
+            raise InvocationError(f"{outcome.get('error')}\n\nRequest to {api.name} failed: {outcome['status']}")
+        result = outcome.get('result')
+        return api.plan.decode_return(result) if result is not None else None
+
+    async def flush(self) -> None:
+        """
+        Send the calls made so far and wait for their outcomes
+        """
+        self._send_pending()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def _send_pending(self) -> None:
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        calls, self._pending = self._pending, []
+        if calls:
+            task = asyncio.create_task(self._send(calls))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, calls: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        futures = [future for _, future in calls]
+        try:
+            payload = conversions.to_json({'calls': [call for call, _ in calls], 'stream': True})
+            session = self._pool.session()
+            async with session.post(self._url, data=payload,
+                                    headers={'Content-Type': 'application/json', 'Accept': FRAMED}) as resp:
+                if not resp.ok:
+                    raise InvocationError(f"{(await resp.content.read()).decode('utf-8', errors='replace')}\n\n"
+                                          f"Batch request failed: {resp.status}")
+                frames = FrameDecoder()
+                backend = json_backends.get_backend()
+                async for data, _ in resp.content.iter_chunks():
+                    for image in frames.feed(data):
+                        outcome = backend.loads(image)
+                        future = futures[outcome['index']]
+                        if not future.done():
+                            future.set_result(outcome)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        for future in futures:
+            if not future.done():
+                future.set_exception(InvocationError("No outcome reported for call made in batch"))
+
+
+# batch in which calls through clients are currently collected, if any
+_current_batch: ContextVar[Optional[ClientBatch]] = ContextVar('bantam_client_batch', default=None)
+
+
 # noinspection PyProtectedMember
 class WebInterface(ABC):
 
     _clients: Dict[str, Any] = {}
-
-    @classmethod
-    def _generate_url_args(cls, kwargs, self_id: Optional[str] = None):
-        if self_id is None and not kwargs:
-            return ''
-        return (f'?self={self_id}&' if self_id is not None else '?') + \
-            '&'.join([f"{k}={conversions.to_str(v)}" for k, v in kwargs.items() if v is not None])
+    _pools: Dict[str, _SessionPool] = {}
+
+    @staticmethod
+    def _decode_response(api: API, resp: aiohttp.ClientResponse, raw: bytes) -> Any:
+        if api.return_type == bytes:
+            return raw
+        if resp.content_type == OCTET_STREAM:
+            # value of a type with no other representation than pickled, sent as is
+            return conversions.unpickle(raw) if raw else None
+        if resp.content_type == MSGPACK:
+            return api.plan.decode_return_data(conversions.from_msgpack(raw))
+        return api.plan.decode_return(raw.decode('utf-8'))
+
+    @staticmethod
+    def _wire_headers(use_msgpack: bool, streamed: bool = False
+                      ) -> Tuple[Optional[Dict[str, str]], Optional[Dict[str, str]]]:
+        """
+        :return: additional headers for GET and POST requests
+        """
+        # streamed items are asked for length-prefixed, so that they need not be scanned for separators
+        accept = ', '.join(([MSGPACK] if use_msgpack else []) + ([FRAMED] if streamed else []))
+        if not accept:
+            return None, None
+        if not use_msgpack:
+            return {'Accept': accept}, {'Accept': accept}
+        return {'Accept': accept}, {'Accept': accept, 'Content-Type': MSGPACK}
+
+    @staticmethod
+    def _encode_payload(values: Dict[str, Any], json_backend: Optional[JsonBackend], use_msgpack: bool) -> bytes:
+        return conversions.to_msgpack(values) if use_msgpack else conversions.to_json(values, json_backend)
+
+    @staticmethod
+    async def _iterate_streamed_items(api: API, resp: aiohttp.ClientResponse) -> AsyncIterator[Any]:
+        if resp.content_type == MSGPACK:
+            unpacker = conversions.msgpack_unpacker()
+            async for data, _ in resp.content.iter_chunks():
+                unpacker.feed(data)
+                for item in unpacker:
+                    yield api.plan.decode_return_data(item)
+            return
+        binary = api.return_type == bytes
+        if resp.content_type != FRAMED and binary:
+            # bytes items are sent unterminated when not framed, so cannot be told apart: deliver them as received
+            async for data, _ in resp.content.iter_chunks():
+                if data:
+                    yield data
+            return
+        decoder = FrameDecoder() if resp.content_type == FRAMED else SeparatedDecoder()
+        decode_return = api.plan.decode_return
+        async for data, _ in resp.content.iter_chunks():
+            for item in decoder.feed(data):
+                yield item if binary else decode_return(item.decode('utf-8'))
 
     @classmethod
     def _add_class_method(cls, clazz: Type, impl_name: str, end_point: str, method,
-                          common_headers: dict):
+                          pool: '_SessionPool', json_backend: Optional[JsonBackend] = None,
+                          use_msgpack: bool = False):
         # class/static methods
         # noinspection PyProtectedMember
         # noinspection PyProtectedMember
         name = method.__name__
         api: API = method._bantam_web_api
-        base_url = f"{end_point}/{impl_name}/{name}"
+        plan = ClientCallPlan.compile(api, end_point, f"/{impl_name}/{name}")
+        base_url = plan.url
+        get_headers, post_headers = cls._wire_headers(use_msgpack)
+        cache = _ResponseCache(api.client_caching) if api.client_caching is not None else None
+
+        async def fetch(url: str, etag: Optional[str]) -> Tuple[Optional[str], Any]:
+            headers = get_headers if etag is None else {**(get_headers or {}), 'If-None-Match': etag}
+            session = pool.session()
+            async with session.get(url, headers=headers, timeout=api.timeout) as resp:
+                if resp.status == 304:
+                    return etag, _NOT_MODIFIED
+                raw = await resp.content.read()
+                if not resp.ok:
+                    data = raw.decode('utf-8', errors='replace')
+                    sys.stderr.write(data + '\n')
+                    raise InvocationError(f"{data}\n\nRequest to {api.name} failed: {resp.reason}")
+                return resp.headers.get('ETag'), cls._decode_response(api, resp, raw)
 
         # noinspection PyDecorator,PyShadowingNames
         @classmethod
         @wraps(method)
         async def class_method(cls_, *args, **kwargs_):
-            nonlocal api, end_point
-            # noinspection PyBroadException
-            try:
-                arg_spec = inspect.getfullargspec(api._func)
-            except Exception:
-                arg_spec = inspect.getfullargspec(api._func.__func__)
-            if len(arg_spec) - 1 < len(args):
-                raise TypeError(f"Too many arguments supplied in call to {api.name}")
-            if arg_spec.varargs is None:
-                kwargs_.update({
-                    arg_spec.args[n + 1]: arg for n, arg in enumerate(args)
-                })
-            else:
-                kwargs_[arg_spec.varargs] = args
-            # noinspection PyBroadException
-            rest_method = api._func._bantam_web_api.method
+            plan.bind(api.name, args, kwargs_)
+            if cache is not None:
+                url = plan.query(kwargs_)
+                return await cache.get(url, lambda etag: fetch(url, etag))
+            batch = _current_batch.get()
+            if batch is not None and batch.pool is pool and not api.is_constructor:
+                return await batch.call(api, plan.route, kwargs_)
             data = None
             resp = None
             try:
-                async with aiohttp.ClientSession(timeout=api.timeout, headers=common_headers) as session:
-                    if rest_method.value == RestMethod.GET.value:
-                        url_args = cls._generate_url_args(kwargs=kwargs_)
-                        url = f"{base_url}{url_args}"
-                        async with session.get(url) as resp:
-                            data = (await resp.content.read()).decode('utf-8')
-                            if not resp.ok:
-                                sys.stderr.write(data + '\n')
-                            resp.raise_for_status()
-                            if api.is_constructor:
-                                if hasattr(clazz, 'jsonrepr'):
-                                    repr_ = clazz.jsonrepr(data)
-                                    self_id = repr_[api.uuid_param or 'uuid']
-                                else:
-                                    repr_ = json.loads(data)
-                                    self_id = repr_[api.uuid_param or 'uuid']
-                                return cls_(self_id)
-                            return conversions.from_str(data, api.return_type)
-                    else:
-                        payload = json.dumps({conversions.to_str(k): conversions.normalize_to_json_compat(v)
-                                              for k, v in kwargs_.items()})
-                        async with session.post(base_url, data=payload) as resp:
-                            data = (await resp.content.read()).decode('utf-8')
-                            if not resp.ok:
-                                sys.stderr.write(data + '\n')
-                            resp.raise_for_status()
-                            if api.is_constructor:
-                                self_id = json.loads(data)[api.uuid_param or 'uuid']
-                                return cls_(self_id)
-                            return conversions.from_str(data, api.return_type)
+                if plan.is_get:
+                    url = plan.query(kwargs_)
+                    session = pool.session()
+                    async with session.get(url, headers=get_headers, timeout=api.timeout) as resp:
+                        raw = await resp.content.read()
+                        data = raw.decode('utf-8', errors='replace')
+                        if not resp.ok:
+                            sys.stderr.write(data + '\n')
+                        resp.raise_for_status()
+                        if api.is_constructor:
+                            if hasattr(clazz, 'jsonrepr'):
+                                repr_ = clazz.jsonrepr(data)
+                                self_id = repr_[api.uuid_param or 'uuid']
+                            else:
+                                repr_ = json_backends.get_backend(json_backend).loads(data)
+                                self_id = repr_[api.uuid_param or 'uuid']
+                            return cls_(self_id)
+                        return cls._decode_response(api, resp, raw)
+                else:
+                    payload = cls._encode_payload(kwargs_, json_backend, use_msgpack)
+                    session = pool.session()
+                    async with session.post(base_url, data=payload, headers=post_headers, timeout=api.timeout) as resp:
+                        raw = await resp.content.read()
+                        data = raw.decode('utf-8', errors='replace')
+                        if not resp.ok:
+                            sys.stderr.write(data + '\n')
+                        resp.raise_for_status()
+                        if api.is_constructor:
+                            self_id = json_backends.get_backend(json_backend).loads(data)[
+                                api.uuid_param or 'uuid']
+                            return cls_(self_id)
+                        return cls._decode_response(api, resp, raw)
             except aiohttp.ClientResponseError as e:
                 error_body = data if resp is not None else "<<no response text/traceback info>>"
                 error_body += f"\n\nRequest to {api.name} failed: {e.message}"
@@ -208,7 +541,8 @@ class WebInterface(ABC):
 
     @classmethod
     def _add_class_method_streamed(cls, clazz: Type, impl_name: str, end_point: str, method,
-                                   common_headers: dict):
+                                   pool: '_SessionPool', json_backend: Optional[JsonBackend] = None,
+                                   use_msgpack: bool = False):
         if not hasattr(method, '_bantam_web_api'):
             raise SyntaxError(f"All methods of class WebClient most be decorated with '@web_api'")
         # noinspection PyProtectedMember
@@ -218,62 +552,34 @@ class WebInterface(ABC):
 
         name = method.__name__
         api: API = method._bantam_web_api
-        base_url = f"{end_point}/{impl_name}/{name}"
+        plan = ClientCallPlan.compile(api, end_point, f"/{impl_name}/{name}")
+        base_url = plan.url
+        get_headers, post_headers = cls._wire_headers(use_msgpack, streamed=True)
 
         # noinspection PyDecorator,PyUnusedLocal
         @classmethod
         async def class_method_streamed(cls_, *args, **kwargs):
-            nonlocal api, end_point, common_headers
             resp = None
-            # noinspection PyBroadException
-            try:
-                arg_spec = inspect.getfullargspec(api._func)
-            except Exception:
-                arg_spec = inspect.getfullargspec(api._func.__func__)
-            kwargs.update({
-                arg_spec.args[n + 1]: arg for n, arg in enumerate(args)
-            })
-            rest_method = api._func._bantam_web_api.method
-            common_headers = (common_headers or {}).update({'Content-Type': 'text/streamed'})
+            plan.bind(api.name, args, kwargs)
             try:
-                if rest_method.value == RestMethod.GET.value:
-                    url_args = cls._generate_url_args(kwargs=kwargs)
-                    url = f"{base_url}{url_args}"
-                    async with aiohttp.ClientSession(timeout=api.timeout, headers=common_headers) as session:
-                        async with session.get(url) as resp:
-                            if not resp.ok:
-                                sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
-                            resp.raise_for_status()
-                            buffer = ""
-                            async for data, _ in resp.content.iter_chunks():
-                                if data:
-                                    if api.return_type != bytes:
-                                        buffer += data.decode('utf-8')
-                                        *data_items, buffer = buffer.split('\0')
-                                        for datum in data_items:
-                                            yield conversions.from_str(datum, api.return_type)
-                                    else:
-                                        data = data.decode('utf-8')
-                                        yield conversions.from_str(data, api.return_type)
+                if plan.is_get:
+                    url = plan.query(kwargs)
+                    session = pool.session()
+                    async with session.get(url, headers=get_headers, timeout=api.timeout) as resp:
+                        if not resp.ok:
+                            sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
+                        resp.raise_for_status()
+                        async for item in cls._iterate_streamed_items(api, resp):
+                            yield item
                 else:
-                    payload = json.dumps({conversions.to_str(k): conversions.normalize_to_json_compat(v)
-                                          for k, v in kwargs.items()})
-                    async with aiohttp.ClientSession(timeout=api.timeout, headers=common_headers) as session:
-                        async with session.post(base_url, data=payload) as resp:
-                            if not resp.ok:
-                                sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
-                            resp.raise_for_status()
-                            buffer = ""
-                            async for data, _ in resp.content.iter_chunks():
-                                if data:
-                                    if api.return_type != bytes:
-                                        buffer += data.decode('utf-8')
-                                        *data_items, buffer = buffer.split('\0')
-                                        for datum in data_items:
-                                            yield conversions.from_str(datum, api.return_type)
-                                    else:
-                                        data = data.decode('utf-8')
-                                        yield conversions.from_str(data, api.return_type)
+                    payload = cls._encode_payload(kwargs, json_backend, use_msgpack)
+                    session = pool.session()
+                    async with session.post(base_url, data=payload, headers=post_headers, timeout=api.timeout) as resp:
+                        if not resp.ok:
+                            sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
+                        resp.raise_for_status()
+                        async for item in cls._iterate_streamed_items(api, resp):
+                            yield item
             except aiohttp.ClientResponseError as e:
                 body = e.message
                 raise Exception(body)
@@ -282,53 +588,49 @@ class WebInterface(ABC):
 
     @classmethod
     def _add_instance_method(cls, clazz: Type, impl_name: str, end_point: str, method,
-                             common_headers: dict):
+                             pool: '_SessionPool', json_backend: Optional[JsonBackend] = None,
+                             use_msgpack: bool = False):
         # class/static methods
         # noinspection PyProtectedMember
         # noinspection PyProtectedMember
         name = method.__name__
         api: API = method._bantam_web_api
-        base_url = f"{end_point}/{impl_name}/{name}"
+        plan = ClientCallPlan.compile(api, end_point, f"/{impl_name}/{name}")
+        base_url = plan.url
+        get_headers, post_headers = cls._wire_headers(use_msgpack)
 
         # noinspection PyDecorator,PyShadowingNames
         @wraps(method)
         async def instance_method(self, *args, **kwargs_):
-            nonlocal api, end_point
-            # noinspection PyBroadException
-            try:
-                arg_spec = inspect.getfullargspec(api._func)
-            except Exception:
-                arg_spec = inspect.getfullargspec(api._func.__func__)
-            kwargs_.update({
-                arg_spec.args[n]: arg for n, arg in enumerate(args)
-            })
-            # noinspection PyBroadException
-            rest_method = api._func._bantam_web_api.method
+            plan.bind(api.name, args, kwargs_)
+            batch = _current_batch.get()
+            if batch is not None and batch.pool is pool and not api.is_constructor:
+                return await batch.call(api, plan.route, {**kwargs_, 'self': self.self_id})
             try:
-                if rest_method.value == RestMethod.GET.value:
-                    url_args = cls._generate_url_args(self_id=self.self_id, kwargs=kwargs_)
-                    url = f"{base_url}{url_args}"
-                    async with aiohttp.ClientSession(timeout=api.timeout, headers=common_headers) as session:
-                        async with session.get(url) as resp:
-                            if not resp.ok:
-                                sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
-                            resp.raise_for_status()
-                            data = (await resp.content.read()).decode('utf-8')
-                            return conversions.from_str(data, api.return_type)
+                if plan.is_get:
+                    url = plan.query(kwargs_, self_id=self.self_id)
+                    session = pool.session()
+                    async with session.get(url, headers=get_headers, timeout=api.timeout) as resp:
+                        if not resp.ok:
+                            sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
+                        resp.raise_for_status()
+                        raw = await resp.content.read()
+                        data = raw.decode('utf-8', errors='replace')
+                        return cls._decode_response(api, resp, raw)
                 else:
                     kwargs_['self'] = self.self_id
-                    payload = json.dumps({conversions.to_str(k): conversions.normalize_to_json_compat(v)
-                                          for k, v in kwargs_.items()})
-                    async with aiohttp.ClientSession(timeout=api.timeout, headers=common_headers) as session:
-                        async with session.post(base_url, data=payload) as resp:
-                            if not resp.ok:
-                                sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
-                            resp.raise_for_status()
-                            data = (await resp.content.read()).decode('utf-8')
-                            if api.is_constructor:
-                                self_id = json.loads(data)['self_id']
-                                return clazz(self_id)
-                            return conversions.from_str(data, api.return_type)
+                    payload = cls._encode_payload(kwargs_, json_backend, use_msgpack)
+                    session = pool.session()
+                    async with session.post(base_url, data=payload, headers=post_headers, timeout=api.timeout) as resp:
+                        if not resp.ok:
+                            sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
+                        resp.raise_for_status()
+                        raw = await resp.content.read()
+                        data = raw.decode('utf-8', errors='replace')
+                        if api.is_constructor:
+                            self_id = json_backends.get_backend(json_backend).loads(data)['self_id']
+                            return clazz(self_id)
+                        return cls._decode_response(api, resp, raw)
             except aiohttp.ClientResponseError as e:
                 body = resp.content if resp is not None else "<<no response text/traceback info>>"
                 body += f"\n\nRequest to {api.name} failed: {e.message}"
@@ -338,61 +640,41 @@ class WebInterface(ABC):
 
     @classmethod
     def _add_instance_method_streamed(cls, clazz: Type, impl_name: str, end_point: str, method,
-                                      common_headers: dict):
+                                      pool: '_SessionPool', json_backend: Optional[JsonBackend] = None,
+                                      use_msgpack: bool = False):
         # class/static methods
         # noinspection PyProtectedMember
         # noinspection PyProtectedMember
         name = method.__name__
         api: API = method._bantam_web_api
-        base_url = f"{end_point}/{impl_name}/{name}"
+        plan = ClientCallPlan.compile(api, end_point, f"/{impl_name}/{name}")
+        base_url = plan.url
+        get_headers, post_headers = cls._wire_headers(use_msgpack, streamed=True)
 
         async def instance_method_streamed(self, *args, **kwargs_):
-            nonlocal api, end_point, base_url
-            arg_spec = inspect.getfullargspec(api._func)
-            kwargs_.update({
-                arg_spec.args[n + 1]: arg for n, arg in enumerate(args)
-            })
-            rest_method = api.method
+            plan.bind(api.name, args, kwargs_)
             try:
-                if rest_method == RestMethod.GET:
-                    url_args = cls._generate_url_args(self_id=self.self_id, kwargs=kwargs_)
-                    url = f"{base_url}{url_args}"
-                    async with aiohttp.ClientSession(timeout=api.timeout, headers=common_headers) as session:
-                        async with session.get(url) as resp:
-                            if not resp.ok:
-                                sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
-                            resp.raise_for_status()
-                            buffer = ""
-                            async for data, _ in resp.content.iter_chunks():
-                                if data:
-                                    if api.return_type != bytes:
-                                        buffer += data.decode('utf-8')
-                                        *data_items, buffer = buffer.split('\0')
-                                        for datum in data_items:
-                                            yield conversions.from_str(datum, api.return_type)
-                                    else:
-                                        data = data.decode('utf-8')
-                                        yield conversions.from_str(data, api.return_type)
+                if plan.is_get:
+                    url = plan.query(kwargs_, self_id=self.self_id)
+                    session = pool.session()
+                    async with session.get(url, headers=get_headers, timeout=api.timeout) as resp:
+                        if not resp.ok:
+                            sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
+                        resp.raise_for_status()
+                        async for item in cls._iterate_streamed_items(api, resp):
+                            yield item
                 else:
                     url = f"{base_url}?self={self.self_id}"
                     kwargs_['self'] = self.self_id
-                    payload = json.dumps({k: conversions.to_str(v) for k, v in kwargs_.items()})
-                    async with aiohttp.ClientSession(timeout=api.timeout, headers=common_headers) as session:
-                        async with session.post(url, data=payload) as resp:
-                            if not resp.ok:
-                                sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
-                            resp.raise_for_status()
-                            buffer = ""
-                            async for data, _ in resp.content.iter_chunks():
-                                if data:
-                                    if api.return_type != bytes:
-                                        buffer += data.decode('utf-8')
-                                        *data_items, buffer = buffer.split('\0')
-                                        for datum in data_items:
-                                            yield conversions.from_str(datum, api.return_type)
-                                    else:
-                                        data = data.decode('utf-8')
-                                        yield conversions.from_str(data, api.return_type)
+                    payload = cls._encode_payload({k: plan.image(k, v) for k, v in kwargs_.items()}, json_backend,
+                                                  use_msgpack)
+                    session = pool.session()
+                    async with session.post(url, data=payload, headers=post_headers, timeout=api.timeout) as resp:
+                        if not resp.ok:
+                            sys.stderr.write((await resp.content.read()).decode('utf-8') + '\n')
+                        resp.raise_for_status()
+                        async for item in cls._iterate_streamed_items(api, resp):
+                            yield item
             except aiohttp.ClientResponseError as e:
                 body = resp.content if resp is not None else "<<no response text/traceback info>>"
                 body += f"\n\nRequest to {api.name} failed: {e.message}"
@@ -403,7 +685,21 @@ class WebInterface(ABC):
     # noinspection PyPep8Naming
     @classmethod
     def ClientEndpointMapping(cls: C, impl_name: Optional[str] = None,
-                              common_headers: Optional[dict] = None) -> Mapping[str, C]:
+                              common_headers: Optional[dict] = None,
+                              json_backend: Union[str, JsonBackend, None] = None,
+                              use_msgpack: bool = False,
+                              pool_options: Optional[PoolOptions] = None) -> Mapping[str, C]:
+        """
+        :param impl_name: name of the server-side class implementing this interface, if not that of this interface
+           sans the 'Interface' suffix
+        :param common_headers: headers to send with every request
+        :param json_backend: json engine for request bodies and responses, if not the default one
+        :param use_msgpack: whether to exchange MessagePack rather than json with the server
+        :param pool_options: settings of the pool of connections kept to each end point, if not the defaults
+        :return: mapping of end point (base url of a server) to client class, which keeps a pool of connections to the
+           end point for all calls, until closed through `close` of the mapping (or on exiting the mapping as an async
+           context manager)
+        """
         if cls == WebInterface:
             raise Exception("Must call Client with concrete class of WebInterface, not WebInterface itself")
         if impl_name is None:
@@ -411,9 +707,57 @@ class WebInterface(ABC):
                 raise Exception("Call to Client must specify impl_name explicitly since class name does not end in "
                                 "'Interface'")
             impl_name = cls.__name__[:-len('Interface')]
+        if json_backend is not None:
+            json_backend = json_backends.get_backend(json_backend)
+        if use_msgpack and not conversions.msgpack_available():
+            raise ImportError("msgpack must be installed to use MessagePack as wire format")
 
         class ClientFactory(Mapping[str, C]):
 
+            def __init__(self):
+                self._keys: Set[str] = set()
+
+            async def close(self) -> None:
+                """
+                Close the connections of all end points accessed through this mapping; any subsequent call opens them
+                anew
+                """
+                for key in self._keys:
+                    await WebInterface._pools[key].close()
+
+            def batch(self, end_point: str, route: str = '/_batch', max_size: int = 1000) -> ClientBatch:
+                """
+                :param end_point: end point whose calls are to be batched
+                :param route: batch route of the server (see the *batch_route* parameter of *WebApplication*)
+                :param max_size: maximum number of calls sent in one batch
+                :return: context within which calls to the end point are sent in batches (see `ClientBatch`)
+                """
+                self[end_point]
+                return ClientBatch(WebInterface._pools[self._key(end_point)], self._normalize(end_point) + route,
+                                   max_size)
+
+            @staticmethod
+            def _normalize(end_point: str) -> str:
+                while end_point.endswith('/'):
+                    end_point = end_point[:-1]
+                return end_point
+
+            @classmethod
+            def _key(cls_, end_point: str) -> str:
+                # every option shaping the generated client or its session tells clients apart
+                return f"{cls.__name__}@{cls_._normalize(end_point)}" + \
+                    (f" impl={impl_name}" if impl_name != cls.__name__[:-len('Interface')] else "") + \
+                    (" [msgpack]" if use_msgpack else "") + \
+                    (f" json={json_backend.name}" if json_backend is not None else "") + \
+                    (f" headers={sorted(common_headers.items())}" if common_headers else "") + \
+                    (f" {pool_options}" if pool_options is not None else "")
+
+            async def __aenter__(self) -> 'ClientFactory':
+                return self
+
+            async def __aexit__(self, *exc_info: Any) -> None:
+                await self.close()
+
             def __iter__(self) -> Iterator[str]:
                 for key in [k for k in WebInterface._clients if k.startswith(cls.__name__)]:
                     yield key
@@ -422,7 +766,7 @@ class WebInterface(ABC):
                 return len([k for k in WebInterface._clients if k.startswith(cls.__name__)])
 
             @staticmethod
-            def add_dynamic_methods(clazz: Type, end_point: str):
+            def add_dynamic_methods(clazz: Type, end_point: str, pool: _SessionPool):
 
                 non_class_methods = inspect.getmembers(cls, predicate=inspect.isfunction)
                 for name, method in non_class_methods:
@@ -438,9 +782,11 @@ class WebInterface(ABC):
                         raise Exception(f"Method {name} of {cls.__name__}")
                     else:
                         if inspect.isasyncgenfunction(method):
-                            cls._add_instance_method_streamed(clazz, impl_name, end_point, method, common_headers)
+                            cls._add_instance_method_streamed(clazz, impl_name, end_point, method, pool,
+                                                              json_backend, use_msgpack)
                         else:
-                            cls._add_instance_method(clazz, impl_name, end_point, method, common_headers)
+                            cls._add_instance_method(clazz, impl_name, end_point, method, pool,
+                                                     json_backend, use_msgpack)
 
                 class_methods = inspect.getmembers(cls, predicate=inspect.ismethod)
                 for name, method in class_methods:
@@ -449,9 +795,11 @@ class WebInterface(ABC):
                     if not inspect.iscoroutinefunction(method) and not inspect.isasyncgenfunction(method):
                         raise Exception(f"Function {name} of {cls.__name__} is not async as expected.")
                     if inspect.isasyncgenfunction(method):
-                        cls._add_class_method_streamed(clazz, impl_name, end_point, method, common_headers)
+                        cls._add_class_method_streamed(clazz, impl_name, end_point, method, pool,
+                                                       json_backend, use_msgpack)
                     else:
-                        cls._add_class_method(clazz, impl_name, end_point, method, common_headers)
+                        cls._add_class_method(clazz, impl_name, end_point, method, pool,
+                                              json_backend, use_msgpack)
 
             def __getitem__(self, end_point: str):
                 class Impl:
@@ -473,14 +821,15 @@ class WebInterface(ABC):
                     def __init__(self, *args, **kwargs):
                         Impl.__init__(self, *args, **kwargs)
 
-                while end_point.endswith('/'):
-                    end_point = end_point[:-1]
-                key = f"{cls.__name__}@{end_point}"
+                end_point = self._normalize(end_point)
+                key = self._key(end_point)
+                self._keys.add(key)
                 if key in WebInterface._clients:
                     return WebInterface._clients[key]
 
                 if key not in WebInterface._clients:
-                    ClientFactory.add_dynamic_methods(Impl, end_point)
+                    pool = WebInterface._pools[key] = _SessionPool(common_headers, pool_options or PoolOptions())
+                    ClientFactory.add_dynamic_methods(Impl, end_point, pool)
                     WebInterface._clients[key] = ImplProper
                 return WebInterface._clients[key]
 
@@ -0,0 +1,67 @@
+"""
+Compression of responses, negotiated through the Accept-Encoding header of requests.
+
+Responses are compressed with gzip or deflate when the web api (through the *compress* and *compress_min_size*
+parameters of *@web_api*) or the application (through *compress_min_size* of *WebApplication*) enables it, and only
+when the client accepts it.  Whole responses are compressed only if at least the minimum size; streamed responses are
+compressed as a whole, with the compressor flushed at each write, so that every item sent can be decoded as soon as it
+is received.
+"""
+import gzip
+import zlib
+from pathlib import Path
+from typing import Optional
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+DEFAULT_MIN_SIZE = 1024  # bytes, below which a response is not worth compressing
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    :param accept_encoding: value of a request's Accept-Encoding header
+    :return: GZIP or DEFLATE, whichever the client prefers (gzip if equally), or None if it accepts neither
+    """
+    accepted = {}
+    for token in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in token.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    wildcard = accepted.get('*', 0.0)
+    coding = max((GZIP, DEFLATE), key=lambda coding_: accepted.get(coding_, wildcard))
+    return coding if accepted.get(coding, wildcard) > 0 else None
+
+
+class StreamCompressor:
+    """
+    Compressor of a streamed response, flushed at each write so that the client can decode all data written so far
+    """
+
+    def __init__(self, coding: str):
+        self._compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS if coding == GZIP else zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """
+        :return: remaining compressed data, ending the stream
+        """
+        return self._compressor.flush()
+
+
+def precompress(path: Path) -> Path:
+    """
+    Write a gzip'ed copy of a static file alongside it, which is then served in its place to clients accepting gzip
+
+    :return: path to compressed copy
+    """
+    compressed = path.with_name(path.name + '.gz')
+    compressed.write_bytes(gzip.compress(path.read_bytes(), mtime=0))
+    return compressed
@@ -1,20 +1,29 @@
 """
 package for conversions to/from text or json
 """
+import base64
 import dataclasses
 import datetime
+import io
 import json
 import pickle
 import types
 import typing
 import uuid
 from pathlib import Path, WindowsPath, PosixPath
-from typing import Type, Any, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, Optional, Tuple, Type, Union
 from enum import Enum
 
 from frozendict import frozendict
 from frozenlist import FrozenList
 
+from .json_backends import JsonBackend, StdlibJsonBackend, get_backend
+
+try:
+    import msgpack
+except ImportError:  # optional, for MessagePack content negotiation
+    msgpack = None
+
 assert typing
 
 
@@ -22,14 +31,13 @@ def normalize_to_json_compat(val: Any) -> Any:
     if val is None:
         return None
     if hasattr(val, '__dataclass_fields__'):
-        json_data = dataclasses.asdict(val)
-        for key in json_data.keys():
-            if json_data[key] is not None:
-                json_data[key] = normalize_to_json_compat(json_data[key])
+        json_data = dataclass_normalizer(type(val))(val)
     elif isinstance(val, Enum):
         json_data = normalize_to_json_compat(val.value)
     elif type(val) in (str, int, float, bool):
         json_data = val
+    elif type(val) is bytes:
+        json_data = _b64encode(val)
     elif type(val) in (datetime.datetime, ):
         json_data = val.isoformat()
     elif type(val) in (uuid.UUID, PosixPath, WindowsPath, Path):
@@ -46,122 +54,38 @@ def normalize_to_json_compat(val: Any) -> Any:
             json_data.append(normalize_to_json_compat(value))
     else:
         try:
-            return normalize_to_json_compat([int(b) for b in pickle.dumps(val)])
+            return _b64encode(pickle.dumps(val))
         except Exception:
             raise RuntimeError(f"Unsupported type for conversion and type is not pickable: {type(val)}")
     return json_data
 
 def normalize_from_json(json_data, typ: Type) -> Any:
-    if typ is None or json_data is None:
-        return None
-    try:
-        if isinstance(json_data, str) and str(typ(json_data)) == json_data:
-            return typ(json_data)
-    except Exception:
-        pass
-    if isinstance(typ, types.UnionType):
-        for arg in typ.__args__:
-            if arg in (str, int, float, bool) and type(json_data) == arg:
-                return json_data
-            elif arg in (PosixPath, WindowsPath, Path, ) and type(json_data) == str:
-                return Path(json_data)
-            elif json_data == '' and arg is types.NoneType:
-                return None
-            elif arg in (str, int, float, bool):  # json  data does not match this type
-                continue
-            # noinspection PyBroadException
-            try:
-                return normalize_from_json(json_data, arg)  # recurse on arg type
-            except Exception:
-                continue
-        raise TypeError(f"Cannot convert json data '{json_data}' to any of the Union types '{typ}'")
-    if hasattr(typ, '_name') and (str(typ).startswith('typing.Union') or str(typ).startswith('typing.Optional')):
-        for arg in typ.__args__:  # type: ignore
-            if arg in (str, int, float, ) and type(json_data) == arg:
-                return json_data
-            elif json_data == '' and arg is types.NoneType:
-                return None
-            elif json_data == '' and (arg is types.NoneType or arg is None):
-                return None
-            elif arg in (str, int, float):
-                continue
-            # noinspection PyBroadException
-            try:
-                return normalize_from_json(json_data, arg)
-            except Exception:
-                continue
-    if _issubclass_safe(typ, Enum):
-        for key in typ.__members__:  # type: ignore
-            t = type(typ.__members__[key].value)  # type: ignore
-            # noinspection PyBroadException
-            try:
-                v = normalize_from_json(json_data, t)
-                return typ(v)
-            except Exception:
-                continue
-        return typ(json_data)
-    elif typ == str:
-        return json_data
-    elif typ in (int, float, PosixPath, WindowsPath, Path):
-        return typ(json_data)
-    elif typ in (datetime.datetime, ):
-        return datetime.datetime.fromisoformat(json_data)
-    elif typ in (uuid.UUID, ):
-        return uuid.UUID(json_data)
-    elif typ == bool:
-        return str(json_data).lower() == 'true'
-    elif typ == Path:
-        return Path(json_data)
-    elif getattr(typ, '_name', None) in ('Dict', 'Mapping',) or getattr(typ, '__name__', None) in ('dict', ''):
-        key_typ, elem_typ = typ.__args__
-        try:
-            return typ({
-                normalize_from_json(k, key_typ):  normalize_from_json(v, elem_typ)
-                for k, v in json_data.items()
-            })
-        except Exception:
-            return {
-                normalize_from_json(k, key_typ):  normalize_from_json(v, elem_typ)
-                for k, v in json_data.items()
-            }
-    elif getattr(typ, '__name__', None) in ('frozendict', ):
-        key_typ, elem_typ = typ.__args__
-        return frozendict({
-            normalize_from_json(k, key_typ):  normalize_from_json(v, elem_typ)
-            for k, v in json_data.items()
-        })
-    elif getattr(typ, '_name', None) in ('List', ) or getattr(typ, '__name__', None) in ('list', ):
-        return [normalize_from_json(value, typ.__args__[0]) for index, value in enumerate(json_data)]
-    elif getattr(typ, '_name', None) in ('FrozenSet', ) or getattr(typ, '__name__', None) in ('frozenset', ):
-        return frozenset([normalize_from_json(value, typ.__args__[0]) for index, value in enumerate(json_data)])
-    elif getattr(typ, '__name__', None) in ('FrozenList', 'frozenlist'):
-        return FrozenList([normalize_from_json(value, typ.__args__[0]) for index, value in enumerate(json_data)])
-    elif getattr(typ, '_name', None) in ('Set', ) or getattr(typ, '__name__', None) in ('set', ):
-        return {normalize_from_json(value, typ.__args__[0]) for index, value in enumerate(json_data)}
-    elif getattr(typ, '_name', None) in ('Tuple', ) or getattr(typ, '__name__', None) in ('tuple', ):
-        if typ.__args__[-1] == type(None):  # var args
-            return tuple(normalize_from_json(value, typ.__args__[0]) for index, value in enumerate(json_data))
-        else:
-            return tuple(normalize_from_json(value, typ.__args__[index]) for index, value in enumerate(json_data))
-
-    elif hasattr(typ, '__dataclass_fields__'):
-        return typ(**{
-            name: normalize_from_json(json_data[name], field.type)
-            for name, field in typ.__dataclass_fields__.items()
-        })
-    else:
-        try:
-            data = [int(s) for s in json_data[1:-1].split(',')] if isinstance(json_data, str) else json_data
-            return pickle.loads(bytes(data))
-        except Exception as e:
-           raise TypeError(f"Unsupported typ for web api: '{typ}' [{e}]")
+    return json_decoder(typ)(json_data)
 
 
 def to_str(val: Any) -> Optional[str]:
-    if val is None:
-        return None
-    if type(val) == bool:
-        return str(val).lower()
+    encode = _str_encoders.get(type(val))
+    if encode is not None:
+        return encode(val)
+    return _to_str_generic(val)
+
+
+def str_encoder(typ: Any) -> Callable[[Any], Optional[str]]:
+    """
+    :param typ: declared type of values to encode
+    :return: function converting values to their string image (as for a query parameter), as `to_str` does, resolving
+       the conversion once for values of exactly the declared type
+    """
+    encode = _str_encoders.get(typ) if isinstance(typ, type) else None
+    if encode is None:
+        return to_str
+    return lambda val: encode(val) if type(val) is typ else to_str(val)
+
+
+def _to_str_generic(val: Any) -> Optional[str]:
+    """
+    conversion of values whose exact type is not in the dispatch table (subclasses, user-defined types)
+    """
     try:
         typ = type(val)
         if typ(str(val)) == val:
@@ -169,8 +93,7 @@ def to_str(val: Any) -> Optional[str]:
     except Exception:
         pass
     if hasattr(val, '__dataclass_fields__'):
-        val = normalize_to_json_compat(val)
-        return json.dumps(val)
+        return _encode_json(val)
     elif isinstance(val, Enum):
         return val.value
     elif type(val) == bool:
@@ -182,22 +105,190 @@ def to_str(val: Any) -> Optional[str]:
     elif type(val) in (uuid.UUID, ):
         return str(val)
     elif type(val) in [dict] or (getattr(type(val), '_name', None) in ('Dict', 'Mapping')):
-        val = normalize_to_json_compat(val)
-        return json.dumps(val)
+        return _encode_json(val)
     elif type(val) in [list] or (getattr(type(val), '_name', None) in ('List', )):
-        val = normalize_to_json_compat(val)
-        return json.dumps(val)
+        return _encode_json(val)
     elif type(val) in [set, tuple, frozenset, FrozenList] or (getattr(type(val), '_name', None)) in ('Set', 'Tuple') or\
         getattr(type(val), '__name__') in ('frozenset', 'FrozenList'):
-        val = normalize_to_json_compat(list(val))
-        return json.dumps(val)
+        return _encode_json(list(val))
     else:
         try:
-            json.dumps([int(b) for b in pickle.dumps(val)])
+            return _b64encode(pickle.dumps(val))
         except Exception as e:
             raise TypeError(f"Type of value, '{type(val)}' is not supported in web api: {e}")
 
 
+def to_json(val: Any, backend: Union[str, JsonBackend, None] = None) -> bytes:
+    """
+    :param val: value to encode
+    :param backend: json engine to use, if not the default one (see `bantam.json_backends`)
+    :return: utf-8 json image of val, serialized in a single pass by the json engine, falling back to normalizing val
+       first only when the engine cannot handle it natively (e.g. dict keys other than str, int, float or bool), and
+       then to the standard library engine if it still cannot (e.g. integers beyond 64 bits)
+    """
+    backend = get_backend(backend)
+    try:
+        return backend.dumps(val, default=_json_default)
+    except (TypeError, OverflowError):
+        pass
+    try:
+        return backend.dumps(normalize_to_json_compat(val))
+    except (TypeError, OverflowError):
+        if isinstance(backend, StdlibJsonBackend):
+            raise
+    return to_json(val, _stdlib_backend)
+
+
+_stdlib_backend = StdlibJsonBackend()
+
+
+def is_large_json(val: Any, min_items: int) -> bool:
+    """
+    :return: whether val is a list, tuple, set or dict of at least min_items items (or a dataclass holding one), worth
+       encoding incrementally with `iter_json`
+    """
+    typ = type(val)
+    if typ in _json_sequences or typ is dict:
+        return len(val) >= min_items
+    if hasattr(val, '__dataclass_fields__') and not isinstance(val, type):
+        return any(is_large_json(getattr(val, field.name), min_items) for field in dataclasses.fields(val))
+    return False
+
+
+def iter_json(val: Any, min_items: int) -> Iterator[bytes]:
+    """
+    Encode val to json incrementally, so that no more than one item of a large container is held encoded at a time
+
+    :param val: value to encode
+    :param min_items: containers (as per `is_large_json`) of at least this many items are encoded item by item, any
+       others whole by `to_json`
+    :return: iterator over successive pieces of the (utf-8) json image of val
+    """
+    if not is_large_json(val, min_items):
+        yield to_json(val)
+    elif type(val) in _json_sequences:
+        yield b'['
+        for index, item in enumerate(val):
+            if index:
+                yield b','
+            yield from iter_json(item, min_items)
+        yield b']'
+    else:
+        items = (val if type(val) is dict else dataclass_encoder(type(val))(val)).items()
+        yield b'{'
+        for index, (key, item) in enumerate(items):
+            if index:
+                yield b','
+            yield to_json(key if type(key) is str else 'null' if key is None else str(to_str(key)))
+            yield b':'
+            yield from iter_json(item, min_items)
+        yield b'}'
+
+
+_json_sequences = (list, tuple, set, frozenset, FrozenList)
+
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+
+def to_msgpack(val: Any) -> bytes:
+    """
+    :param val: value to encode
+    :return: MessagePack image of val, with values of types MessagePack does not handle natively encoded as for json
+    """
+    try:
+        return msgpack.packb(val, default=_json_default, use_bin_type=True)
+    except (TypeError, OverflowError):
+        return msgpack.packb(_msgpack_compat(normalize_to_json_compat(val)), use_bin_type=True)
+
+
+def _msgpack_compat(val: Any) -> Any:
+    """
+    :param val: value normalized to plain dicts, lists and scalars
+    :return: val with integers beyond the 64 bits MessagePack supports replaced by their string image (from which the
+       typed decoders of clients convert them back)
+    """
+    if type(val) is int:
+        return str(val) if not -2 ** 63 <= val < 2 ** 64 else val
+    if type(val) is dict:
+        return {_msgpack_compat(key): _msgpack_compat(value) for key, value in val.items()}
+    if type(val) is list:
+        return [_msgpack_compat(value) for value in val]
+    return val
+
+
+def from_msgpack(data: bytes) -> Any:
+    """
+    :param data: MessagePack image
+    :return: decoded value, of plain dicts, lists, str's, bytes, numbers, bools and None's
+    """
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def msgpack_unpacker() -> Any:
+    """
+    :return: incremental decoder of concatenated MessagePack images (as items of a streamed response), fed with *feed*
+       and iterated over for each complete item
+    """
+    return msgpack.Unpacker(raw=False, strict_map_key=False)
+
+
+def _encode_json(val: Any) -> str:
+    return to_json(val).decode('utf-8')
+
+
+def _b64encode(data: bytes) -> str:
+    # url-safe alphabet, as images are also sent as query parameters
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def _json_default(val: Any) -> Any:
+    encode = _json_encoders.get(type(val))
+    if encode is not None:
+        return encode(val)
+    if hasattr(val, '__dataclass_fields__'):
+        return dataclass_encoder(type(val))(val)
+    if isinstance(val, Enum):
+        return val.value
+    return normalize_to_json_compat(val)
+
+
+# encoding of values not handled natively by the json encoder, keyed by exact type
+_json_encoders: Dict[type, Callable[[Any], Any]] = {
+    bytes: _b64encode,
+    set: list,
+    frozenset: list,
+    FrozenList: list,
+    datetime.datetime: datetime.datetime.isoformat,
+    uuid.UUID: str,
+    PosixPath: str,
+    WindowsPath: str,
+    Path: str,
+}
+
+# string conversion keyed by exact type of value, to avoid any speculative conversion for common types
+_str_encoders: Dict[type, Callable[[Any], Optional[str]]] = {
+    type(None): lambda val: None,
+    bool: lambda val: 'true' if val else 'false',
+    str: lambda val: val,
+    int: str,
+    float: str,
+    bytes: _b64encode,
+    PosixPath: str,
+    WindowsPath: str,
+    Path: str,
+    uuid.UUID: str,
+    datetime.datetime: datetime.datetime.isoformat,
+    dict: _encode_json,
+    list: _encode_json,
+    tuple: _encode_json,
+    set: lambda val: _encode_json(list(val)),
+    frozenset: lambda val: _encode_json(list(val)),
+    FrozenList: lambda val: _encode_json(list(val)),
+}
+
+
 def _issubclass_safe(typ, clazz):
     # noinspection PyBroadException
     try:
@@ -207,51 +298,432 @@ def _issubclass_safe(typ, clazz):
 
 
 def from_str(image: str, typ: Type | types.UnionType) -> Any:
-    if (hasattr(typ, '_name') and (str(typ).startswith('typing.Union') or str(typ).startswith('typing.Optional')))\
-            or isinstance(typ, types.UnionType):
-        # noinspection PyUnresolvedReferences
-        allow_none = str(typ).startswith('typing.Optional') or None in typ.__args__
-        if allow_none and not image:
-            # TODO: cannot really distinguish when return type is Optional[bytes] whether
-            #   None or bytes() should be returned
+    return str_decoder(typ)(image)
+
+
+Decoder = Callable[[Any], Any]
+
+_json_decoders: Dict[Any, Decoder] = {}
+_str_decoders: Dict[Any, Decoder] = {}
+
+
+def json_decoder(typ: Type | types.UnionType) -> Decoder:
+    """
+    :param typ: type to decode to
+    :return: function converting json-compatible data (as from json.loads) to the given type, compiled once per type
+       so that decoding involves no introspection of the type
+    """
+    return _cached_decoder(_json_decoders, _compile_json, typ)
+
+
+def str_decoder(typ: Type | types.UnionType) -> Decoder:
+    """
+    :param typ: type to decode to
+    :return: function converting a string image (as from a query parameter or response) to the given type, compiled
+       once per type so that decoding involves no introspection of the type
+    """
+    return _cached_decoder(_str_decoders, _compile_str, typ)
+
+
+def _cached_decoder(cache: Dict[Any, Decoder], compile_: Callable[[Any], Decoder], typ: Any) -> Decoder:
+    try:
+        return cache[typ]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable annotation
+        return _compile_safely(compile_, typ)
+    # placeholder to resolve recursive references (e.g., a dataclass with a field of its own type) once compiled
+    cache[typ] = lambda value: cache[typ](value)
+    cache[typ] = _compile_safely(compile_, typ)
+    return cache[typ]
+
+
+def _compile_safely(compile_: Callable[[Any], Decoder], typ: Any) -> Decoder:
+    try:
+        return compile_(typ)
+    except Exception as e:
+        error = f"Unsupported typ for web api: '{typ}' [{e}]"
+
+        def decode_unsupported(value: Any) -> Any:
+            if value is None:
+                return None
+            raise TypeError(error)
+        return decode_unsupported
+
+
+def _is_typing_union(typ: Any) -> bool:
+    return hasattr(typ, '_name') and (str(typ).startswith('typing.Union') or str(typ).startswith('typing.Optional'))
+
+
+def _unpickle(image: Any, typ: Any) -> Any:
+    try:
+        return unpickle(_decode_bytes(image))
+    except Exception as e:
+        raise TypeError(f"Unsupported typ for web api: '{typ}' [{e}]")
+
+
+def _decode_bytes(image: Any) -> Optional[bytes]:
+    if image is None:
+        return None
+    if isinstance(image, str):
+        if image.startswith('['):  # legacy image as list of int's
+            return bytes([int(s) for s in image[1:-1].split(',')])
+        return base64.b64decode(image, altchars=b'-_')
+    return bytes(image)
+
+
+_NO_IMAGE = object()
+
+
+def _str_image_of(typ: Any, json_data: Any) -> Any:
+    """
+    :return: typ constructed from json_data if json_data is a str that round-trips through typ, else _NO_IMAGE
+    """
+    # noinspection PyBroadException
+    try:
+        if isinstance(json_data, str):
+            value = typ(json_data)
+            if str(value) == json_data:
+                return value
+    except Exception:
+        pass
+    return _NO_IMAGE
+
+
+def _compile_json(typ: Any) -> Decoder:
+    if typ is None:
+        return lambda json_data: None
+    if isinstance(typ, types.UnionType):
+        return _compile_json_union_type(typ)
+    if _is_typing_union(typ):
+        return _compile_json_typing_union(typ)
+    if _issubclass_safe(typ, Enum):
+        return _compile_json_enum(typ)
+    if typ == str:
+        return lambda json_data: json_data
+    if typ is bytes:
+        return _decode_bytes
+    if typ in (int, float, PosixPath, WindowsPath, Path):
+        return lambda json_data: None if json_data is None else typ(json_data)
+    if typ in (datetime.datetime, ):
+        return lambda json_data: None if json_data is None else datetime.datetime.fromisoformat(json_data)
+    if typ in (uuid.UUID, ):
+        return lambda json_data: None if json_data is None else uuid.UUID(json_data)
+    if typ == bool:
+        return lambda json_data: None if json_data is None else str(json_data).lower() == 'true'
+    name, _name = getattr(typ, '__name__', None), getattr(typ, '_name', None)
+    if _name in ('Dict', 'Mapping',) or name in ('dict', ''):
+        return _compile_json_dict(typ)
+    if name in ('frozendict', ):
+        decode_key, decode_elem = (json_decoder(arg) for arg in typ.__args__)
+        return lambda json_data: None if json_data is None else frozendict({
+            decode_key(k): decode_elem(v) for k, v in json_data.items()
+        })
+    if _name in ('List', ) or name in ('list', ):
+        decode_elem = json_decoder(typ.__args__[0])
+        return lambda json_data: None if json_data is None else [decode_elem(value) for value in json_data]
+    if _name in ('FrozenSet', ) or name in ('frozenset', ):
+        decode_elem = json_decoder(typ.__args__[0])
+        return lambda json_data: None if json_data is None else frozenset([decode_elem(value) for value in json_data])
+    if name in ('FrozenList', 'frozenlist'):
+        decode_elem = json_decoder(typ.__args__[0])
+        return lambda json_data: None if json_data is None else FrozenList([decode_elem(value) for value in json_data])
+    if _name in ('Set', ) or name in ('set', ):
+        decode_elem = json_decoder(typ.__args__[0])
+        return lambda json_data: None if json_data is None else {decode_elem(value) for value in json_data}
+    if _name in ('Tuple', ) or name in ('tuple', ):
+        return _compile_json_tuple(typ)
+    if hasattr(typ, '__dataclass_fields__'):
+        return _compile_json_dataclass(typ)
+
+    def decode_pickled(json_data: Any) -> Any:
+        if json_data is None:
             return None
-        # noinspection PyUnresolvedReferences
-        for arg in typ.__args__:
+        value = _str_image_of(typ, json_data)
+        return value if value is not _NO_IMAGE else _unpickle(json_data, typ)
+    return decode_pickled
+
+
+def _compile_json_union_type(typ: types.UnionType) -> Decoder:
+    steps = [(arg, arg in (str, int, float, bool), arg in (PosixPath, WindowsPath, Path), arg is types.NoneType,
+              None if arg in (str, int, float, bool) else json_decoder(arg))
+             for arg in typ.__args__]
+
+    def decode_union(json_data: Any) -> Any:
+        if json_data is None:
+            return None
+        for arg, is_primitive, is_path, is_none, decode_arg in steps:
+            if is_primitive:
+                if type(json_data) == arg:
+                    return json_data
+                continue  # json  data does not match this type
+            if is_path and type(json_data) == str:
+                return Path(json_data)
+            if is_none and json_data == '':
+                return None
+            # noinspection PyBroadException
+            try:
+                return decode_arg(json_data)
+            except Exception:
+                continue
+        raise TypeError(f"Cannot convert json data '{json_data}' to any of the Union types '{typ}'")
+    return decode_union
+
+
+def _compile_json_typing_union(typ: Any) -> Decoder:
+    steps = [(arg, arg in (str, int, float), arg is types.NoneType or arg is None,
+              None if arg in (str, int, float) else json_decoder(arg))
+             for arg in typ.__args__]
+
+    def decode_union(json_data: Any) -> Any:
+        if json_data is None:
+            return None
+        for arg, is_primitive, is_none, decode_arg in steps:
+            if is_primitive and type(json_data) == arg:
+                return json_data
+            elif is_none and json_data == '':
+                return None
+            elif is_primitive:
+                continue
+            # noinspection PyBroadException
             try:
-                if not image and arg is types.NoneType:
-                    return None
-                return arg(image)
-            except ValueError:
+                return decode_arg(json_data)
+            except Exception:
+                continue
+        return _unpickle(json_data, typ)
+    return decode_union
+
+
+def _compile_json_enum(typ: Type[Enum]) -> Decoder:
+    value_types = list(dict.fromkeys(type(member.value) for member in typ.__members__.values()))
+    decode_values = [json_decoder(value_type) for value_type in value_types]
+
+    def decode_enum(json_data: Any) -> Any:
+        if json_data is None:
+            return None
+        value = _str_image_of(typ, json_data)
+        if value is not _NO_IMAGE:
+            return value
+        for decode_value in decode_values:
+            # noinspection PyBroadException
+            try:
+                return typ(decode_value(json_data))
+            except Exception:
                 continue
-        typ = typ.__args__[0]
-    #######
+        return typ(json_data)
+    return decode_enum
+
+
+def _compile_json_dict(typ: Any) -> Decoder:
+    key_typ, elem_typ = typ.__args__
+    decode_key, decode_elem = json_decoder(key_typ), json_decoder(elem_typ)
+    # typing.Dict/Mapping cannot be instantiated, and dict[...] would only copy
+    construct = None if getattr(typ, '_name', None) in ('Dict', 'Mapping') or typing.get_origin(typ) is dict else typ
+
+    def decode_dict(json_data: Any) -> Any:
+        if json_data is None:
+            return None
+        value = {decode_key(k): decode_elem(v) for k, v in json_data.items()}
+        if construct is None:
+            return value
+        try:
+            return construct(value)
+        except Exception:
+            return value
+    return decode_dict
+
+
+def _compile_json_tuple(typ: Any) -> Decoder:
+    if typ.__args__[-1] == type(None):  # var args
+        decode_elem = json_decoder(typ.__args__[0])
+        return lambda json_data: None if json_data is None else tuple(decode_elem(value) for value in json_data)
+    decode_elems = [json_decoder(arg) for arg in typ.__args__]
+    return lambda json_data: None if json_data is None else tuple(
+        decode_elems[index](value) for index, value in enumerate(json_data)
+    )
+
+
+def _compile_json_dataclass(typ: Any) -> Decoder:
+    namespace = {'_typ': typ, '_str_image_of': _str_image_of, '_NO_IMAGE': _NO_IMAGE}
+    required, optional = [], []
+    for index, field in enumerate(dataclasses.fields(typ)):
+        if not field.init:
+            continue
+        namespace[f'_decode{index}'] = json_decoder(field.type)
+        decode = f"_decode{index}(json_data[{field.name!r}])"
+        if field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING:
+            required.append(f"{field.name}={decode}")
+        else:
+            optional.append(f"    if {field.name!r} in json_data:\n        kwargs[{field.name!r}] = {decode}\n")
+    construct = f"_typ({', '.join(required)})" if not optional else \
+        "_typ(**kwargs)" if not required else f"_typ({', '.join(required)}, **kwargs)"
+    return _generate('decode_dataclass', (
+        "def decode_dataclass(json_data):\n"
+        "    if json_data is None:\n"
+        "        return None\n"
+        "    value = _str_image_of(_typ, json_data)\n"
+        "    if value is not _NO_IMAGE:\n"
+        "        return value\n"
+        + ("    kwargs = {}\n" + ''.join(optional) if optional else '') +
+        f"    return {construct}\n"
+    ), namespace)
+
+
+_dataclass_encoders: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+_dataclass_normalizers: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+
+
+def dataclass_encoder(typ: type) -> Callable[[Any], Dict[str, Any]]:
+    """
+    :param typ: dataclass type (with or without __slots__)
+    :return: function mapping an instance of typ to a dict of its fields, with values as is (for a json engine to
+       encode in turn), generated once per type
+    """
+    try:
+        return _dataclass_encoders[typ]
+    except KeyError:
+        fields = ', '.join(f"{field.name!r}: val.{field.name}" for field in dataclasses.fields(typ))
+        encode = _generate('encode_dataclass', f"def encode_dataclass(val):\n    return {{{fields}}}\n", {})
+        return _dataclass_encoders.setdefault(typ, encode)
+
+
+def dataclass_normalizer(typ: type) -> Callable[[Any], Dict[str, Any]]:
+    """
+    :param typ: dataclass type (with or without __slots__)
+    :return: function mapping an instance of typ to a dict of its fields, with values normalized as by
+       `normalize_to_json_compat`, generated once per type with the normalization of each field resolved from its type
+    """
+    return _cached_decoder(_dataclass_normalizers, _compile_dataclass_normalizer, typ)
+
+
+def _compile_dataclass_normalizer(typ: type) -> Callable[[Any], Dict[str, Any]]:
+    namespace = {}
+    fields = []
+    for index, field in enumerate(dataclasses.fields(typ)):
+        namespace[f'_normalize{index}'] = _field_normalizer(field.type)
+        fields.append(f"{field.name!r}: _normalize{index}(val.{field.name})")
+    return _generate('normalize_dataclass',
+                     f"def normalize_dataclass(val):\n    return {{{', '.join(fields)}}}\n", namespace)
+
+
+def _field_normalizer(typ: Any) -> Callable[[Any], Any]:
+    # values whose type is exactly the declared one skip dispatch on their type
+    if typ in (str, int, float, bool):
+        return lambda value: value if type(value) is typ else normalize_to_json_compat(value)
+    if isinstance(typ, type) and hasattr(typ, '__dataclass_fields__'):
+        normalize = dataclass_normalizer(typ)
+        return lambda value: normalize(value) if type(value) is typ else normalize_to_json_compat(value)
+    return normalize_to_json_compat
+
+
+def _generate(name: str, source: str, namespace: Dict[str, Any]) -> Callable:
+    exec(source, namespace)
+    return namespace[name]
+
+
+def _compile_str(typ: Any) -> Decoder:
+    if _is_typing_union(typ) or isinstance(typ, types.UnionType):
+        # noinspection PyUnresolvedReferences
+        allow_none = str(typ).startswith('typing.Optional') or None in typ.__args__
+        args = typ.__args__
+        decode_first = _compile_str_simple(args[0])
+
+        def decode_union(image: str) -> Any:
+            if allow_none and not image:
+                # TODO: cannot really distinguish when return type is Optional[bytes] whether
+                #   None or bytes() should be returned
+                return None
+            for arg in args:
+                try:
+                    if not image and arg is types.NoneType:
+                        return None
+                    return arg(image)
+                except ValueError:
+                    continue
+            return decode_first(image)
+        return decode_union
+    return _compile_str_simple(typ)
+
+
+def _compile_str_simple(typ: Any) -> Decoder:
+    name, _name = getattr(typ, '__name__', None), getattr(typ, '_name', None)
     if _issubclass_safe(typ, Enum):
-        return typ(image)
+        return typ
     elif typ == str:
-        return image
+        return lambda image: image
+    elif typ is bytes:
+        return _decode_bytes
     elif typ in (int, float, PosixPath, WindowsPath, Path):
-        return typ(image)
+        return typ
     elif typ in (datetime.datetime, ):
-        return datetime.datetime.fromisoformat(image)
+        return datetime.datetime.fromisoformat
     elif typ in (uuid.UUID,):
-        return uuid.UUID(image)
+        return uuid.UUID
     elif typ == bool:
-        return image.lower() == 'true'
-    elif getattr(typ, '_name', None) in ('Dict', 'List', 'Mapping', 'frozenset', 'FrozenList') or\
-        getattr(typ, '__name__', None) in ('Dict', 'List', 'Mapping', 'frozenset', 'FrozenList', 'frozendict'):
-        return normalize_from_json(json.loads(image), typ)
-    elif getattr(typ, '_name', None) in ('Set', 'Tuple', 'frozenset', 'FrozenList') or \
-            getattr(typ, '__name__', None) in ('Set', 'Tuple', 'frozenset', 'FrozenList'):
-        return normalize_from_json(json.loads(image), typ)
-    elif hasattr(typ, '__dataclass_fields__'):
-        return normalize_from_json(json.loads(image), typ)
+        return lambda image: image.lower() == 'true'
+    elif _name in ('Dict', 'List', 'Mapping', 'frozenset', 'FrozenList', 'Set', 'Tuple') or\
+            name in ('Dict', 'List', 'Mapping', 'frozenset', 'FrozenList', 'frozendict', 'Set', 'Tuple') or\
+            hasattr(typ, '__dataclass_fields__'):
+        decode = json_decoder(typ)
+        return lambda image: decode(json.loads(image))
     elif typ is None:
-        if image:
-            raise ValueError(f"Got a return of {image} for a return type of None")
-        return None
-    else:
-        try:
-            data = [int(s) for s in image[1:-1].split(',')] if isinstance(image, str) else image
-            return pickle.loads(bytes(data))
-        except Exception as e:
-            raise TypeError(f"Unsupported typ for web api: '{typ}' [{e}]")
+        def decode_none(image: str) -> None:
+            if image:
+                raise ValueError(f"Got a return of {image} for a return type of None")
+            return None
+        return decode_none
+
+    def decode_opaque(image: str) -> Any:
+        return _unpickle(image, typ)
+    decode_opaque.opaque = True
+    return decode_opaque
+
+
+def is_opaque(typ: Any) -> bool:
+    """
+    :return: whether values of the given type have no representation other than as pickled bytes
+    """
+    return isinstance(typ, type) and typ is not object and typ not in _str_encoders and \
+        getattr(str_decoder(typ), 'opaque', False)
+
+
+# (module, name) of globals that may be unpickled, or None if unrestricted
+_unpickle_allowlist: Optional[FrozenSet[Tuple[str, str]]] = None
+
+_SAFE_GLOBALS = frozenset(
+    [('builtins', name) for name in ('bytearray', 'complex', 'dict', 'frozenset', 'list', 'object', 'range', 'set',
+                                     'slice', 'tuple')] +
+    [('copyreg', '_reconstructor'), ('collections', 'OrderedDict'), ('collections', 'deque')] +
+    [('datetime', name) for name in ('date', 'datetime', 'time', 'timedelta', 'timezone')] +
+    [('uuid', 'UUID'), ('decimal', 'Decimal')]
+)
+
+
+def set_unpickle_allowlist(classes: Optional[Iterable[Type]]) -> None:
+    """
+    Restrict which classes may be unpickled from values received over the wire (process-wide); by default any
+    class may be.  Common builtin and standard library types are always allowed once restricted.
+
+    :param classes: classes that may be unpickled, or None to lift the restriction
+    """
+    global _unpickle_allowlist
+    _unpickle_allowlist = None if classes is None else \
+        _SAFE_GLOBALS | {(clazz.__module__, clazz.__qualname__) for clazz in classes}
+
+
+class _RestrictedUnpickler(pickle.Unpickler):
+
+    def find_class(self, module: str, name: str) -> Any:
+        if _unpickle_allowlist is not None and (module, name) not in _unpickle_allowlist:
+            raise pickle.UnpicklingError(f"Unpickling of '{module}.{name}' is not allowed")
+        return super().find_class(module, name)
+
+
+def unpickle(data: bytes) -> Any:
+    """
+    :param data: pickled value
+    :return: value unpickled from data, subject to any allowlist set through `set_unpickle_allowlist`
+    """
+    if _unpickle_allowlist is None:
+        return pickle.loads(data)
+    return _RestrictedUnpickler(io.BytesIO(data)).load()
@@ -21,7 +21,17 @@ def web_api(content_type: str, method: RestMethod = RestMethod.GET,
             timeout: Optional[ClientTimeout] = None,
             uuid_param: Optional[str] = None,
             preprocess: Optional[PreProcessor] = None,
-            postprocess: Optional[PostProcessor] = None) -> Callable[[WebApi], WebApi]:
+            postprocess: Optional[PostProcessor] = None,
+            max_concurrency: Optional[int] = None,
+            deadline: Optional[float] = None,
+            first_item_timeout: Optional[float] = None,
+            idle_timeout: Optional[float] = None,
+            stream_buffer_size: Optional[int] = None,
+            stream_flush_delay: Optional[float] = None,
+            compress: Optional[bool] = None,
+            compress_min_size: Optional[int] = None,
+            cache_ttl: Optional[float] = None,
+            cache_size: Optional[int] = None) -> Callable[[WebApi], WebApi]:
     """
     Decorator for class async method to register it as an API with the `WebApplication` class
     Decorated functions should be static class methods with parameters that are convertible from a string
@@ -46,10 +56,30 @@ def web_api(content_type: str, method: RestMethod = RestMethod.GET,
     :param is_constructor: set to True if API is static method return a class instnace, False oherwise (default)
     :param expire_obj: for instance methods only, epxire the object upon successful completion of that call
     :param on_disconnect: callback if client disconnects unexpectedly
-    :param timeout: optional timeout value for response to request to timeout
+    :param timeout: optional timeout value for response to request to timeout (client-side)
     :param uuid_param: optional name of parameter to use as unique id for 'self'
     :param preprocess: optional preprocess function to invoke on request
     :param postprocess: optional postprocess function to run after servicing request
+    :param max_concurrency: optional maximum number of requests to this api serviced at once; others wait (for up to
+       the application's max_queue_wait) and are then rejected with a 503
+    :param deadline: optional seconds the server allows a (non-streamed) call to take before cancelling it and
+       responding with a 504; defaults to the application's handler_deadline
+    :param first_item_timeout: for streamed responses, optional seconds the server allows before the first item is
+       produced; defaults to the application's handler_deadline
+    :param idle_timeout: for streamed responses, optional seconds the server allows between items; defaults to the
+       application's handler_deadline
+    :param stream_buffer_size: for streamed responses, optional number of bytes of items to coalesce into a single
+       write to the client; giving this or stream_flush_delay enables coalescing (default 64 KiB)
+    :param stream_flush_delay: for streamed responses, optional maximum seconds an item is held back for coalescing
+       before being written to the client (default 0.01)
+    :param compress: whether to compress responses (with gzip or deflate, as accepted by the client); defaults to
+       whether the application compresses responses (see *compress_min_size* of *WebApplication*)
+    :param compress_min_size: optional size in bytes below which (non-streamed) responses are sent uncompressed;
+       giving this implies compress=True
+    :param cache_ttl: for GET class and static methods not streaming their response, optional seconds that clients
+       reuse a response to the same arguments before checking back with the server (which tags responses so that an
+       unchanged one need not be sent again); giving this or cache_size enables caching in clients (default 60)
+    :param cache_size: optional maximum number of responses (to distinct arguments) each client caches (default 256)
     :return: callable decorator
     """
     from .http import WebApplication
@@ -91,6 +121,16 @@ def web_api(content_type: str, method: RestMethod = RestMethod.GET,
                                             on_disconnect=on_disconnect,
                                             uuid_param=uuid_param,
                                             preprocess=preprocess,
-                                            postprocess=postprocess)
+                                            postprocess=postprocess,
+                                            max_concurrency=max_concurrency,
+                                            deadline=deadline,
+                                            first_item_timeout=first_item_timeout,
+                                            idle_timeout=idle_timeout,
+                                            stream_buffer_size=stream_buffer_size,
+                                            stream_flush_delay=stream_flush_delay,
+                                            compress=compress,
+                                            compress_min_size=compress_min_size,
+                                            cache_ttl=cache_ttl,
+                                            cache_size=cache_size)
 
     return wrapper
@@ -0,0 +1,127 @@
+"""
+Length-prefixed framing of the items of streamed responses.
+
+By default, items of a streamed response are separated by a null character, which a client must scan for (and which
+cannot delimit binary items).  A client that sends *application/x-bantam-framed* in its Accept header instead receives
+each item prefixed by its length in bytes, as an unsigned LEB128 varint, with the item itself (*bytes* items included)
+sent unchanged.
+
+Clients decode either form incrementally, as chunks are received, in time linear in the size of the stream: received
+bytes are buffered in a *bytearray*, scanned only once, and each item is copied out of it (through a *memoryview*)
+only when complete.  Items are returned as *bytes*, to be decoded as a whole, so that a multi-byte character split
+across chunks is never decoded in halves (and a null byte never occurs within the UTF-8 encoding of another
+character).
+"""
+from typing import List, Tuple
+
+FRAMED = 'application/x-bantam-framed'
+SEPARATOR = 0  # byte terminating each item of a stream that is not framed
+
+
+def encode_varint(value: int) -> bytes:
+    """
+    :param value: non-negative integer
+    :return: unsigned LEB128 encoding of value
+    """
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def frame(item: bytes) -> bytes:
+    """
+    :return: item prefixed by its length
+    """
+    return encode_varint(len(item)) + item
+
+
+class FrameDecoder:
+    """
+    Incremental decoder of length-prefixed items, fed with chunks as received
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        :param data: next chunk received
+        :return: items completed by the chunk
+        """
+        buffer = self._buffer
+        buffer += data
+        spans: List[Tuple[int, int]] = []
+        offset = 0
+        end = len(buffer)
+        while offset < end:
+            length = shift = 0
+            pos = offset
+            while pos < end:
+                byte = buffer[pos]
+                pos += 1
+                length |= (byte & 0x7f) << shift
+                shift += 7
+                if not byte & 0x80:
+                    break
+            else:
+                break  # length itself not yet complete
+            if pos + length > end:
+                break
+            spans.append((pos, pos + length))
+            offset = pos + length
+        return _take(buffer, spans, offset)
+
+    @property
+    def pending(self) -> int:
+        """
+        :return: number of bytes received of items not yet complete
+        """
+        return len(self._buffer)
+
+
+class SeparatedDecoder:
+    """
+    Incremental decoder of null-terminated items, fed with chunks as received
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scanned = 0  # bytes of buffer known to hold no separator
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        :param data: next chunk received
+        :return: items completed by the chunk, sans separator
+        """
+        buffer = self._buffer
+        buffer += data
+        spans: List[Tuple[int, int]] = []
+        offset = 0
+        pos = buffer.find(SEPARATOR, self._scanned)
+        while pos >= 0:
+            spans.append((offset, pos))
+            offset = pos + 1
+            pos = buffer.find(SEPARATOR, offset)
+        items = _take(buffer, spans, offset)
+        self._scanned = len(buffer)
+        return items
+
+    @property
+    def pending(self) -> int:
+        """
+        :return: number of bytes received of items not yet complete
+        """
+        return len(self._buffer)
+
+
+def _take(buffer: bytearray, spans: List[Tuple[int, int]], consumed: int) -> List[bytes]:
+    """
+    :return: items at the given (start, end) spans of buffer, whose first consumed bytes are then discarded
+    """
+    with memoryview(buffer) as view:
+        items = [bytes(view[start:end]) for start, end in spans]
+    del buffer[:consumed]
+    return items
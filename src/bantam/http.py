@@ -5,12 +5,18 @@ import asyncio
 from asyncio import Task
 
 import docutils.core
+import hashlib
+import heapq
 import importlib
 import inspect
 import json
+import multiprocessing
 import os
+import pickle
+import signal
 import socket
 import sys
+import time
 import traceback
 import types
 import uuid as uuid_pkg
@@ -20,22 +26,30 @@ from aiohttp import ClientTimeout, ClientConnectionError
 from aiohttp import web
 from aiohttp.web import (
     Application,
+    ContentCoding,
     Request,
     Response,
     StreamResponse,
 )
 from asyncio import CancelledError
+from collections import OrderedDict
 from contextlib import suppress
+from contextvars import ContextVar
+from enum import Enum
 from pathlib import Path
 from ssl import SSLContext
 from typing import (
     Any,
+    AsyncIterator,
     Awaitable,
     Callable,
     Dict,
+    Iterable,
     List,
     Mapping,
     Optional,
+    Set,
+    Tuple,
     Union,
     Type,
 )
@@ -43,15 +57,42 @@ from typing import (
 from asynciomultiplexer import asynciomultiplexer
 
 from . import HTTPException
-from .conversions import from_str, to_str, normalize_from_json
 from .decorators import (
     PreProcessor,
     PostProcessor,
     web_api,
     WebApi,
 )
-from .api import AsyncChunkIterator, AsyncLineIterator, RestMethod, API, APIDoc
+from .api import (
+    AsyncChunkIterator,
+    AsyncLineIterator,
+    RestMethod,
+    API,
+    APIDoc,
+    HandlerTimeouts,
+    InvocationPlan,
+    StreamBuffering,
+    MSGPACK,
+    _convert_request_param,  # noqa: F401
+    _serialize_return_value,  # noqa: F401
+)
+from .admission import AdmissionRejected, ConcurrencyLimiter
+from .conversions import (
+    from_msgpack,
+    is_large_json,
+    iter_json,
+    msgpack_available,
+    set_unpickle_allowlist,
+    to_json,
+    to_msgpack,
+    to_str,
+)
+from .compression import StreamCompressor, negotiate, precompress
+from .framing import FRAMED, frame
+from .json_backends import JsonBackend, get_backend, set_default_backend
 from .js_async import JavascriptGeneratorAsync
+from .metrics import Metrics
+from .spill import SpillStore
 from .js import JavascriptGenerator
 
 _all__ = ['WebApplication', web_api, AsyncChunkIterator, AsyncLineIterator, 'AsyncApi', RestMethod]
@@ -99,8 +140,216 @@ async def response_from_exception(request, reason: str, code: int = 400):
     return resp
 
 
+async def _call_on_disconnect(api: API, *args: Any) -> None:
+    """
+    Invoke the cleanup callback of an api, if it has one, logging rather than raising any error from it
+    """
+    if api.on_disconnect is None:
+        return
+    try:
+        result = api.on_disconnect(*args)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        log.error(f"Error in call to on_disconnect of {api.qualname}: {e}")
+
+
+async def _await_within(api: API, awaitable: Awaitable, deadline: Optional[float], *cleanup_args: Any) -> Any:
+    """
+    Await the result of a web api call, cancelling it (and running its on_disconnect cleanup with the given args)
+    if it does not complete within the deadline
+    """
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, deadline)
+    except asyncio.TimeoutError:
+        await _call_on_disconnect(api, *cleanup_args)
+        raise WebApplication.HandlerTimeout(f"{api.qualname} did not complete within {deadline} seconds")
+
+
+def _accepts_msgpack(api: API, request: Request) -> bool:
+    """
+    :return: whether the response to the request is to be MessagePack, as negotiated through its Accept header
+    """
+    return api.return_type is not bytes and MSGPACK in request.headers.get('Accept', '') and msgpack_available()
+
+
+def _stream_encoding(api: API, plan: InvocationPlan, request: Request, legacy_content_type: str
+                     ) -> Tuple[str, Callable[[Any], bytes]]:
+    """
+    :return: content type of a streamed response to the request and the function encoding each of its items, as
+       negotiated through the request's Accept header: MessagePack, length-prefixed frames or null-terminated text
+    """
+    if _accepts_msgpack(api, request):
+        return MSGPACK, to_msgpack  # MessagePack images are self-delimiting
+    serialize = plan.serialize
+    if FRAMED in request.headers.get('Accept', ''):
+        return FRAMED, lambda item: frame(serialize(item))
+    return legacy_content_type, lambda item: serialize(item) if isinstance(item, bytes) else serialize(item) + b'\0'
+
+
+async def _iterate_with_timeouts(api: API, items: AsyncIterator, timeouts: HandlerTimeouts) -> AsyncIterator:
+    """
+    Iterate over items streamed from a web api call, closing the stream if the first item or any subsequent one
+    takes longer than the given limits to arrive
+    """
+    if timeouts.first_item is None and timeouts.idle is None:
+        async for item in items:
+            yield item
+        return
+    limit = timeouts.first_item
+    while True:
+        try:
+            item = await asyncio.wait_for(items.__anext__(), limit)
+        except StopAsyncIteration:
+            return
+        except asyncio.TimeoutError:
+            with suppress(Exception):
+                await items.aclose()
+            what = "first item" if limit is timeouts.first_item else "next item"
+            raise WebApplication.HandlerTimeout(f"{api.qualname} did not produce its {what} within {limit} seconds")
+        yield item
+        limit = timeouts.idle
+
+
+def _compress_response(response: Response, request: Request, min_size: Optional[int]) -> Response:
+    """
+    Enable compression of a (not yet prepared) response, if at least min_size and the client accepts it
+    """
+    body = response.body
+    size = len(body) if isinstance(body, (bytes, bytearray)) else getattr(body, 'size', None)  # else a str payload
+    if min_size is not None and size is not None and size >= min_size:
+        response.headers.add('Vary', 'Accept-Encoding')  # so that shared caches keep each coding apart
+        coding = negotiate(request.headers.get('Accept-Encoding', ''))
+        if coding is not None:
+            response.enable_compression(ContentCoding(coding))
+    return response
+
+
+def _entity_tag(body: Union[str, bytes]) -> str:
+    """
+    :return: entity tag of a response body, weak as the body may be sent in any content coding (see `compression`),
+       each of which a strong tag would have to tell apart
+    """
+    digest = hashlib.blake2b(body.encode('utf-8') if isinstance(body, str) else body, digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """
+    :return: whether the request's If-None-Match header matches the given entity tag (by weak comparison, as is to be
+       done for If-None-Match)
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is None:
+        return False
+    opaque = _opaque_tag(etag)
+    return any(tag.strip() == '*' or _opaque_tag(tag.strip()) == opaque for tag in if_none_match.split(','))
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def _stream_compressor(response: StreamResponse, request: Request, min_size: Optional[int]
+                       ) -> Optional[StreamCompressor]:
+    """
+    :return: compressor for a (not yet prepared) streamed response, if compressed responses are enabled (whatever
+       min_size, as the size of a stream is not known in advance) and the client accepts it, else None
+    """
+    if min_size is None:
+        return None
+    response.headers.add('Vary', 'Accept-Encoding')
+    coding = negotiate(request.headers.get('Accept-Encoding', ''))
+    if coding is None:
+        return None
+    response.headers['Content-Encoding'] = coding
+    return StreamCompressor(coding)
+
+
+class _StreamWriter:
+    """
+    Writer of the items of a streamed response, coalescing them (if the api asks to) into fewer, larger writes to the
+    client: buffered items are written out once they reach the buffer size, or once the oldest of them has been held
+    for the maximum delay, whichever comes first.  If a compressor is given, each write is compressed and flushed, so
+    the client can decode every item as soon as it receives it
+    """
+
+    def __init__(self, response: StreamResponse, buffering: Optional[StreamBuffering],
+                 compressor: Optional[StreamCompressor] = None):
+        self._response = response
+        self._buffering = buffering
+        self._compressor = compressor
+        self._buffer = bytearray()
+        self._lock = asyncio.Lock()
+        self._timer: Optional[Task] = None
+        self._error: Optional[Exception] = None
+        self._closed = False
+
+    async def write(self, data: bytes) -> None:
+        if self._buffering is None:
+            await self._send(data)
+            return
+        self._raise_delayed_error()
+        self._buffer += data
+        if len(self._buffer) >= self._buffering.max_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later(self._buffering.max_delay))
+
+    async def flush(self) -> None:
+        """
+        Write out any items held back, raising any error from an earlier, delayed write
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._raise_delayed_error()
+        await self._write_buffer()
+
+    async def close(self) -> None:
+        """
+        Write out any items held back and end the compressed stream, if compressing; the response itself is left for
+        the caller to end
+        """
+        if self._closed:
+            return
+        self._closed = True
+        await self.flush()
+        if self._compressor is not None:
+            await self._response.write(self._compressor.finish())
+
+    def _raise_delayed_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            self._buffer.clear()
+            raise error
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._timer = None  # items arriving during the write are held for a delay of their own
+        try:
+            await self._write_buffer()
+        except Exception as e:
+            self._error = e
+
+    async def _write_buffer(self) -> None:
+        async with self._lock:
+            if self._buffer:
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                await self._send(data)
+
+    async def _send(self, data: bytes) -> None:
+        await self._response.write(self._compressor.compress(data) if self._compressor is not None else data)
+
+
 ASYNC_POLLING_INTERVAL = float(os.environ.get('BANTAM_ASYNC_POLL', 0.05))
 
+# request currently being serviced, inherited by any tasks created while servicing it
+_request_context: ContextVar[Optional[Request]] = ContextVar('bantam_request', default=None)
+
 
 # noinspection PyUnresolvedReferences
 class WebApplication:
@@ -111,13 +360,61 @@ class WebApplication:
     :param static_path: root path to where static files will be kept, mapped to a route "/static", if provided
     :param js_bundle_name: the name of the javascript file, **without** extension, where the client-side API
        will be generated, if provided
+    :param dispatch_mode: how requests are handed to the main loop that owns all handlers; see `DispatchMode`.
+       Defaults to DIRECT; earlier versions always dispatched as QUEUED now does
+    :param max_instances: if provided, the maximum number of instances (created through constructor web_api's) held at
+       any one time, beyond which the least-recently used are released (or spilled, if a spill store is provided),
+       process-wide (as instances are held in the process-wide `WebApplication.ObjectRepo`)
+    :param spill_store: if provided, a `bantam.spill.SpillStore` to which idle instances are serialized to free memory,
+       to be reloaded when next referenced, process-wide
+    :param spill_idle_time: if provided, seconds an instance must be idle before it is spilled to the spill store,
+       process-wide (default 10 minutes)
+    :param max_concurrency: if provided, the maximum number of requests serviced at once across all routes; others wait
+       their turn (see also the *max_concurrency* parameter of *@web_api* to limit individual routes)
+    :param max_queue_wait: maximum seconds a request waits for admission before being rejected with a 503
+       (and a Retry-After header); None to wait indefinitely
+    :param handler_deadline: if provided, default server-side limit in seconds for web api's that do not specify their
+       own deadline, first_item_timeout or idle_timeout (see *@web_api*); beyond it the call is cancelled and a 504
+       returned
+    :param metrics_route: if provided, route (e.g. "/metrics") under which request and instance metrics are served
+       in Prometheus text format; metrics are only collected if provided
+    :param json_backend: if provided, name of the json engine ('orjson', 'msgspec', 'json' or 'auto') or engine used
+       process-wide for request bodies and responses; by default the standard library's (see `bantam.json_backends`)
+    :param unpickle_allowlist: if provided, the only classes (besides common builtin types) that may be unpickled from
+       values received of types that are sent pickled, process-wide
+    :param batch_route: if provided, route (e.g. "/_batch") under which several web api calls can be made in one
+       POST request (see `WebApplication._serve_batch`), as done by the batching context of *WebInterface* clients
+    :param compress_min_size: if provided, responses of at least this many bytes (and all streamed responses) are
+       compressed with gzip or deflate for clients accepting it, unless a web api says otherwise (see the *compress*
+       parameter of *@web_api*)
     """
-    _context: Dict[Any, Request] = {}
     _class_instance_methods: Dict[Type, List[API]] = {}
     _instance_methods_class_map: Dict[API, Type] = {}
     _instance_methods: List[API] = []
     _all_methods: List[API] = []
 
+    WORKER_SUPERVISION_INTERVAL: float = 0.5  # seconds between checks for dead worker processes
+    DEFAULT_MAX_QUEUE_WAIT: float = 1.0  # seconds
+    # request key holding seconds waited for admission (and dispatch, if metered)
+    QUEUE_WAIT_KEY = web.RequestKey('bantam.queue_wait', float)
+    # request key holding number of items sent in a streamed response
+    STREAM_ITEMS_KEY = web.RequestKey('bantam.stream_items', int)
+    INCREMENTAL_JSON_MIN_ITEMS: int = 1024  # lists/dicts this large in responses are encoded and sent incrementally
+    INCREMENTAL_JSON_BUFFER_SIZE: int = 64 * 1024  # bytes encoded before each write of an incremental response
+
+    class DispatchMode(Enum):
+        """
+        How a request is handed to the single loop that owns all handlers:
+
+        * DIRECT (the default): the handler is scheduled on the serving loop immediately, with no polling and no
+          per-request queue
+        * QUEUED: legacy behavior, and the default of earlier versions; the request is placed on a queue that is
+          polled every BANTAM_ASYNC_POLL seconds (0.05 by default) and the response passed back through a one-slot
+          queue
+        """
+        DIRECT = 'direct'
+        QUEUED = 'queued'
+
     class MainThread:
         """
         This is used to "undo" the threading in aiohttp.  It seems silly to combine threading and asyncio
@@ -130,15 +427,36 @@ class WebApplication:
         MAX_SIMULTANEOUS_REQUESTS = 1000
 
         request_q = asynciomultiplexer.AsyncAdaptorQueue(MAX_SIMULTANEOUS_REQUESTS)
+        loop: Optional[asyncio.AbstractEventLoop] = None
 
         @classmethod
         async def start(cls, coro: Awaitable, resp_q: asynciomultiplexer.AsyncAdaptorQueue):
             await cls.request_q.put((coro, resp_q))
 
         @classmethod
-        async def main(cls, initializer: Optional[Callable[[], None]] = None):
+        async def dispatch(cls, coro: Awaitable) -> Any:
+            """
+            Run the given coroutine on the loop that owns all handlers, without polling.  If called from that loop
+            (the normal case, as aiohttp serves on the same loop), the coroutine is awaited in place.  Otherwise, it is
+            handed to the owning loop thread-safely and its result awaited through a future.
+
+            :param coro: coroutine processing the request
+            :return: result of the coroutine
+            """
+            loop = cls.loop
+            if loop is None or loop is asyncio.get_running_loop():
+                return await coro
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+        @classmethod
+        async def main(cls, initializer: Optional[Callable[[], None]] = None,
+                       dispatch_mode: 'WebApplication.DispatchMode' = None):
+            cls.loop = asyncio.get_running_loop()
             if initializer:
                 initializer()
+            if dispatch_mode == WebApplication.DispatchMode.DIRECT:
+                # requests are scheduled through dispatch(); nothing to drain
+                return
 
             async def task(coro: Awaitable, resp_q: asynciomultiplexer.AsyncAdaptorQueue):
                 try:
@@ -152,21 +470,208 @@ class WebApplication:
                 asyncio.create_task(task(*request))
 
     class ObjectRepo:
+        """
+        Repository of the instances created through constructor web_api's.  Each instance holds a lease that is
+        extended every time the instance is accessed; a single sweeper task per loop releases instances whose lease
+        has run out, so renewing a lease is only a timestamp update.  If *max_instances* is set, the least-recently
+        used instances are released to stay within that bound.
+
+        If a *spill_store* is set, instances idle for longer than *spill_idle_time* (or evicted for capacity) are
+        serialized to that store instead, and reloaded on their next *lookup*; see `bantam.spill`.
+        """
         DEFAULT_OBJECT_EXPIRATION: int = 60*60*2   # in seconds = 1 hour
+        DEFAULT_SPILL_IDLE_TIME: float = 60*10  # in seconds
+        SWEEP_INTERVAL: float = 1.0  # in seconds
+        max_instances: Optional[int] = None
+        spill_store: Optional[SpillStore] = None
+        spill_idle_time: float = DEFAULT_SPILL_IDLE_TIME
 
-        instances: Dict[str, Any] = {}
+        instances: Dict[str, Any] = OrderedDict()  # in least-to-most recently used order
         by_instance: Dict[Any, str] = {}
-        expiry: Dict[str, Task] = {}
+        spilled: Dict[str, Type] = {}
+        leases: Dict[str, float] = {}
+        deadlines: Dict[str, float] = {}
+        _unspillable: Set[str] = set()
+        # running totals, for metrics:
+        expirations: int = 0
+        evictions: int = 0
+        spills: int = 0
+        restores: int = 0
+        _scheduled: Dict[str, float] = {}
+        _heap: List[Tuple[float, str]] = []
+        _sweeper: Optional[Task] = None
+
+        @classmethod
+        async def add(cls, obj_id: str, instance: Any, lease_time: float = DEFAULT_OBJECT_EXPIRATION) -> None:
+            """
+            Add an instance to the repo, releasing least-recently used instances if over capacity
+
+            :param obj_id: unique id of the instance
+            :param instance: instance to hold
+            :param lease_time: seconds of inactivity before the instance is released
+            """
+            cls.instances[obj_id] = instance
+            cls.instances.move_to_end(obj_id)
+            cls.by_instance[instance] = obj_id
+            cls.renew(obj_id, lease_time)
+            if cls._sweeper is None or cls._sweeper.done() or cls._sweeper.get_loop() is not asyncio.get_running_loop():
+                cls._sweeper = asyncio.create_task(cls._sweep_forever())
+            while cls.max_instances is not None and len(cls.instances) > cls.max_instances:
+                obj_id = next(iter(cls.instances))
+                cls.evictions += 1
+                if not cls.spill(obj_id):
+                    await cls.remove(obj_id)
+
+        @classmethod
+        def get(cls, obj_id: str) -> Optional[Any]:
+            """
+            :param obj_id: unique id of the instance
+            :return: the instance, extending its lease, or None if no such instance is held
+            """
+            instance = cls.instances.get(obj_id)
+            if instance is not None:
+                cls.instances.move_to_end(obj_id)
+                cls.deadlines[obj_id] = time.monotonic() + cls.leases[obj_id]
+            return instance
+
+        @classmethod
+        async def lookup(cls, obj_id: str) -> Optional[Any]:
+            """
+            :param obj_id: unique id of the instance
+            :return: the instance, reloading it from the spill store if it was spilled and extending its lease, or
+               None if no such instance is held
+            """
+            instance = cls.get(obj_id)
+            if instance is not None or obj_id not in cls.spilled:
+                return instance
+            clazz = cls.spilled.pop(obj_id)
+            data = cls.spill_store.get(obj_id)
+            cls.spill_store.delete(obj_id)
+            try:
+                if data is None:
+                    raise ValueError("no data in spill store")
+                instance = clazz.restore(data) if hasattr(clazz, 'restore') else pickle.loads(data)
+            except Exception as e:
+                log.error(f"Unable to restore spilled instance {obj_id} of {clazz.__name__}: {e}")
+                cls.discard(obj_id)
+                return None
+            await cls.add(obj_id, instance, cls.leases[obj_id])
+            cls.restores += 1
+            return instance
+
+        @classmethod
+        def spill(cls, obj_id: str) -> bool:
+            """
+            Move an instance out of memory and into the spill store
+
+            :param obj_id: unique id of the instance
+            :return: whether the instance was spilled; False if there is no spill store or the instance cannot be
+               serialized
+            """
+            if cls.spill_store is None or obj_id in cls._unspillable:
+                return False
+            instance = cls.instances[obj_id]
+            try:
+                data = instance.spill() if hasattr(instance, 'spill') else pickle.dumps(instance)
+            except Exception as e:
+                log.debug(f"Instance {obj_id} of {type(instance).__name__} cannot be spilled: {e}")
+                cls._unspillable.add(obj_id)
+                return False
+            cls.spill_store.put(obj_id, data)
+            del cls.instances[obj_id]
+            cls.by_instance.pop(instance, None)
+            cls.spilled[obj_id] = type(instance)
+            cls.spills += 1
+            return True
+
+        @classmethod
+        def renew(cls, obj_id: str, lease_time: float) -> None:
+            """
+            Replace the lease of an instance with a new one of the given duration, starting now
+
+            :param obj_id: unique id of the instance
+            :param lease_time: seconds of inactivity before the instance is released
+            """
+            deadline = time.monotonic() + lease_time
+            cls.leases[obj_id] = lease_time
+            cls.deadlines[obj_id] = deadline
+            # deadlines only move out on access; an entry is only (re)pushed on a renewal that moves it in
+            if deadline < cls._scheduled.get(obj_id, float('inf')):
+                cls._scheduled[obj_id] = deadline
+                heapq.heappush(cls._heap, (deadline, obj_id))
+
+        @classmethod
+        def discard(cls, obj_id: str) -> Optional[Any]:
+            """
+            Drop an instance from the repo without closing it
+
+            :param obj_id: unique id of the instance
+            :return: the instance dropped, or None if no such instance was held
+            """
+            instance = cls.instances.pop(obj_id, None)
+            if instance is not None:
+                cls.by_instance.pop(instance, None)
+            if cls.spilled.pop(obj_id, None) is not None:
+                cls.spill_store.delete(obj_id)
+            cls._unspillable.discard(obj_id)
+            cls.leases.pop(obj_id, None)
+            cls.deadlines.pop(obj_id, None)
+            cls._scheduled.pop(obj_id, None)
+            return instance
+
+        @classmethod
+        async def remove(cls, obj_id: str) -> None:
+            """
+            Drop an instance from the repo, closing it (through *__aexit__*) if it is an async context manager
+
+            :param obj_id: unique id of the instance
+            """
+            instance = cls.discard(obj_id)
+            if hasattr(instance, '__aexit__'):
+                with suppress(Exception):
+                    await instance.__aexit__(None, None, None)
 
         @classmethod
         async def expire_obj(cls, obj_id: str, new_lease_time: int):
             if new_lease_time > 0:
-                await asyncio.sleep(new_lease_time)
-            if hasattr(cls.instances[obj_id], '__aexit__'):
-                with suppress(Exception):
-                    await cls.instances[obj_id].__aexit__(None, None, None)
-            del cls.instances[obj_id]
-            del cls.expiry[obj_id]
+                cls.renew(obj_id, new_lease_time)
+            else:
+                await cls.remove(obj_id)
+
+        @classmethod
+        async def _sweep(cls, now: float) -> None:
+            expired = []
+            while cls._heap and cls._heap[0][0] <= now:
+                scheduled, obj_id = heapq.heappop(cls._heap)
+                if cls._scheduled.get(obj_id) != scheduled:
+                    continue  # stale entry, superseded by a shorter renewal or removal
+                deadline = cls.deadlines[obj_id]
+                if deadline <= now:
+                    expired.append(obj_id)
+                else:
+                    cls._scheduled[obj_id] = deadline
+                    heapq.heappush(cls._heap, (deadline, obj_id))
+            cls.expirations += len(expired)
+            for obj_id in expired:
+                await cls.remove(obj_id)
+            if cls.spill_store is not None:
+                idle_since = now - cls.spill_idle_time
+                for obj_id in list(cls.instances):  # least-recently used first
+                    if cls.deadlines[obj_id] - cls.leases[obj_id] > idle_since:
+                        break
+                    cls.spill(obj_id)
+
+        @classmethod
+        async def _sweep_forever(cls) -> None:
+            while cls.instances or cls.spilled:
+                await asyncio.sleep(cls.SWEEP_INTERVAL)
+                await cls._sweep(time.monotonic())
+
+    class HandlerTimeout(Exception):
+        """
+        Raised when a web api does not complete within its server-side deadline; responded to with a 504
+        """
+        pass
 
     class DuplicateRoute(Exception):
         """
@@ -188,8 +693,40 @@ class WebApplication:
                  handler_args: Optional[Mapping[str, Any]] = None,
                  client_max_size: int = MAX_CLIENTS,
                  using_async: bool = True,
+                 dispatch_mode: 'WebApplication.DispatchMode' = None,
+                 max_instances: Optional[int] = None,
+                 spill_store: Optional[SpillStore] = None,
+                 spill_idle_time: Optional[float] = None,
+                 max_concurrency: Optional[int] = None,
+                 max_queue_wait: Optional[float] = DEFAULT_MAX_QUEUE_WAIT,
+                 handler_deadline: Optional[float] = None,
+                 metrics_route: Optional[str] = None,
+                 json_backend: Union[str, JsonBackend, None] = None,
+                 unpickle_allowlist: Optional[Iterable[Type]] = None,
+                 compress_min_size: Optional[int] = None,
+                 batch_route: Optional[str] = None,
                  debug: Any = ..., ) -> None:  # mypy doesn't support ellipsis
         self._main_task: Optional[asyncio.Task] = None
+        if max_instances is not None and max_instances < 1:
+            raise ValueError("max_instances must be a positive number")
+        if max_instances is not None:
+            WebApplication.ObjectRepo.max_instances = max_instances
+        if spill_store is not None:
+            WebApplication.ObjectRepo.spill_store = spill_store
+        if spill_idle_time is not None:
+            WebApplication.ObjectRepo.spill_idle_time = spill_idle_time
+        self._dispatch_mode = dispatch_mode or WebApplication.DispatchMode.DIRECT
+        self._limiter = ConcurrencyLimiter(max_concurrency) if max_concurrency is not None else None
+        self._max_queue_wait = max_queue_wait
+        self._handler_deadline = handler_deadline
+        self._compress_min_size = compress_min_size
+        self._batch_route = batch_route
+        self._metrics = Metrics() if metrics_route is not None else None
+        self._metrics_route = metrics_route
+        if json_backend is not None:
+            set_default_backend(json_backend)
+        if unpickle_allowlist is not None:
+            set_unpickle_allowlist(unpickle_allowlist)
         if static_path is not None and not Path(static_path).exists():
             raise ValueError(f"Provided static path, {static_path} does not exist")
         self._static_path = static_path
@@ -203,6 +740,8 @@ class WebApplication:
         self._preprocessor: Optional[PreProcessor] = None
         self._postprocessor: Optional[PostProcessor] = None
         self._all_apis: List[API] = []
+        self._workers: List[multiprocessing.Process] = []
+        self._workers_stop: Optional[asyncio.Event] = None
 
     def _generate_rest_docs(self):
         rst_out = self._static_path.joinpath('_developer_docs.rst')
@@ -277,6 +816,8 @@ class WebApplication:
             writer_name="html",
             settings_overrides={'stylesheet_path': ','.join(["html4css1.css", str(css_file)])}
         )
+        for path in (rst_out, html_out, css_file):
+            precompress(path)
 
     def set_preprocessor(self, processor: PreProcessor):
         self._preprocessor = processor
@@ -292,6 +833,170 @@ class WebApplication:
     def postprocessor(self):
         return self._postprocessor
 
+    @property
+    def limiter(self) -> Optional[ConcurrencyLimiter]:
+        """
+        :return: the application-wide concurrency limiter (with its admission statistics), if max_concurrency was set
+        """
+        return self._limiter
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """
+        :return: request metrics collected for each route, if a metrics_route was provided
+        """
+        return self._metrics
+
+    async def _serve_batch(self, request: Request) -> StreamResponse:
+        """
+        Serve several web api calls made in one request, whose json body is of the form::
+
+            {"calls": [{"route": "/MyClass/my_method", "params": {"param1": 1, ...}}, ...], "stream": false}
+
+        Calls are dispatched concurrently, each decoded, admitted, bounded in time and (for an instance method) bound to
+        its instance (through a "self" parameter) as a call made on its own would be, and each preprocessed (against
+        this request) but not postprocessed.  Calls of constructors and of api's streaming their request or response
+        are not supported.  The outcome of each call is reported as a json object of its http status and either its
+        result, as the string image the api would respond with, or an error message.  These are sent as a json list, in
+        order of the calls, or, if "stream" is true, as frames (see `bantam.framing`) in order of completion, each
+        holding the index of its call.
+        """
+        try:
+            batch = get_backend().loads(await request.read())
+            calls = [(call['route'], call.get('params') or {}) for call in batch['calls']]
+            stream = bool(batch.get('stream', False))
+        except (ValueError, TypeError, KeyError) as e:
+            return Response(status=400, text=f"Improperly formatted batch of calls: {e}")
+        tasks = [asyncio.create_task(self._invoke_batched(request, route, params)) for route, params in calls]
+        if not stream:
+            return Response(body=to_json(list(await asyncio.gather(*tasks))),
+                            content_type='application/json')
+        response = StreamResponse(status=200, reason='OK', headers={'Content-Type': FRAMED})
+        await response.prepare(request)
+        try:
+            indices = {task: index for index, task in enumerate(tasks)}
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    await response.write(frame(to_json({'index': indices[task], **task.result()})))
+            await response.write_eof()
+        finally:
+            for task in tasks:
+                task.cancel()
+        return response
+
+    async def _invoke_batched(self, request: Request, route: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :return: outcome of one call of a batch, as its http status and either its result or an error message
+        """
+        api = self.callables_get.get(route) or self.callables_post.get(route)
+        if api is None or api not in self._all_apis:
+            return {'status': 404, 'error': f"No web api at route {route}"}
+        if api.is_constructor or api.has_streamed_request or api.has_streamed_response:
+            return {'status': 400, 'error': f"{api.qualname} cannot be called in a batch"}
+        for k in params:
+            if k not in api.plan.allowed_params:
+                return {'status': 400,
+                        'error': f"No such parameter or missing type hint for param {k} in method {api.qualname}"}
+        invoke = self.routes_get.get(route) or self.routes_post.get(route)
+        preprocess = invoke.preprocess or self.preprocessor
+        try:
+            admitted, _ = await self._admit(api)
+        except AdmissionRejected as e:
+            return {'status': 503, 'error': str(e)}
+        try:
+            addl_args = (preprocess(request) or {}) if preprocess else {}
+            return {'status': 200, 'result': await self.MainThread.dispatch(self._call_batched(api, params, addl_args))}
+        except WebApplication.HandlerTimeout as e:
+            return {'status': 504, 'error': str(e)}
+        except PermissionError as e:
+            return {'status': 401, 'error': f"PermissionError with request: {e}"}
+        except TypeError as e:
+            return {'status': 400, 'error': f"Improperly formatted query: {e}"}
+        except HTTPException as e:
+            return {'status': e.status_code, 'error': str(e)}
+        except Exception as e:
+            return {'status': 400, 'error': f"General exception in request: {e}"}
+        finally:
+            for limiter in admitted:
+                limiter.release()
+
+    async def _call_batched(self, api: API, params: Dict[str, Any], addl_args: Dict[str, Any]) -> Optional[str]:
+        """
+        :return: string image of the result of a call of a batch
+        """
+        json_decoders = api.plan.json_decoders
+        kwargs = {k: json_decoders[k](v) if k != 'self' else v for k, v in params.items()}
+        kwargs.update(addl_args)
+        args: Tuple[Any, ...] = ()
+        cleanup_args: Tuple[Any, ...] = (None,)
+        self_id = None
+        if api.is_instance_method:
+            self_id = kwargs.pop('self', None)
+            if self_id is None:
+                raise ValueError("No instance provided for call to instance method")
+            instance = await WebApplication.ObjectRepo.lookup(self_id)
+            if instance is None:
+                raise ValueError(f"No instance found for request with 'self' id of {self_id}")
+            args = (instance,)
+            cleanup_args = (instance, None)
+        elif api.is_class_method:
+            if isinstance(api.clazz, tuple):
+                module_name, class_name = api.clazz
+                api._clazz = getattr(sys.modules.get(module_name), class_name)
+            args = (api.clazz,)
+        kwargs, varargs = api.plan.bind(kwargs)
+        deadline = api.handler_timeouts(self._handler_deadline).deadline
+        result = await _await_within(api, api(*args, *varargs, **kwargs), deadline, *cleanup_args)
+        if api.expire_object and self_id is not None:
+            WebApplication.ObjectRepo.discard(self_id)
+        return to_str(result)
+
+    async def _serve_metrics(self, _request: Request) -> Response:
+        repo = WebApplication.ObjectRepo
+        gauges = [
+            ('bantam_instances', 'gauge', 'Server-side instances held in memory', len(repo.instances)),
+            ('bantam_instances_spilled', 'gauge', 'Server-side instances held in the spill store', len(repo.spilled)),
+            ('bantam_instance_expirations_total', 'counter', 'Server-side instances released on lease expiry',
+             repo.expirations),
+            ('bantam_instance_evictions_total', 'counter', 'Server-side instances evicted to stay within max_instances',
+             repo.evictions),
+            ('bantam_instance_spills_total', 'counter', 'Server-side instances moved to the spill store', repo.spills),
+            ('bantam_instance_restores_total', 'counter', 'Server-side instances restored from the spill store',
+             repo.restores),
+        ]
+        if self._limiter is not None:
+            gauges += [
+                ('bantam_admission_in_flight', 'gauge', 'Requests admitted application-wide', self._limiter.in_flight),
+                ('bantam_admission_queued', 'gauge', 'Requests waiting for admission', self._limiter.queued),
+                ('bantam_admission_rejected_total', 'counter', 'Requests rejected for lack of capacity',
+                 self._limiter.rejected),
+            ]
+        return Response(body=self._metrics.render(gauges).encode('utf-8'),
+                        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    async def _admit(self, api: API) -> Tuple[List[ConcurrencyLimiter], float]:
+        """
+        Wait for admission of a request to the given api, against its route limit and then the application limit
+
+        :return: the limiters admitted through, to be released once the request is serviced, and total seconds waited
+        :raises AdmissionRejected: if the request could not be admitted within max_queue_wait
+        """
+        admitted: List[ConcurrencyLimiter] = []
+        wait = 0.0
+        try:
+            for limiter in (api.limiter, self._limiter):
+                if limiter is not None:
+                    wait += await limiter.acquire(
+                        self._max_queue_wait - wait if self._max_queue_wait is not None else None)
+                    admitted.append(limiter)
+        except BaseException:
+            for limiter in admitted:
+                limiter.release()
+            raise
+        return admitted, wait
+
     @classmethod
     def register_route_get(cls, route: str, async_handler: AsyncApi, api: API, module: str) -> None:
         """
@@ -404,7 +1109,8 @@ class WebApplication:
                     backlog: int = 128,
                     handle_signals: bool = True,
                     reuse_address: Optional[bool] = None,
-                    reuse_port: Optional[bool] = None,) -> None:
+                    reuse_port: Optional[bool] = None,
+                    workers: int = 1) -> None:
         """
         start the app
 
@@ -414,7 +1120,7 @@ class WebApplication:
         :param port: optional port to listen on (TCP)
         :param path: path, if using UNIX domain sockets to listen on (cannot specify both TCP and domain parameters)
         :param initializer: optional function (no params, no return) to call on first bring-up, inside the
-            thread associated with the app's asyncio loop
+            thread associated with the app's asyncio loop (inside each worker process, if more than one worker)
         :param shutdown_timeout: force shutdown if a shutdown call fails to take hold after this many seconds
         :param ssl_context: for HTTPS server; if not provided, will default to HTTP connection
         :param backlog: number of unaccepted connections before system will refuse new connections
@@ -423,11 +1129,41 @@ class WebApplication:
            natural timeout to expire. If not specified will automatically be set to True on UNIX.
         :param reuse_port: tells the kernel to allow this endpoint to be bound to the same port as other existing
             endpoints are bound to, so long as they all set this flag when being created. This option is not supported
-            on Windows.
+            on Windows.  With more than one worker, each worker binds its own socket this way; otherwise the
+            workers share one socket bound up front
+        :param workers: number of pre-forked server processes to run; each runs its own event loop.  The parent
+            process generates the javascript bundle and docs once, then supervises the workers, restarting any that
+            die, and shuts them down gracefully when stopped
         """
-        # noinspection PyProtectedMember
-        self._main_task = asyncio.create_task(self.MainThread.main(initializer))
+        if host is not None and sock is not None:
+            raise ValueError("Cannot specify both host/port and sock parameters")
+        if workers < 1:
+            raise ValueError("Number of workers must be at least 1")
+        if workers > 1 and not hasattr(os, 'fork'):
+            raise ValueError("Multiple workers are only supported on platforms that can fork")
+        if workers > 1 and reuse_port and (sock is not None or path is not None):
+            raise ValueError("Cannot specify sock or path parameters with reuse_port for multiple workers, each of "
+                             "which binds its own socket to host and port")
+        if workers == 1:
+            # noinspection PyProtectedMember
+            self._main_task = asyncio.create_task(self.MainThread.main(initializer, self._dispatch_mode))
+        self._setup(modules)
+        if workers > 1:
+            await self._run_workers(workers, host=host, port=port, sock=sock, path=path, initializer=initializer,
+                                    shutdown_timeout=shutdown_timeout, ssl_context=ssl_context, backlog=backlog,
+                                    handle_signals=handle_signals, reuse_address=reuse_address,
+                                    reuse_port=reuse_port)
+            return
         from aiohttp.web import _run_app as web_run_app
+        await web_run_app(app=self._web_app, host=host, port=port, sock=sock, path=path,
+                          shutdown_timeout=shutdown_timeout, ssl_context=ssl_context, backlog=backlog,
+                          handle_signals=handle_signals, reuse_address=reuse_address, reuse_port=reuse_port)
+
+    # noinspection PyProtectedMember
+    def _setup(self, modules: List[str]) -> None:
+        """
+        Process the given modules, register their routes and generate the javascript bundle and docs
+        """
         for module in modules:
             self.preprocess_module(module)
             if module not in sys.modules:
@@ -458,6 +1194,10 @@ class WebApplication:
             invoke = self.routes_post[route]
             self._web_app.router.add_post(route, wrap(self, invoke))
             self._all_apis.append(api_post)
+        if self._metrics_route is not None:
+            self._web_app.router.add_get(self._metrics_route, self._serve_metrics)
+        if self._batch_route is not None:
+            self._web_app.router.add_post(self._batch_route, self._serve_batch)
         if self._js_bundle_name:
             if self._static_path is None:
                 raise ValueError("If 'js_bundle_name' is specified, 'static_path' cannot be None")
@@ -465,7 +1205,8 @@ class WebApplication:
             js_path = static_path.joinpath('js')
             if not js_path.exists():
                 js_path.mkdir(parents=True)
-            with open(js_path.joinpath(self._js_bundle_name + ".js"), 'bw') as out:
+            bundle = js_path.joinpath(self._js_bundle_name + ".js")
+            with open(bundle, 'bw') as out:
                 if self._using_async:
                     JavascriptGeneratorAsync.generate(
                         out=out, skip_html=False,
@@ -473,20 +1214,125 @@ class WebApplication:
                     )
                 else:
                     JavascriptGenerator.generate(out=out, skip_html=False)
+            precompress(bundle)  # served in place of the bundle to browsers accepting gzip
         self._started = True
         if self._static_path:
             with suppress(Exception):
                 self._generate_rest_docs()
-        if host is not None and sock is not None:
-            raise ValueError("Cannot specify both host/port and sock parameters")
-        await web_run_app(app=self._web_app, host=host, port=port, sock=sock, path=path, shutdown_timeout=shutdown_timeout,
-                          ssl_context=ssl_context, backlog=backlog, handle_signals=handle_signals,
-                          reuse_address=reuse_address, reuse_port=reuse_port)
+
+    async def _run_workers(self, workers: int, host: Optional[str], port: Optional[int],
+                           sock: Optional[socket.socket], path: Optional[str],
+                           initializer: Optional[Callable[[], None]], shutdown_timeout: float,
+                           reuse_port: Optional[bool], handle_signals: bool, backlog: int,
+                           **serve_kwargs: Any) -> None:
+        """
+        Pre-fork the given number of worker processes serving this app and supervise them until stopped (through
+        shutdown, cancellation, or a TERM/INT signal if handle_signals is True)
+        """
+        bound_sock = None
+        if reuse_port:
+            # each worker binds its own socket to the same port and the kernel balances connections among them
+            serve_kwargs.update(host=host, port=port, reuse_port=True)
+        else:
+            if sock is None:
+                sock = bound_sock = self._bind_socket(host=host, port=port, path=path, backlog=backlog)
+            serve_kwargs.update(sock=sock)
+        context = multiprocessing.get_context('fork')
+        loop = asyncio.get_running_loop()
+        self._workers_stop = asyncio.Event()
+
+        def spawn(index: int) -> multiprocessing.Process:
+            proc = context.Process(target=self._serve_worker, name=f"bantam-worker-{index}", daemon=True,
+                                   kwargs=dict(serve_kwargs, initializer=initializer, backlog=backlog,
+                                               shutdown_timeout=shutdown_timeout))
+            # forked from the thread running this loop, which does nothing but supervise workers, and not from a pool
+            # thread: locks held by other threads at the time of the fork would stay locked for good in the worker
+            # (the worker runs a loop of its own, as asyncio does not see the loop running here from another process)
+            proc.start()
+            log.debug(f"Started worker {proc.name} with pid {proc.pid}")
+            return proc
+
+        signals = (signal.SIGINT, signal.SIGTERM) if handle_signals else ()
+        for sig in signals:
+            loop.add_signal_handler(sig, self._workers_stop.set)
+        self._workers = [spawn(index) for index in range(workers)]
+        try:
+            while not self._workers_stop.is_set():
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._workers_stop.wait(), self.WORKER_SUPERVISION_INTERVAL)
+                for index, proc in enumerate(self._workers):
+                    if not proc.is_alive() and not self._workers_stop.is_set():
+                        log.error(f"Worker {proc.name} (pid {proc.pid}) exited with code {proc.exitcode}; restarting")
+                        self._workers[index] = spawn(index)
+        finally:
+            for sig in signals:
+                loop.remove_signal_handler(sig)
+            await self._stop_workers(shutdown_timeout)
+            if bound_sock is not None:
+                bound_sock.close()
+
+    async def _stop_workers(self, shutdown_timeout: float) -> None:
+        """
+        Gracefully stop all workers, killing any that have not exited after shutdown_timeout seconds
+        """
+        loop = asyncio.get_running_loop()
+        for proc in self._workers:
+            if proc.is_alive():
+                proc.terminate()  # TERM is handled by each worker as a graceful exit
+        deadline = loop.time() + shutdown_timeout
+        for proc in self._workers:
+            await loop.run_in_executor(None, proc.join, max(0.0, deadline - loop.time()))
+            if proc.is_alive():
+                log.error(f"Worker {proc.name} (pid {proc.pid}) failed to shut down in time; killing")
+                proc.kill()
+                await loop.run_in_executor(None, proc.join)
+        self._workers = []
+
+    @staticmethod
+    def _bind_socket(host: Optional[str], port: Optional[int], path: Optional[str], backlog: int) -> socket.socket:
+        """
+        :return: a listening socket to be inherited by all worker processes
+        """
+        if path is not None:
+            if host is not None or port is not None:
+                raise ValueError("Cannot specify both TCP and UNIX domain socket parameters")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(path)
+            sock.listen(backlog)
+            return sock
+        family = socket.getaddrinfo(host, None)[0][0] if host else socket.AF_INET
+        return socket.create_server((host or '', port or 8080), family=family, backlog=backlog)
+
+    def _serve_worker(self, initializer: Optional[Callable[[], None]], **serve_kwargs: Any) -> None:
+        """
+        Entry point of a forked worker process: run a fresh event loop serving this app until told to exit
+        """
+        with suppress(ValueError):
+            signal.set_wakeup_fd(-1)
+        self._workers = []
+        self._workers_stop = None
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        async def serve():
+            from aiohttp.web import _run_app as web_run_app
+            # noinspection PyProtectedMember
+            self._main_task = asyncio.create_task(self.MainThread.main(initializer, self._dispatch_mode))
+            await web_run_app(app=self._web_app, handle_signals=True, **serve_kwargs)
+
+        try:
+            loop.run_until_complete(serve())
+        finally:
+            loop.close()
 
     async def shutdown(self) -> None:
         """
         Shutdown this server
         """
+        if self._workers_stop is not None:
+            # parent of worker processes: the workers own the serving app
+            self._workers_stop.set()
+            return
         if self._main_task is not None:
             self._main_task.cancel()
         if self._started:
@@ -494,19 +1340,14 @@ class WebApplication:
             await self._web_app.shutdown()
             self._started = False
 
-    # noinspection PyProtectedMember
     @classmethod
-    def get_context(cls):
-        i = 1
-        frame = sys._getframe(i)
-        try:
-            # with debuggers, stack is polluted, so....
-            while frame not in WebApplication._context:
-                i += 1
-                frame = sys._getframe(i)
-        except IndexError:
-            return None
-        return WebApplication._context[frame].headers
+    def get_context(cls) -> Optional[Mapping[str, str]]:
+        """
+        :return: the headers of the request being serviced by the calling web api (also available to any tasks that
+           web api creates), or None if not called in the context of a request
+        """
+        request = _request_context.get()
+        return request.headers if request is not None else None
 
     # noinspection PyProtectedMember
     def _process_module_classes(self, mod: types.ModuleType, api: API):
@@ -521,14 +1362,14 @@ class WebApplication:
                 if kwargs.get('__uuid') or (create_api.uuid_param is not None and create_api.uuid_param in kwargs):
                     self_id = kwargs[create_api.uuid_param] if create_api.uuuid_param is not None else kwargs['__uuid']
                     del kwargs['__uuid']
-                    if self_id in self.ObjectRepo.instances:
+                    if self_id in self.ObjectRepo.instances or self_id in self.ObjectRepo.spilled:
                         raise HTTPException(404, f"UUid {self_id} already in use. uuid's must be unique")
                 else:
                     self_id = str(uuid_pkg.uuid4())
                 instance = clazz_(*args, **kwargs)
                 if hasattr(clazz_, '__aenter__'):
                     await instance.__aenter__()
-                self.ObjectRepo.instances[self_id] = instance
+                await self.ObjectRepo.add(self_id, instance)
                 return instance
 
             clazz_._create = _create
@@ -575,12 +1416,7 @@ class WebApplication:
                 self_id = self.ObjectRepo.by_instance.get(this)
                 if self_id not in self.ObjectRepo.instances:
                     raise HTTPException(code=404, msg=f"No such object with id {self_id}")
-                self.ObjectRepo.expiry[self_id].cancel()
-                if self.ObjectRepo.instances and new_lease_time <= 0:
-                    await self.ObjectRepo.expire_obj(self_id, 0)
-                else:
-                    self.ObjectRepo.expiry[self_id] = asyncio.create_task(
-                        self.ObjectRepo.expire_obj(self_id, new_lease_time))
+                await self.ObjectRepo.expire_obj(self_id, new_lease_time)
 
             clazz_._expire = _expire
             clazz_._expire.__doc__ = _expire.__doc__
@@ -613,9 +1449,7 @@ class WebApplication:
                             return await api._func(this, *args, **kwargs)
                         finally:
                             if this in self.ObjectRepo.by_instance:
-                                uuid = self.ObjectRepo.by_instance[this]
-                                del self.ObjectRepo.by_instance[this]
-                                del self.ObjectRepo.instances[uuid]
+                                self.ObjectRepo.discard(self.ObjectRepo.by_instance[this])
 
                     setattr(clazz, api.name, wrapped)
             elif method_found and api in self._all_apis:
@@ -636,7 +1470,17 @@ class WebApplication:
                       timeout: Optional[ClientTimeout] = None,
                       uuid_param: Optional[str] = None,
                       preprocess: Optional[PreProcessor] = None,
-                      postprocess: Optional[PostProcessor] = None) -> WebApi:
+                      postprocess: Optional[PostProcessor] = None,
+                      max_concurrency: Optional[int] = None,
+                      deadline: Optional[float] = None,
+                      first_item_timeout: Optional[float] = None,
+                      idle_timeout: Optional[float] = None,
+                      stream_buffer_size: Optional[int] = None,
+                      stream_flush_delay: Optional[float] = None,
+                      compress: Optional[bool] = None,
+                      compress_min_size: Optional[int] = None,
+                      cache_ttl: Optional[float] = None,
+                      cache_size: Optional[int] = None) -> WebApi:
         """
         Wraps a function as called from decorators.web_api to set up logic to invoke get or post requests
 
@@ -646,7 +1490,11 @@ class WebApplication:
         """
         api = API(clazz, func, method=method, content_type=content_type, is_instance_method=is_instance_method,
                   is_class_method=is_class_method, on_disconnect=on_disconnect,
-                  is_constructor=is_constructor, expire_on_exit=expire_on_exit, uuid_param=uuid_param, timeout=timeout)
+                  is_constructor=is_constructor, expire_on_exit=expire_on_exit, uuid_param=uuid_param, timeout=timeout,
+                  max_concurrency=max_concurrency, deadline=deadline, first_item_timeout=first_item_timeout,
+                  idle_timeout=idle_timeout, stream_buffer_size=stream_buffer_size,
+                  stream_flush_delay=stream_flush_delay, compress=compress, compress_min_size=compress_min_size,
+                  cache_ttl=cache_ttl, cache_size=cache_size)
         func._bantam_web_api = api
         if hasattr(func, '__func__'):
             func.__func__._bantam_web_api = api
@@ -664,9 +1512,13 @@ class WebApplication:
             return func
 
         async def invoke(app: WebApplication, request: Request):
+            route_metrics = app._metrics.route(route) if app._metrics is not None else None
+            dispatched_at: Optional[float] = None
 
             async def invoke_proper():
                 nonlocal preprocess, postprocess
+                if dispatched_at is not None:
+                    request[WebApplication.QUEUE_WAIT_KEY] += time.perf_counter() - dispatched_at
                 try:
                     preprocess = preprocess or app.preprocessor
                     try:
@@ -679,12 +1531,16 @@ class WebApplication:
                     if method == RestMethod.GET:
                         # noinspection PyProtectedMember
                         response = await cls._invoke_get_api_wrapper(
-                            api, content_type=content_type, request=request, **addl_args
+                            api, content_type=content_type, request=request,
+                            timeouts=api.handler_timeouts(app._handler_deadline),
+                            compress_min_size=api.compress_min_size(app._compress_min_size), **addl_args
                         )
                     elif method == RestMethod.POST:
                         # noinspection PyProtectedMember
                         response = await cls._invoke_post_api_wrapper(
-                            api, content_type=content_type, request=request, **addl_args
+                            api, content_type=content_type, request=request,
+                            timeouts=api.handler_timeouts(app._handler_deadline),
+                            compress_min_size=api.compress_min_size(app._compress_min_size), **addl_args
                         )
                     else:
                         raise ValueError(f"Unknown method {method} in @web-api")
@@ -698,6 +1554,8 @@ class WebApplication:
                         await resp_.prepare(request)
                         return resp_
                     return response
+                except WebApplication.HandlerTimeout as e:
+                    return await response_from_exception(request, code=504, reason=str(e))
                 except PermissionError as e:
                     return await response_from_exception(
                         code=401,
@@ -726,14 +1584,48 @@ class WebApplication:
                         code=500,
                         reason=f"General exception when processing request: {str(e)}"
                     )
-            resp_q = asynciomultiplexer.AsyncAdaptorQueue(1)
-            await cls.MainThread.start(invoke_proper(), resp_q)
-            resp = await resp_q.get()
-            if isinstance(resp, Exception):
-                raise resp
-            return resp
+
+            async def serve():
+                nonlocal dispatched_at
+                try:
+                    admitted, request[WebApplication.QUEUE_WAIT_KEY] = await app._admit(api)
+                except AdmissionRejected as e:
+                    return Response(status=503, text=str(e), headers={'Retry-After': str(e.retry_after)})
+                try:
+                    if route_metrics is not None:
+                        dispatched_at = time.perf_counter()
+                    if app._dispatch_mode == WebApplication.DispatchMode.DIRECT:
+                        return await cls.MainThread.dispatch(invoke_proper())
+                    resp_q = asynciomultiplexer.AsyncAdaptorQueue(1)
+                    await cls.MainThread.start(invoke_proper(), resp_q)
+                    resp = await resp_q.get()
+                    if isinstance(resp, Exception):
+                        raise resp
+                    return resp
+                finally:
+                    for limiter in admitted:
+                        limiter.release()
+
+            if route_metrics is None:
+                return await serve()
+            received_at = time.perf_counter()
+            route_metrics.requests += 1
+            route_metrics.in_flight += 1
+            response = None
+            try:
+                response = await serve()
+                return response
+            finally:
+                route_metrics.in_flight -= 1
+                route_metrics.record(status=response.status if response is not None else 500,
+                                     latency=time.perf_counter() - received_at,
+                                     queue_wait=request.get(WebApplication.QUEUE_WAIT_KEY, 0.0),
+                                     request_bytes=request.content_length or 0,
+                                     response_bytes=response.body_length if response is not None else 0,
+                                     stream_items=request.get(WebApplication.STREAM_ITEMS_KEY))
 
         invoke.clazz = WebApplication._instance_methods_class_map.get(api) if is_instance_method else None
+        invoke.preprocess = preprocess
         if method == RestMethod.GET:
             # noinspection PyProtectedMember
             WebApplication.register_route_get(route, invoke, api, api._real_func.__module__)
@@ -744,8 +1636,50 @@ class WebApplication:
             raise ValueError(f"Unknown method {method} in @web-api")
         return func
 
+    @classmethod
+    async def _respond_incrementally(cls, api: API, request: Request, content_type: str, result: Any,
+                                     cleanup_args: Tuple[Any, ...],
+                                     compress_min_size: Optional[int] = None) -> StreamResponse:
+        """
+        Respond with the json image of a large result, written in chunks of bounded size as it is encoded, so that
+        neither time to first byte nor memory held grows with the size of the result
+
+        :param cleanup_args: arguments to the api's on_disconnect callback should the client disconnect
+        :param compress_min_size: None to not compress the response, else compress it if the client accepts it (the
+           response being large by definition)
+        """
+        response = StreamResponse(status=200, reason='OK')
+        response.content_type = content_type
+        coding = negotiate(request.headers.get('Accept-Encoding', '')) if compress_min_size is not None else None
+        if coding is not None:
+            response.enable_compression(ContentCoding(coding))
+        buffer = bytearray()
+        try:
+            for piece in iter_json(result, cls.INCREMENTAL_JSON_MIN_ITEMS):
+                buffer += piece
+                if len(buffer) >= cls.INCREMENTAL_JSON_BUFFER_SIZE:
+                    if not response.prepared:
+                        await response.prepare(request)
+                    await response.write(bytes(buffer))
+                    buffer.clear()
+            if not response.prepared:
+                await response.prepare(request)
+            if buffer:
+                await response.write(bytes(buffer))
+            await response.write_eof()
+        except ConnectionError:
+            await _call_on_disconnect(api, *cleanup_args)
+            raise
+        except Exception as e:
+            if not response.prepared:
+                raise
+            log.error(f"Exception encoding response to {api.name}; response truncated: {e}")
+        return response
+
     @classmethod
     async def _invoke_get_api_wrapper(cls, api: API, content_type: str, request: Request,
+                                      timeouts: HandlerTimeouts = HandlerTimeouts(),
+                                      compress_min_size: Optional[int] = None,
                                       **addl_args: Any) -> Union[Response, StreamResponse]:
         """
         Invoke the underlying GET web API from given request.  Called as part of setup in cls._func_wrapper
@@ -753,31 +1687,28 @@ class WebApplication:
         :param func:  async function to be called
         :param content_type: http header content-type
         :param request: request to be processed
+        :param timeouts: server-side limits on servicing the request
+        :param compress_min_size: minimum size of response to compress, if the client accepts it; None to not compress
         :return: http response object
         """
-        # noinspection PyUnresolvedReferences,PyProtectedMember
-        cls._context[sys._getframe(0)] = request
+        context_token = _request_context.set(request)
         if api.has_streamed_request:
             raise TypeError("GET web_api methods does not support streaming requests")
         try:
-            encoding = 'utf-8'
-            items = content_type.split(';')
-            for item in items:
-                item = item.lower()
-                if item.startswith('charset='):
-                    encoding = item.replace('charset=', '')
+            plan = api.plan
             # report first param that doesn't match the Python signature:
-            for k in [p for p in request.query if p not in api.arg_annotations and p != 'self']:
-                resp = Response(
-                    status=400,
-                    text=f"No such parameter or missing type hint for param {k} in method {api.qualname}"
-                )
-                await resp.prepare(request)
-                return resp
+            for k in request.query:
+                if k not in plan.allowed_params:
+                    resp = Response(
+                        status=400,
+                        text=f"No such parameter or missing type hint for param {k} in method {api.qualname}"
+                    )
+                    await resp.prepare(request)
+                    return resp
 
             # convert incoming str values to proper type:
-            kwargs = {k: _convert_request_param(v, api.arg_annotations[k]) if k != 'self' else v
-                      for k, v in request.query.items()}
+            decoders = plan.query_decoders
+            kwargs = {k: decoders[k](v) if k != 'self' else v for k, v in request.query.items()}
             if addl_args:
                 kwargs.update(addl_args)
             if api.is_instance_method:
@@ -786,23 +1717,23 @@ class WebApplication:
                 if self_id is None:
                     raise ValueError(
                         "A self request parameter is needed. No instance provided for call to instance method")
-                instance = cls.ObjectRepo.instances.get(self_id)
+                instance = await cls.ObjectRepo.lookup(self_id)
                 if instance is None:
                     raise ValueError(f"No instance found for request with 'self' id of {self_id}")
                 del kwargs['self']
-                kwargs, varargs = api.update_varargs(kwargs)
+                kwargs, varargs = plan.bind(kwargs)
                 result = api(instance, *varargs, **kwargs)
             elif api.is_class_method:
                 if isinstance(api.clazz, tuple):
                     module_name, class_name = api.clazz
                     api._clazz = getattr(sys.modules.get(module_name), class_name)
-                kwargs, varargs = api.update_varargs(kwargs)
+                kwargs, varargs = plan.bind(kwargs)
                 if 'cls' not in kwargs:
                     result = api(api.clazz, *varargs, **kwargs)
                 else:
                     result = api(*varargs, **kwargs)
             else:
-                kwargs, varargs = api.update_varargs(kwargs)
+                kwargs, varargs = plan.bind(kwargs)
                 # call the underlying function:
                 result = api(*varargs, **kwargs)
             if inspect.isasyncgen(result):
@@ -811,33 +1742,37 @@ class WebApplication:
                 #################
                 # underlying function has yielded a result rather than turning
                 # process the yielded value and allow execution to resume from yielding task
-                content_type = "text-streamed; charset=x-user-defined"
+                content_type, encode = _stream_encoding(api, plan, request, "text-streamed; charset=x-user-defined")
                 response = StreamResponse(status=200, reason='OK', headers={'Content-Type': content_type})
+                writer = _StreamWriter(response, api.stream_buffering,
+                                       _stream_compressor(response, request, compress_min_size))
                 prepared = False
+                res = None
+                count = 0
                 # iterate to get the one (and hopefully only) yielded element:
                 # noinspection PyTypeChecker
                 try:
-                    async for res in result:
+                    async for res in _iterate_with_timeouts(api, result, timeouts):
                         if not prepared:
                             await response.prepare(request)
                             prepared = True
                             # This is done post-await of first result in cas of exception right off the bat
                         try:
-                            serialized = _serialize_return_value(res, encoding)
-                            if not isinstance(res, bytes):
-                                serialized += b'\0'
-                            await response.write(serialized)
+                            serialized = encode(res)
+                            await writer.write(serialized)
+                            count += 1
                         except (CancelledError, ConnectionResetError, ClientConnectionError):
-                            if api.on_disconnect is not None:
-                                if inspect.iscoroutinefunction(api.on_disconnect) or\
-                                    (hasattr(api.on_disconnect, '__func__') and
-                                     inspect.iscoroutinefunction(api.on_disconnect.__func__)):
-                                    await api.on_disconnect(res)
-                                else:
-                                    api.on_disconnect(res)
+                            await _call_on_disconnect(api, res)
                             raise
                 except (CancelledError, ConnectionError, ClientConnectionError):
                     raise
+                except WebApplication.HandlerTimeout as e:
+                    await _call_on_disconnect(api, res)
+                    if not prepared:
+                        response.set_status(504, reason=str(e))
+                        await response.prepare(request)
+                    else:
+                        log.error(str(e))
                 except Exception as e:
                     if not prepared:
                         response.set_status(400, reason=f"Exception in request: {str(e)}")
@@ -845,15 +1780,17 @@ class WebApplication:
                     else:
                         log.error(f"Exception in server-side logic handling request: {str(e)}")
                 finally:
+                    request[WebApplication.STREAM_ITEMS_KEY] = count
                     if not prepared:  # nothing generated in this case, but still a 200
                         await response.prepare(request)
+                    await writer.close()
                     await response.write_eof()
                     return response
             else:
                 #################
                 #  regular response
                 #################
-                result = await result
+                result = await _await_within(api, result, timeouts.deadline, None)
                 instance = result
                 if api.is_constructor:
                     if api.clazz and hasattr(api.clazz, '__aenter__'):
@@ -866,33 +1803,41 @@ class WebApplication:
                     else:
                         uuid = kwargs.get(api.uuid_param, str(uuid_pkg.uuid4()))
                         result = json.dumps({'uuid': uuid})
-                    cls.ObjectRepo.instances[uuid] = instance
-                    cls.ObjectRepo.by_instance[instance] = uuid
-                    cls.ObjectRepo.expiry[uuid] = asyncio.create_task(cls.ObjectRepo.expire_obj(
-                        uuid, cls.ObjectRepo.DEFAULT_OBJECT_EXPIRATION))
+                    await cls.ObjectRepo.add(uuid, instance)
+                elif plan.response_content_type is None and _accepts_msgpack(api, request):
+                    result = to_msgpack(result)
+                    content_type = MSGPACK
+                elif plan.response_content_type is None and plan.encoding == 'utf-8' and \
+                        is_large_json(result, cls.INCREMENTAL_JSON_MIN_ITEMS):
+                    return await cls._respond_incrementally(api, request, content_type, result, (result,),
+                                                            compress_min_size)
                 else:
-                    result = _serialize_return_value(result, encoding)
-                resp = Response(status=200, body=result if result is not None else b"Success",
-                                content_type=content_type)
+                    result = plan.serialize_response(result)
+                    content_type = plan.response_content_type or content_type
+                body = result if result is not None else b"Success"
+                headers = None
+                if api.client_caching is not None:
+                    # tagged so that clients revalidating a cached response need not be sent it again if unchanged
+                    etag = _entity_tag(body)
+                    if _not_modified(request, etag):
+                        return Response(status=304, headers={'ETag': etag})
+                    headers = {'ETag': etag}
+                resp = Response(status=200, body=body, content_type=content_type, headers=headers)
+                _compress_response(resp, request, compress_min_size)
                 await resp.prepare(request)
                 try:
                     await resp.write_eof()
                 except ConnectionError:
-                    if api.on_disconnect is not None:
-                        if inspect.iscoroutinefunction(api.on_disconnect) or \
-                                (hasattr(api.on_disconnect, '__func__') and
-                                 inspect.iscoroutinefunction(api.on_disconnect.__func__)):
-                            await api.on_disconnect(result)
-                        else:
-                            api.on_disconnect(result)
+                    await _call_on_disconnect(api, result)
                     raise
                 return resp
         finally:
-            # noinspection PyUnresolvedReferences,PyProtectedMember
-            del cls._context[sys._getframe(0)]
+            _request_context.reset(context_token)
 
     @classmethod
     async def _invoke_post_api_wrapper(cls, api: API, content_type: str, request: Request,
+                                       timeouts: HandlerTimeouts = HandlerTimeouts(),
+                                       compress_min_size: Optional[int] = None,
                                        **addl_args: Any) -> Union[Response, StreamResponse]:
         """
         Invoke the underlying POST web API from given request. Called as part of setup in cls._func_wrapper
@@ -900,6 +1845,8 @@ class WebApplication:
         :param api:  API wrapping async function to be called
         :param content_type: http header content-type
         :param request: request to be processed
+        :param timeouts: server-side limits on servicing the request
+        :param compress_min_size: minimum size of response to compress, if the client accepts it; None to not compress
         :return: http response object
         """
 
@@ -923,79 +1870,74 @@ class WebApplication:
 
             return iterator
 
-        # noinspection PyUnresolvedReferences,PyProtectedMember
-        cls._context[sys._getframe(0)] = request
-        encoding = 'utf-8'
-        items = content_type.split(';')
-        for item in items:
-            if item.startswith('charset='):
-                encoding = item.replace('charset=', '')
+        context_token = _request_context.set(request)
+        plan = api.plan
         if not request.can_read_body:
             raise TypeError("Cannot read body for request in POST operation")
         try:
-            kwargs: Dict[str, Any] = {}
-            if api.has_streamed_request:
-                key, typ = list(api.async_arg_annotations.items())[0]
+            json_decoders = plan.json_decoders
+            if plan.streamed_param is not None:
+                key = plan.streamed_param
+                typ = api.async_arg_annotations[key]
+                kwargs: Dict[str, Any] = {}
                 if typ == bytes:
                     kwargs = {key: await request.read()}
                 elif typ == AsyncLineIterator:
                     kwargs = {key: line_by_line_response(request)}
                 elif typ == AsyncChunkIterator:
                     kwargs = {key: streamed_bytes_arg_value(request)}
-                for k, v in kwargs.items():
-                    assert type(v) == str, f"key {k}={v} is of type {str(type(v))}\n{kwargs}"
-                kwargs.update({k: _convert_request_param(v, api.synchronous_arg_annotations[k]) if k != 'self' else v
-                               for k, v in request.query.items() if k in api.synchronous_arg_annotations})
+                # remaining parameters are sent as query parameters in this case:
+                query_decoders = plan.query_decoders
+                kwargs.update({k: query_decoders[k](v) if k != 'self' else v
+                               for k, v in request.query.items() if k == 'self' or k in query_decoders})
             else:
                 # treat payload as json string:
                 bytes_response = await request.read()
-                json_dict = json.loads(bytes_response.decode('utf-8'))
-                for k in [p for p in json_dict if p not in api.arg_annotations and p != 'self']:
-                    resp = Response(
-                        status=400,
-                        text=f"No such parameter or missing type hint for param {k} in method {api.qualname}"
-                    )
-                    await resp.prepare(request)
-                    return resp
+                if request.content_type == MSGPACK:
+                    json_dict = from_msgpack(bytes_response)
+                else:
+                    json_dict = get_backend().loads(bytes_response)
+                for k in json_dict:
+                    if k not in plan.allowed_params:
+                        resp = Response(
+                            status=400,
+                            text=f"No such parameter or missing type hint for param {k} in method {api.qualname}"
+                        )
+                        await resp.prepare(request)
+                        return resp
 
-                # convert incoming str values to proper type:
-                kwargs.update(dict(json_dict))
+                # convert incoming json values to proper type:
+                kwargs = {k: json_decoders[k](v) if k != 'self' else v for k, v in json_dict.items()}
             # call the underlying function:
             if addl_args:
-                kwargs.update(addl_args)
-            for k, v in kwargs.items():
-                if k != 'self':
-                    value_type = api.arg_annotations[k]
-                    kwargs[k] = normalize_from_json(v, value_type)
-                else:
-                    kwargs[k] = v
+                kwargs.update({k: json_decoders[k](v) for k, v in addl_args.items()})
             if api.is_instance_method:
                 self_id = kwargs.get('self')
                 if self_id is None:
                     raise ValueError("No instance provided for call to instance method")
-                instance = cls.ObjectRepo.instances.get(self_id)
+                instance = await cls.ObjectRepo.lookup(self_id)
                 if instance is None:
                     try:
                         self_id = json.loads(self_id)['uuid']
-                        instance = cls.ObjectRepo.instances.get(self_id)
+                        instance = await cls.ObjectRepo.lookup(self_id)
                         if instance is None:
                             raise ValueError(f"No instance id found for request {self_id}")
                     except Exception:
                         raise ValueError(f"Error in json representation of an instance: {self_id}")
                 del kwargs['self']
-                kwargs, varargs = api.update_varargs(kwargs)
+                kwargs, varargs = plan.bind(kwargs)
                 awaitable = api(instance, *varargs, **kwargs)
                 if api.expire_object:
-                    del cls.ObjectRepo.instances[self_id]
+                    cls.ObjectRepo.discard(self_id)
             elif api.is_class_method:
 
                 if isinstance(api.clazz, tuple):
                     module_name, class_name = api.clazz
                     api._clazz = getattr(sys.modules.get(module_name), class_name)
-                kwargs, varargs = api.update_varargs(kwargs)
+                kwargs, varargs = plan.bind(kwargs)
                 awaitable = api(api.clazz, *varargs, **kwargs)
             else:
-                kwargs, varargs = api.update_varargs(kwargs)
+                kwargs, varargs = plan.bind(kwargs)
                 awaitable = api(*varargs, **kwargs)
             if inspect.isasyncgen(awaitable):
                 #################
@@ -1004,51 +1946,51 @@ class WebApplication:
                 # underlying function has yielded a result rather than turning
                 # process the yielded value and allow execution to resume from yielding task
                 # async_q = asyncio.Queue()
-                content_type = "text/streamed; charset=x-user-defined"
+                content_type, encode = _stream_encoding(api, plan, request, "text/streamed; charset=x-user-defined")
                 response = StreamResponse(status=200, reason='OK', headers={'Content-Type': content_type})
+                writer = _StreamWriter(response, api.stream_buffering,
+                                       _stream_compressor(response, request, compress_min_size))
                 prepared = False
+                res = None
+                count = 0
                 try:
                     # iterate to get the one (and hopefully only) yielded element:
                     # noinspection PyTypeChecker
-                    count = 0
-                    async for res in awaitable:
+                    async for res in _iterate_with_timeouts(api, awaitable, timeouts):
                         try:
-                            serialized = _serialize_return_value(res, encoding)
-                            if not isinstance(res, bytes):
-                                serialized += b'\0'
+                            serialized = encode(res)
                             if not prepared:
                                 await response.prepare(request)
-                            await response.write(serialized)
+                                prepared = True
+                            await writer.write(serialized)
                             count += 1
                         except (CancelledError, ConnectionResetError, ClientConnectionError):
-                            if api.on_disconnect is not None:
-                                try:
-                                    # noinspection PyUnboundLocalVariable
-                                    args = (instance, res, ) if api.is_instance_method else (res, )
-                                    if inspect.iscoroutinefunction(api.on_disconnect) or\
-                                        (hasattr(api.on_disconnect, '__func__') and
-                                         inspect.iscoroutinefunction(api.on_disconnect.__func__)):
-                                        await api.on_disconnect(*args)
-                                    else:
-                                        api.on_disconnect(*args)
-                                except Exception as e:
-                                    print(f"ERROR in call to on_disconnect from bantam async generator: {e}")
+                            # noinspection PyUnboundLocalVariable
+                            await _call_on_disconnect(api, *((instance, res) if api.is_instance_method else (res,)))
                             break
                 except (CancelledError, ConnectionResetError, ClientConnectionError):
                     raise
+                except WebApplication.HandlerTimeout as e:
+                    await _call_on_disconnect(api, *((instance, res) if api.is_instance_method else (res,)))
+                    if not prepared:
+                        response.set_status(504, reason=str(e))
+                        await response.prepare(request)
+                    else:
+                        log.error(str(e))
                 except Exception as e:
                     logging.error(str(e))
                     if not prepared:
                         response = Response(status=400, reason=f"Exception in servicing request: {e}",
                                             body=f"Exception in servicing request: {e}")
                         await response.prepare(request)
-                    else:
-                        await response.write(f"Exception in server-side logic: {e}".encode('utf-8'))
-                        with suppress(Exception):
-                            await response.write_eof()
+                    elif content_type not in (FRAMED, MSGPACK):
+                        # framed and MessagePack streams are just ended: the text would be read as a malformed item
+                        await writer.write(f"Exception in server-side logic: {e}".encode('utf-8'))
                 finally:
+                    request[WebApplication.STREAM_ITEMS_KEY] = count
                     if not prepared:
                         await response.prepare(request)
+                    await writer.close()
                     await response.write_eof()
                 return response
             else:
@@ -1056,7 +1998,7 @@ class WebApplication:
                 #  regular response
                 #################
                 if api.is_constructor:
-                    instance = await awaitable
+                    instance = await _await_within(api, awaitable, timeouts.deadline, None)
                     if api.clazz and hasattr(api.clazz, '__aenter__'):
                         await instance.__aenter__()
                     if hasattr(api.clazz, 'jsonrepr'):
@@ -1067,54 +2009,30 @@ class WebApplication:
                     else:
                         uuid = kwargs.get(api.uuid_param, str(uuid_pkg.uuid4()))
                         result = json.dumps({'uuid': uuid})
-                    cls.ObjectRepo.instances[uuid] = instance
-                    cls.ObjectRepo.by_instance[instance] = uuid
-                    cls.ObjectRepo.expiry[uuid] = asyncio.create_task(cls.ObjectRepo.expire_obj(
-                        uuid, cls.ObjectRepo.DEFAULT_OBJECT_EXPIRATION))
+                    await cls.ObjectRepo.add(uuid, instance)
                     resp = Response(status=200, body=result if result is not None else b"Success",
                                     content_type=content_type)
+                    _compress_response(resp, request, compress_min_size)
                     await resp.prepare(request)
                     return resp
                 else:
-                    result = _serialize_return_value(await awaitable, encoding)
+                    cleanup_args = (instance, None) if api.is_instance_method else (None,)
+                    result = await _await_within(api, awaitable, timeouts.deadline, *cleanup_args)
+                    if plan.response_content_type is None and _accepts_msgpack(api, request):
+                        result = to_msgpack(result)
+                        content_type = MSGPACK
+                    elif plan.response_content_type is None and plan.encoding == 'utf-8' and \
+                            is_large_json(result, cls.INCREMENTAL_JSON_MIN_ITEMS):
+                        return await cls._respond_incrementally(api, request, content_type, result,
+                                                                cleanup_args[:-1] + (result,), compress_min_size)
+                    else:
+                        result = plan.serialize_response(result)
+                        content_type = plan.response_content_type or content_type
                 resp = Response(status=200, body=result if result is not None else b"Success",
                                 content_type=content_type)
+                _compress_response(resp, request, compress_min_size)
                 await resp.prepare(request)
                 return resp
         finally:
-            # noinspection PyUnresolvedReferences,PyProtectedMember
-            del cls._context[sys._getframe(0)]
+            _request_context.reset(context_token)
 
-
-def _convert_request_param(value: str, typ: Type) -> Any:
-    """
-    Convert rest request string value for parameter to given Python type, returning an instance of that type
-
-    :param value: value to convert
-    :param typ: Python Type to convert to
-    :return: converted instance, of the given type
-    :raises: TypeError if value can not be converted/deserialized
-    """
-    try:
-        return from_str(value, typ)
-    except Exception as e:
-        text = traceback.format_exc()
-        raise TypeError(f"Converting web request string {value} of {type(value)} to Python type {typ}: {e}\n {text}")
-
-
-def _serialize_return_value(value: Any, encoding: str) -> bytes:
-    """
-    Serialize a Python value into bytes to return through a Rest API.  If a basic type such as str, int or float, a
-    simple str conversion is done, then converted to bytes.  If more complex, the conversion will invoke the
-    '__str__' method of the value, raising TypeError if such a method does not exist or does not have a bare
-    (no-parameter) signature.
-
-    :param value: value to convert
-    :return: bytes serialized from value
-    """
-    try:
-        if value is None:
-            return bytes()
-        return to_str(value).encode(encoding)
-    except Exception as e:
-        raise TypeError(f"Converting response '{value}' from Python type '{type(value)}' to string: {e}")
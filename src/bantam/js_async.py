@@ -89,12 +89,67 @@ class bantam_UUID{
 
 class bantam {
 
+    static FRAMED = 'application/x-bantam-framed';
+
     static split_string(str){
         let values = str.split('\\0');
         return [values.slice(0, -1), values.slice(-1)[0]];
         
     }
 
+    static is_framed(response){
+        return (response.headers.get('Content-Type') || '').startsWith(bantam.FRAMED);
+    }
+
+    static *read_frames(frames, chunk){
+        // yield each length-prefixed item completed by chunk; chunks of an incomplete item are held in frames.chunks
+        // and only combined (copied) once enough bytes have arrived to complete it
+        frames.chunks.push(chunk);
+        frames.size += chunk.length;
+        if (frames.size < frames.needed){
+            return;
+        }
+        let buffer = frames.chunks[0];
+        if (frames.chunks.length > 1){
+            buffer = new Uint8Array(frames.size);
+            let position = 0;
+            for (const pending of frames.chunks){
+                buffer.set(pending, position);
+                position += pending.length;
+            }
+        }
+        let offset = 0;
+        let needed = 0;
+        while (offset < buffer.length){
+            let length = 0;
+            let scale = 1;
+            let pos = offset;
+            let complete = false;
+            while (pos < buffer.length){
+                let byte = buffer[pos++];
+                length += (byte & 0x7f) * scale;
+                scale *= 128;
+                if ((byte & 0x80) === 0){
+                    complete = true;
+                    break;
+                }
+            }
+            if (!complete){
+                break;
+            }
+            if (pos + length > buffer.length){
+                needed = pos + length - offset;
+                break;
+            }
+            yield buffer.subarray(pos, pos + length);
+            offset = pos + length;
+        }
+        let rest = buffer.subarray(offset);
+        frames.chunks = rest.length > 0 ? [rest] : [];
+        frames.size = rest.length;
+        frames.needed = needed;
+    }
+
     static compute_query(param_map){
         let c = '?';
         let params = '';
@@ -128,9 +183,13 @@ class bantam {
 
     static async *fetch_GET_streamed(route, content_type, param_map, convert, return_is_bytes){
         let result = await fetch(route + bantam.compute_query(param_map),
-                                 {method:'GET', duplex: 'half', headers: {'Content-Type': content_type}});
+                                 {method:'GET', duplex: 'half',
+                                  headers: {'Content-Type': content_type, 'Accept': bantam.FRAMED}});
         let reader = await result.body.getReader();
         let left_over = "";
+        let framed = bantam.is_framed(result);
+        let frames = {chunks: [], size: 0, needed: 0};
+        let decoder = new TextDecoder();
         while (true){
             if (result.status < 200 || result.status > 299){
                 let statusBody = await reader.read();
@@ -142,7 +201,11 @@ class bantam {
             if (resp.done){
                 break;
             }
-            if (return_is_bytes){
+            if (framed){
+               for (const item of bantam.read_frames(frames, resp.value)){
+                   yield return_is_bytes ? item : convert(decoder.decode(item));
+               }
+            } else if (return_is_bytes){
                yield resp.value;
             } else {
                let value = new TextDecoder().decode(resp.value);
@@ -210,7 +273,7 @@ class bantam {
             });
             try{
                 body = await fetch(route + bantam.compute_query(param_map), {method:'POST',
-                                   duplex: 'half', headers: {'Content-Type': content_type},
+                                   duplex: 'half', headers: {'Content-Type': content_type, 'Accept': bantam.FRAMED},
                                    body: requestBody});
             } catch (error) {
                 if (error.message === 'Failed to fetch'){
@@ -219,11 +282,15 @@ class bantam {
                 throw error;
             }
         } else {
-            body = await fetch(route, {method:'POST', headers: {'Content-Type': content_type},
+            body = await fetch(route, {method:'POST',
+                                       headers: {'Content-Type': content_type, 'Accept': bantam.FRAMED},
                                        duplex: 'half', body: JSON.stringify(param_map)});
         }
         let reader = await body.body.getReader();
         let left_over = "";
+        let framed = bantam.is_framed(body);
+        let frames = {chunks: [], size: 0, needed: 0};
+        let decoder = new TextDecoder();
         while (true){
             if (body.status < 200 || body.status > 299){
                 let statusBody = await reader.read();
@@ -235,7 +302,11 @@ class bantam {
             if (resp.done){
                 break;
             }
-            if (return_is_bytes){
+            if (framed){
+               for (const item of bantam.read_frames(frames, resp.value)){
+                   yield return_is_bytes ? item : convert(decoder.decode(item));
+               }
+            } else if (return_is_bytes){
                yield resp.value;
             } else {
                let value = new TextDecoder().decode(resp.value);
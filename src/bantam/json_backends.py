@@ -0,0 +1,156 @@
+"""
+Pluggable engines for encoding and decoding json.
+
+By default the standard library's *json* module is used.  Faster engines are opted into by name:
+`orjson <https://github.com/ijl/orjson>`_ or `msgspec <https://jcristharif.com/msgspec/>`_, or 'auto' for the first of
+these installed.  Either of them encodes dataclasses, datetimes and UUIDs natively, without first normalizing values to
+plain dicts and lists, and all engines parse bytes directly, without a decode to str.  Values the faster engines cannot
+encode at all, such as integers beyond 64 bits, are encoded with the *json* module instead.  Note that the faster
+engines encode NaN and infinite floats as *null*, where the *json* module encodes them as *NaN* and *Infinity*, which
+is why they are not the default.  An engine is selected through the *json_backend* parameter of *WebApplication* or
+of *WebInterface.ClientEndpointMapping*, or with `set_default_backend`.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Type, Union
+
+Default = Callable[[Any], Any]
+
+
+class JsonBackend(ABC):
+    """
+    Interface to a json engine
+    """
+
+    name: str
+
+    @abstractmethod
+    def dumps(self, value: Any, default: Optional[Default] = None) -> bytes:
+        """
+        :param value: value to encode
+        :param default: function returning an encodable substitute for a value the engine cannot encode natively
+        :return: utf-8 encoded json image of value
+        :raises TypeError: if value cannot be encoded
+        """
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        :param data: json image to decode
+        :return: decoded value, of plain dicts, lists, str's, numbers, bools and None's
+        :raises ValueError: if data is not valid json
+        """
+
+
+class StdlibJsonBackend(JsonBackend):
+    """
+    Engine based on the standard library json module
+    """
+
+    name = 'json'
+
+    def dumps(self, value: Any, default: Optional[Default] = None) -> bytes:
+        return json.dumps(value, default=default).encode('utf-8')
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonBackend(JsonBackend):
+    """
+    Engine based on orjson
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, value: Any, default: Optional[Default] = None) -> bytes:
+        return self._orjson.dumps(value, default=default, option=self._option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecBackend(JsonBackend):
+    """
+    Engine based on msgspec
+    """
+
+    name = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self._msgspec = msgspec
+        self._encoders: Dict[Optional[Default], Any] = {}
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, value: Any, default: Optional[Default] = None) -> bytes:
+        encoder = self._encoders.get(default)
+        if encoder is None:
+            enc_hook = None
+            if default is not None:
+                def enc_hook(obj: Any) -> Any:
+                    # msgspec calls on the substitute again if it is still not encodable (e.g. a bool dict key)
+                    substitute = default(obj)
+                    if type(substitute) is type(obj):
+                        raise TypeError(f"Cannot encode value of type {type(obj)}")
+                    return substitute
+            encoder = self._encoders[default] = self._msgspec.json.Encoder(enc_hook=enc_hook)
+        try:
+            return encoder.encode(value)
+        except self._msgspec.EncodeError as e:
+            raise TypeError(str(e)) from e
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+
+BACKENDS: Dict[str, Type[JsonBackend]] = {
+    OrjsonBackend.name: OrjsonBackend,
+    MsgspecBackend.name: MsgspecBackend,
+    StdlibJsonBackend.name: StdlibJsonBackend,
+}
+
+_default: Optional[JsonBackend] = None
+
+
+def get_backend(backend: Union[str, JsonBackend, None] = None) -> JsonBackend:
+    """
+    :param backend: name of engine ('orjson', 'msgspec', 'json' or 'auto' for the fastest one installed), an engine
+       itself, or None for the default engine (the *json* module's, unless set otherwise with `set_default_backend`)
+    :return: requested engine
+    :raises ValueError: if the name is not one of a known engine
+    :raises ImportError: if the named engine is not installed
+    """
+    global _default
+    if isinstance(backend, JsonBackend):
+        return backend
+    if backend is None:
+        if _default is None:
+            _default = StdlibJsonBackend()
+        return _default
+    if backend == 'auto':
+        for clazz in BACKENDS.values():
+            try:
+                return clazz()
+            except ImportError:
+                continue
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown json backend '{backend}'; expected one of {', '.join(BACKENDS)} or 'auto'")
+    return BACKENDS[backend]()
+
+
+def set_default_backend(backend: Union[str, JsonBackend]) -> JsonBackend:
+    """
+    Set the engine used process-wide wherever one is not explicitly given
+
+    :param backend: name of engine or engine itself, as for `get_backend`
+    :return: the new default engine
+    """
+    global _default
+    _default = get_backend(backend)
+    return _default
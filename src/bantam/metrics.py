@@ -0,0 +1,141 @@
+"""
+Per-route request metrics, rendered in the Prometheus text exposition format.
+
+Collection is opt-in, through the *metrics_route* parameter of *WebApplication*.  All requests are serviced on a single
+loop, so the counters are plain attributes updated without locks, and histograms use a fixed, preallocated set of
+buckets; the cost per request is a handful of integer additions and one bisection per histogram.
+"""
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# upper bounds, in seconds, of the latency and queue wait histogram buckets (a final +Inf bucket is implied)
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                                      10.0)
+
+
+class Histogram:
+    """
+    Histogram of observed values over fixed buckets
+
+    :param buckets: ascending upper bounds of buckets
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def render(self, name: str, labels: str, out: List[str]) -> None:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        out.append(f'{name}_sum{{{labels}}} {self.sum}')
+        out.append(f'{name}_count{{{labels}}} {cumulative}')
+
+
+class RouteMetrics:
+    """
+    Metrics for a single route
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.requests = 0
+        self.in_flight = 0
+        self.responses: Dict[int, int] = {}  # by status code
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.stream_items = 0
+        self.stream_bytes = 0
+        self.latency = Histogram(buckets)
+        self.queue_wait = Histogram(buckets)
+
+    def record(self, status: int, latency: float, queue_wait: float, request_bytes: int, response_bytes: int,
+               stream_items: Optional[int]) -> None:
+        """
+        Record a completed request
+
+        :param status: HTTP status of the response
+        :param latency: seconds from receipt of the request to completion of the response
+        :param queue_wait: seconds the request spent waiting for admission and dispatch to its handler
+        :param request_bytes: size of the request body
+        :param response_bytes: size of the response body
+        :param stream_items: number of items streamed, if the response was streamed from an async generator
+        """
+        self.responses[status] = self.responses.get(status, 0) + 1
+        self.latency.observe(latency)
+        self.queue_wait.observe(queue_wait)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        if stream_items is not None:
+            self.stream_items += stream_items
+            self.stream_bytes += response_bytes
+
+
+class Metrics:
+    """
+    Registry of metrics for all routes of an application
+
+    :param buckets: upper bounds, in seconds, of latency and queue wait histogram buckets
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._buckets = tuple(buckets)
+        self.routes: Dict[str, RouteMetrics] = {}
+
+    def route(self, route: str) -> RouteMetrics:
+        """
+        :return: metrics for the given route, created on first use
+        """
+        metrics = self.routes.get(route)
+        if metrics is None:
+            metrics = self.routes[route] = RouteMetrics(self._buckets)
+        return metrics
+
+    def render(self, gauges: Sequence[Tuple[str, str, str, float]] = ()) -> str:
+        """
+        :param gauges: additional (name, type, help, value) samples to report, without labels
+        :return: all metrics in Prometheus text exposition format
+        """
+        out: List[str] = []
+        routes = sorted(self.routes.items())
+
+        def family(name: str, typ: str, help_: str) -> None:
+            out.append(f"# HELP {name} {help_}")
+            out.append(f"# TYPE {name} {typ}")
+
+        def per_route(name: str, typ: str, help_: str, attr: str) -> None:
+            family(name, typ, help_)
+            for route, metrics in routes:
+                out.append(f'{name}{{route="{route}"}} {getattr(metrics, attr)}')
+
+        per_route('bantam_requests_total', 'counter', 'Requests received', 'requests')
+        per_route('bantam_requests_in_flight', 'gauge', 'Requests currently being serviced', 'in_flight')
+        family('bantam_responses_total', 'counter', 'Responses sent, by status code')
+        for route, metrics in routes:
+            for status, count in sorted(metrics.responses.items()):
+                out.append(f'bantam_responses_total{{route="{route}",status="{status}"}} {count}')
+        per_route('bantam_request_bytes_total', 'counter', 'Bytes of request bodies received', 'request_bytes')
+        per_route('bantam_response_bytes_total', 'counter', 'Bytes of response bodies sent', 'response_bytes')
+        per_route('bantam_stream_items_total', 'counter', 'Items sent in streamed responses', 'stream_items')
+        per_route('bantam_stream_bytes_total', 'counter', 'Bytes sent in streamed responses', 'stream_bytes')
+        family('bantam_request_duration_seconds', 'histogram', 'Time to service requests')
+        for route, metrics in routes:
+            metrics.latency.render('bantam_request_duration_seconds', f'route="{route}"', out)
+        family('bantam_queue_wait_seconds', 'histogram', 'Time requests waited for admission and dispatch')
+        for route, metrics in routes:
+            metrics.queue_wait.render('bantam_queue_wait_seconds', f'route="{route}"', out)
+        for name, typ, help_, value in gauges:
+            family(name, typ, help_)
+            out.append(f"{name} {value}")
+        return '\n'.join(out) + '\n'
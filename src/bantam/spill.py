@@ -0,0 +1,95 @@
+"""
+Local stores for spilling idle server-side instances out of memory.
+
+A *WebApplication* given a *spill_store* serializes instances (created through constructor web_api's) that have been
+idle for longer than its *spill_idle_time* into that store, and transparently reloads them the next time they are
+referenced by a request.  By default instances are pickled; a class that needs custom logic can provide an instance
+method *spill(self) -> bytes* and a classmethod *restore(cls, data: bytes)* to do the conversion instead.
+"""
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Union
+from urllib.parse import quote
+
+PathLike = Union[Path, str]
+
+
+class SpillStore(ABC):
+    """
+    Interface for a store of serialized instances, keyed by instance id
+    """
+
+    @abstractmethod
+    def put(self, obj_id: str, data: bytes) -> None:
+        """
+        Store serialized instance, replacing any previously stored under the same id
+        """
+
+    @abstractmethod
+    def get(self, obj_id: str) -> Optional[bytes]:
+        """
+        :return: serialized instance stored under the given id, or None if there is none
+        """
+
+    @abstractmethod
+    def delete(self, obj_id: str) -> None:
+        """
+        Remove any serialized instance stored under the given id
+        """
+
+
+class SqliteSpillStore(SpillStore):
+    """
+    Store of serialized instances held in a single sqlite database file
+
+    :param path: path to the database file, created if it does not exist
+    """
+
+    def __init__(self, path: PathLike):
+        self._db = sqlite3.connect(str(path), isolation_level=None)
+        self._db.execute("CREATE TABLE IF NOT EXISTS spilled (obj_id TEXT PRIMARY KEY, data BLOB NOT NULL)")
+
+    def put(self, obj_id: str, data: bytes) -> None:
+        self._db.execute("INSERT OR REPLACE INTO spilled (obj_id, data) VALUES (?, ?)", (obj_id, data))
+
+    def get(self, obj_id: str) -> Optional[bytes]:
+        row = self._db.execute("SELECT data FROM spilled WHERE obj_id = ?", (obj_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def delete(self, obj_id: str) -> None:
+        self._db.execute("DELETE FROM spilled WHERE obj_id = ?", (obj_id,))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class DirectorySpillStore(SpillStore):
+    """
+    Store of serialized instances held one file per instance in a directory
+
+    :param path: path to the directory, created if it does not exist
+    """
+
+    def __init__(self, path: PathLike):
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, obj_id: str) -> Path:
+        return self._path.joinpath(quote(obj_id, safe=''))
+
+    def put(self, obj_id: str, data: bytes) -> None:
+        path = self._file(obj_id)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def get(self, obj_id: str) -> Optional[bytes]:
+        try:
+            return self._file(obj_id).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, obj_id: str) -> None:
+        self._file(obj_id).unlink(missing_ok=True)
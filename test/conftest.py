@@ -12,7 +12,6 @@ from bantam.http import WebApplication
 
 @pytest.fixture()
 def clear_web_app():
-    WebApplication._context= {}
     WebApplication._class_instance_methods = {}
     WebApplication._instance_methods_class_map= {}
     WebApplication._instance_methods = []
@@ -46,6 +46,51 @@ class RestAPIExampleAsyncInterface(WebInterface):
         constructor
         """
 
+    @classmethod
+    @web_api(content_type='text/json', method=RestMethod.GET, first_item_timeout=0.5, idle_timeout=0.2)
+    @abstractmethod
+    async def api_get_stalled_stream(cls, stall_after: int) -> AsyncIterator[int]:
+        """
+        :param stall_after: number of items to produce before stalling
+        :return: stream of int
+        """
+
+    @classmethod
+    @web_api(content_type='application/json', method=RestMethod.GET)
+    @abstractmethod
+    async def api_get_squares(cls, count: int) -> Dict[str, List[int]]:
+        """
+        :param count: number of squares
+        :return: mapping of number, as str, to it and its square
+        """
+
+    @classmethod
+    @web_api(content_type='application/json', method=RestMethod.GET, cache_ttl=0.5, cache_size=2)
+    @abstractmethod
+    async def api_get_reference(cls, key: str) -> Dict[str, str]:
+        """
+        :param key: key of reference data
+        :return: reference data for key
+        """
+
+    @classmethod
+    @web_api(content_type='text/plain', method=RestMethod.GET, max_concurrency=1)
+    @abstractmethod
+    async def api_get_slow(cls, delay: float) -> str:
+        """
+        :param delay: seconds to take servicing request
+        :return: "done"
+        """
+
+    @classmethod
+    @web_api(content_type='text/plain', method=RestMethod.GET)
+    @abstractmethod
+    async def api_get_context_header(cls, name: str) -> str:
+        """
+        :param name: name of request header
+        :return: value of that header, as seen from a task spawned by the web api
+        """
+
     @classmethod
     @web_api(content_type='text/plain', method=RestMethod.GET)
     @abstractmethod
@@ -76,6 +121,16 @@ class RestAPIExampleAsyncInterface(WebInterface):
         """
         yield None  # not called as abstract, but tells Python this is an async generator
 
+    @classmethod
+    @web_api(content_type='text/json', method=RestMethod.GET, stream_buffer_size=16, stream_flush_delay=0.05)
+    @abstractmethod
+    async def api_get_stream_buffered(cls, count: int) -> AsyncIterator[int]:
+        """
+        :param count: number of items to stream
+        :return: stream of int, coalesced into fewer writes
+        """
+        yield None  # not called as abstract, but tells Python this is an async generator
+
     @classmethod
     @web_api(content_type='text/json', method=RestMethod.GET)
     @abstractmethod
@@ -200,6 +255,70 @@ class RestAPIExampleAsync(RestAPIExampleAsyncInterface):
     async def explicit_constructor(cls, val: int) -> "RestAPIExampleAsync":
         return RestAPIExampleAsync(val)
 
+    stalled_cleanup: List[Optional[int]] = []
+
+    @classmethod
+    async def _stalled(cls, last_item: Optional[int]) -> None:
+        cls.stalled_cleanup.append(last_item)
+
+    @classmethod
+    @web_api(content_type='text/json', method=RestMethod.GET, first_item_timeout=0.5, idle_timeout=0.2,
+             on_disconnect=lambda last_item: RestAPIExampleAsync._stalled(last_item))
+    async def api_get_stalled_stream(cls, stall_after: int) -> AsyncIterator[int]:
+        """
+        :param stall_after: number of items to produce before stalling
+        :return: stream of int
+        """
+        for index in range(stall_after):
+            yield index
+        await asyncio.sleep(10)
+        yield stall_after
+
+    @classmethod
+    @web_api(content_type='application/json', method=RestMethod.GET)
+    async def api_get_squares(cls, count: int) -> Dict[str, List[int]]:
+        """
+        :param count: number of squares
+        :return: mapping of number, as str, to it and its square
+        """
+        return {str(index): [index, index * index] for index in range(count)}
+
+    reference_calls: List[str] = []
+
+    @classmethod
+    @web_api(content_type='application/json', method=RestMethod.GET, cache_ttl=0.5, cache_size=2)
+    async def api_get_reference(cls, key: str) -> Dict[str, str]:
+        """
+        :param key: key of reference data
+        :return: reference data for key
+        """
+        cls.reference_calls.append(key)
+        await asyncio.sleep(0.05)
+        return {'key': key, 'value': key.upper()}
+
+    @classmethod
+    @web_api(content_type='text/plain', method=RestMethod.GET, max_concurrency=1)
+    async def api_get_slow(cls, delay: float) -> str:
+        """
+        :param delay: seconds to take servicing request
+        :return: "done"
+        """
+        await asyncio.sleep(delay)
+        return "done"
+
+    @classmethod
+    @web_api(content_type='text/plain', method=RestMethod.GET)
+    async def api_get_context_header(cls, name: str) -> str:
+        """
+        :param name: name of request header
+        :return: value of that header, as seen from a task spawned by the web api
+        """
+        from bantam.http import WebApplication
+
+        async def lookup():
+            return WebApplication.get_context().get(name)
+        return await asyncio.create_task(lookup())
+
     @classmethod
     @web_api(content_type='text/plain', method=RestMethod.GET)
     async def api_get_basic(cls, *varargs: int, param1: int, param2: bool, param3: float, param4: str = "text",
@@ -231,6 +350,17 @@ class RestAPIExampleAsync(RestAPIExampleAsyncInterface):
             yield index
             await asyncio.sleep(0.02)
 
+    @classmethod
+    @web_api(content_type='text/json', method=RestMethod.GET, stream_buffer_size=16, stream_flush_delay=0.05)
+    async def api_get_stream_buffered(cls, count: int) -> AsyncIterator[int]:
+        """
+        :param count: number of items to stream
+        :return: stream of int, coalesced into fewer writes
+        """
+        for index in range(count):
+            yield index
+            await asyncio.sleep(0.02)
+
     @classmethod
     @web_api(content_type='text/json', method=RestMethod.GET)
     async def api_get_stream_bytes(cls, param1: int, param2: bool, param3: float, param4: Optional[str] = None,
@@ -53,6 +53,16 @@ class RestAPIExampleAsyncPostInterface(WebInterface):
         """
         yield None  # not called as abstract, but tells Python this is an async generator
 
+    @classmethod
+    @web_api(content_type='text/json', method=RestMethod.POST)
+    @abstractmethod
+    async def api_post_stream_raises(cls, count: int) -> AsyncIterator[int]:
+        """
+        :param count: number of items to stream before raising an exception
+        :return: stream of int
+        """
+        yield None  # not called as abstract, but tells Python this is an async generator
+
     @classmethod
     @web_api(content_type='text/json', method=RestMethod.POST)
     @abstractmethod
@@ -174,6 +184,18 @@ class RestAPIExampleAsyncPost(RestAPIExampleAsyncPostInterface):
             yield index
             await asyncio.sleep(0.02)
 
+    @classmethod
+    @web_api(content_type='text/json', method=RestMethod.POST)
+    async def api_post_stream_raises(cls, count: int) -> AsyncIterator[int]:
+        """
+        :param count: number of items to stream before raising an exception
+        :return: stream of int
+        """
+        for index in range(count):
+            yield index
+            await asyncio.sleep(0.02)
+        raise ValueError("Deliberate exception partway through stream")
+
     @classmethod
     @web_api(content_type='text/json', method=RestMethod.POST)
     async def api_post_stream_bytes(cls, param1: int, param2: bool, param3: float, param4: Optional[str] = None,
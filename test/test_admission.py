@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from bantam.admission import AdmissionRejected, ConcurrencyLimiter
+
+
+@pytest.mark.asyncio
+async def test_limiter_admits_in_order():
+    limiter = ConcurrencyLimiter(limit=2)
+    assert await limiter.acquire(timeout=None) == 0.0
+    assert await limiter.acquire(timeout=None) == 0.0
+    order = []
+
+    async def waiter(index: int):
+        await limiter.acquire(timeout=None)
+        order.append(index)
+
+    tasks = [asyncio.create_task(waiter(index)) for index in range(3)]
+    await asyncio.sleep(0)
+    assert limiter.queued == 3 and limiter.in_flight == 2
+    for _ in range(3):
+        limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2]
+    assert limiter.in_flight == 2 and limiter.queued == 0
+    assert limiter.admitted == 5 and limiter.total_wait > 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects():
+    limiter = ConcurrencyLimiter(limit=1, max_queued=1, retry_after=3)
+    await limiter.acquire(timeout=None)
+    with pytest.raises(AdmissionRejected) as e:
+        await limiter.acquire(timeout=0.05)
+    assert e.value.retry_after == 3
+    waiting = asyncio.create_task(limiter.acquire(timeout=None))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected):
+        await limiter.acquire(timeout=None)  # queue is full
+    assert limiter.rejected == 2
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert limiter.queued == 0
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_handover_racing_timeout(monkeypatch):
+    limiter = ConcurrencyLimiter(limit=1)
+    await limiter.acquire(timeout=None)
+
+    async def wait_for(waiter, timeout):
+        # as asyncio.wait_for may on Python >= 3.12: the slot is handed over just as the wait times out
+        limiter.release()
+        assert waiter.done()
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(asyncio, 'wait_for', wait_for)
+    with pytest.raises(AdmissionRejected):
+        await limiter.acquire(timeout=0.05)
+    assert limiter.in_flight == 0 and limiter.queued == 0
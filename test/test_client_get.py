@@ -1,4 +1,6 @@
 import asyncio
+import json
+import zlib
 from asyncio import CancelledError
 from contextlib import suppress
 from pathlib import Path
@@ -86,6 +88,29 @@ async def test_client_class_method_streamed(tmpdir):
         with suppress(CancelledError):
             await task
 
+
+@pytest.mark.asyncio
+async def test_client_class_method_streamed_buffered(tmpdir):
+    import aiohttp
+    from class_rest_get import RestAPIExampleAsyncInterface
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        client = RestAPIExampleAsyncInterface.ClientEndpointMapping()[f'http://localhost:{PORT}/']
+        assert [item async for item in client.api_get_stream_buffered(20)] == list(range(20))
+        url = f'http://localhost:{PORT}/RestAPIExampleAsync/api_get_stream_buffered'
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params={'count': '20'}) as resp:
+                chunks = [data async for data, _ in resp.content.iter_chunks()]
+        assert b''.join(chunks) == b''.join(b'%d\0' % index for index in range(20))
+        assert len(chunks) < 20  # items coalesced into fewer writes
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
 @pytest.mark.asyncio
 async def test_client_instance_method_streamed(tmpdir):
     from class_rest_get import RestAPIExampleAsyncInterface
@@ -141,3 +166,378 @@ async def test_client_instance_raises_exception(tmpdir):
         task.cancel()
         with suppress(CancelledError):
             await task
+
+
+@pytest.mark.asyncio
+async def test_get_context_seen_by_spawned_task(tmpdir):
+    import aiohttp
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        async with aiohttp.ClientSession(headers={'X-Bantam-Test': 'traced'}) as session:
+            async with session.get(f'http://localhost:{PORT}/RestAPIExampleAsync/api_get_context_header',
+                                   params={'name': 'X-Bantam-Test'}) as resp:
+                assert resp.status == 200
+                assert await resp.text() == 'traced'
+        assert WebApplication.get_context() is None
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_route_concurrency_limit(tmpdir):
+    import aiohttp
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False, max_queue_wait=0.2)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        url = f'http://localhost:{PORT}/RestAPIExampleAsync/api_get_slow'
+        async with aiohttp.ClientSession() as session:
+
+            async def get(delay: float):
+                async with session.get(url, params={'delay': str(delay)}) as resp:
+                    return resp.status, resp.headers.get('Retry-After'), await resp.text()
+
+            slow = asyncio.create_task(get(1.0))
+            await asyncio.sleep(0.1)
+            status, retry_after, _ = await get(0.0)
+            assert (status, retry_after) == (503, '1')
+            assert (await slow)[::2] == (200, 'done')
+            # a request waiting less than max_queue_wait is admitted once the slot frees up
+            slow = asyncio.create_task(get(0.1))
+            await asyncio.sleep(0.05)
+            assert (await get(0.0))[0] == 200
+            assert (await slow)[0] == 200
+            # other routes are unaffected by a saturated route
+            slow = asyncio.create_task(get(1.0))
+            await asyncio.sleep(0.1)
+            async with session.get(f'http://localhost:{PORT}/RestAPIExampleAsync/api_get_context_header',
+                                   params={'name': 'Host'}) as resp:
+                assert resp.status == 200
+            assert (await slow)[0] == 200
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_handler_timeouts(tmpdir):
+    import aiohttp
+    from class_rest_get import RestAPIExampleAsync
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False, handler_deadline=0.2)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        RestAPIExampleAsync.stalled_cleanup.clear()
+        base_url = f'http://localhost:{PORT}/RestAPIExampleAsync'
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f'{base_url}/api_get_slow', params={'delay': '5'}) as resp:
+                assert resp.status == 504
+            async with session.get(f'{base_url}/api_get_slow', params={'delay': '0'}) as resp:
+                assert resp.status == 200
+            async with session.get(f'{base_url}/api_get_stalled_stream', params={'stall_after': '0'}) as resp:
+                assert resp.status == 504
+            async with session.get(f'{base_url}/api_get_stalled_stream', params={'stall_after': '2'}) as resp:
+                assert resp.status == 200
+                assert await resp.read() == b'0\x001\x00'
+        assert RestAPIExampleAsync.stalled_cleanup == [None, 1]
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_metrics_route(tmpdir):
+    import aiohttp
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False,
+                         metrics_route='/metrics')
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        base_url = f'http://localhost:{PORT}/RestAPIExampleAsync'
+        async with aiohttp.ClientSession() as session:
+            for _ in range(3):
+                async with session.get(f'{base_url}/api_get_slow', params={'delay': '0'}) as resp:
+                    assert resp.status == 200
+            async with session.get(f'{base_url}/api_get_slow', params={'bogus': '0'}) as resp:
+                assert resp.status == 400
+            async with session.get(f'{base_url}/api_get_stalled_stream', params={'stall_after': '0'}) as resp:
+                assert resp.status == 504
+            async with session.get(f'http://localhost:{PORT}/metrics') as resp:
+                assert resp.status == 200
+                assert resp.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+                lines = (await resp.text()).splitlines()
+        route = '/RestAPIExampleAsync/api_get_slow'
+        assert f'bantam_requests_total{{route="{route}"}} 4' in lines
+        assert f'bantam_responses_total{{route="{route}",status="200"}} 3' in lines
+        assert f'bantam_responses_total{{route="{route}",status="400"}} 1' in lines
+        assert f'bantam_request_duration_seconds_count{{route="{route}"}} 4' in lines
+        assert f'bantam_requests_in_flight{{route="{route}"}} 0' in lines
+        stream_route = '/RestAPIExampleAsync/api_get_stalled_stream'
+        assert f'bantam_responses_total{{route="{stream_route}",status="504"}} 1' in lines
+        assert any(line.startswith('bantam_instances ') for line in lines)
+        metrics = app.metrics.route(route)
+        assert metrics.latency.count == 4 and metrics.response_bytes > 0
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_large_response_sent_incrementally(tmpdir):
+    import aiohttp
+    from class_rest_get import RestAPIExampleAsyncInterface
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        count = WebApplication.INCREMENTAL_JSON_MIN_ITEMS * 20
+        client = RestAPIExampleAsyncInterface.ClientEndpointMapping()[f'http://localhost:{PORT}/']
+        squares = await client.api_get_squares(count)
+        assert squares == {str(index): [index, index * index] for index in range(count)}
+        url = f'http://localhost:{PORT}/RestAPIExampleAsync/api_get_squares'
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params={'count': str(count)}) as resp:
+                assert resp.headers.get('Transfer-Encoding') == 'chunked'
+                assert resp.content_type == 'application/json'
+                assert len(await resp.json()) == count
+            async with session.get(url, params={'count': '10'}) as resp:
+                assert resp.headers.get('Content-Length') is not None
+                assert len(await resp.json()) == 10
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_compressed_responses(tmpdir):
+    import aiohttp
+    from class_rest_get import RestAPIExampleAsyncInterface
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False,
+                         compress_min_size=64)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        client = RestAPIExampleAsyncInterface.ClientEndpointMapping()[f'http://localhost:{PORT}/']
+        assert await client.api_get_squares(100) == {str(index): [index, index * index] for index in range(100)}
+        assert [item async for item in client.api_get_stream(1, True, 1.0)] == list(range(10))
+        url = f'http://localhost:{PORT}/RestAPIExampleAsync'
+        async with aiohttp.ClientSession(auto_decompress=False) as session:
+            async with session.get(f'{url}/api_get_squares', params={'count': '100'},
+                                   headers={'Accept-Encoding': 'gzip'}) as resp:
+                assert resp.headers.get('Content-Encoding') == 'gzip'
+                assert resp.headers.get('Vary') == 'Accept-Encoding'
+            async with session.get(f'{url}/api_get_squares', params={'count': '100'},
+                                   headers={'Accept-Encoding': 'identity'}) as resp:
+                assert resp.headers.get('Content-Encoding') is None
+                assert resp.headers.get('Vary') == 'Accept-Encoding'
+            async with session.get(f'{url}/api_get_squares', params={'count': '1'},
+                                   headers={'Accept-Encoding': 'gzip'}) as resp:
+                assert resp.headers.get('Content-Encoding') is None  # below minimum size
+            async with session.get(f'{url}/api_get_stream', params={'param1': '1', 'param2': 'true', 'param3': '1.0'},
+                                   headers={'Accept-Encoding': 'deflate'}) as resp:
+                assert resp.headers.get('Content-Encoding') == 'deflate'
+                assert resp.headers.get('Vary') == 'Accept-Encoding'
+                assert zlib.decompress(await resp.read()) == b''.join(b'%d\0' % index for index in range(10))
+            async with session.get(f'http://localhost:{PORT}/static/js/generated.js',
+                                   headers={'Accept-Encoding': 'gzip'}) as resp:
+                assert resp.headers.get('Content-Encoding') == 'gzip'
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_client_pooled_session(tmpdir):
+    from bantam.client import PoolOptions, WebInterface
+    from class_rest_get import RestAPIExampleAsyncInterface
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        options = PoolOptions(limit=4, keepalive_timeout=30.0)
+        async with RestAPIExampleAsyncInterface.ClientEndpointMapping(pool_options=options) as client_mapping:
+            Client = client_mapping[f'http://localhost:{PORT}/']
+            pool = WebInterface._pools[f"RestAPIExampleAsyncInterface@http://localhost:{PORT} {options}"]
+            assert not pool.is_open  # until first call
+            assert await Client.api_get_basic(param1=42, param2=True, param3=992.123) == \
+                "Response to test_api_basic 1.0 2"
+            session = pool.session()
+            assert [item async for item in Client.api_get_stream(1, True, 1.0)] == list(range(10))
+            instance = await Client.explicit_constructor(4242)
+            assert await instance.my_value() == 4242
+            assert pool.session() is session
+            assert session.connector.limit == 4
+        assert not pool.is_open and session.closed
+        # calls after closing open a new session
+        assert await Client.api_get_basic(param1=42, param2=True, param3=992.123) == \
+            "Response to test_api_basic 1.0 2"
+        assert pool.is_open
+        await client_mapping.close()
+        # clients differing in headers or json engine are kept apart
+        async with RestAPIExampleAsyncInterface.ClientEndpointMapping(
+                pool_options=options, common_headers={'X-Test': '1'}, json_backend='json') as other_mapping:
+            Other = other_mapping[f'http://localhost:{PORT}/']
+            assert Other is not Client
+            other_pool = WebInterface._pools[f"RestAPIExampleAsyncInterface@http://localhost:{PORT} json=json "
+                                             f"headers=[('X-Test', '1')] {options}"]
+            assert await Other.api_get_basic(param1=42, param2=True, param3=992.123) == \
+                "Response to test_api_basic 1.0 2"
+            assert other_pool.session().headers['X-Test'] == '1'
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_client_pooled_session_other_loop():
+    import threading
+    from bantam.client import PoolOptions, _SessionPool
+    pool = _SessionPool(None, PoolOptions())
+    # session of a loop still running elsewhere is closed by that loop
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever)
+    thread.start()
+    try:
+        async def open_session():
+            return pool.session()
+        old_session = asyncio.run_coroutine_threadsafe(open_session(), other_loop).result()
+        session = pool.session()
+        assert session is not old_session
+        for _ in range(100):
+            if old_session.closed:
+                break
+            await asyncio.sleep(0.01)
+        assert old_session.closed
+        # and so on closing the pool from the other loop
+        asyncio.run_coroutine_threadsafe(pool.close(), other_loop).result()
+        for _ in range(100):
+            if session.closed:
+                break
+            await asyncio.sleep(0.01)
+        assert session.closed and not pool.is_open
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join()
+        other_loop.close()
+    # session of a closed loop is let go, its connections having gone with the loop
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(asyncio.run(open_session())))
+    thread.start()
+    thread.join()
+    old_session, = sessions
+    session = pool.session()
+    assert old_session.closed and not session.closed
+    await pool.close()
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_client_batch(tmpdir):
+    import aiohttp
+    from class_rest_get import RestAPIExampleAsyncInterface
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False,
+                         batch_route='/_batch')
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        async with RestAPIExampleAsyncInterface.ClientEndpointMapping() as client_mapping:
+            Client = client_mapping[f'http://localhost:{PORT}/']
+            instance = await Client.explicit_constructor(4242)
+            async with client_mapping.batch(f'http://localhost:{PORT}/', max_size=16) as batch:
+                results = await asyncio.gather(
+                    *[Client.api_get_squares(count) for count in range(40)],
+                    instance.my_value(),
+                    Client.api_get_basic(1, 2, param1=42, param2=True, param3=992.123)
+                )
+                with pytest.raises(InvocationError):
+                    await Client.raise_exception()
+                # streamed api's are called on their own
+                assert [item async for item in Client.api_get_stream(1, True, 1.0)] == list(range(10))
+                await batch.flush()
+            assert results[:40] == [{str(index): [index, index * index] for index in range(count)}
+                                    for count in range(40)]
+            assert results[40:] == [4242, "Response to test_api_basic 1.0 2"]
+        async with aiohttp.ClientSession() as session:
+            calls = [{'route': '/RestAPIExampleAsync/api_get_squares', 'params': {'count': 2}},
+                     {'route': '/RestAPIExampleAsync/no_such_api', 'params': {}},
+                     {'route': '/RestAPIExampleAsync/api_get_squares', 'params': {'bad_param': 2}},
+                     {'route': '/RestAPIExampleAsync/api_get_stream', 'params': {}}]
+            async with session.post(f'http://localhost:{PORT}/_batch', json={'calls': calls}) as resp:
+                outcomes = await resp.json()
+            assert outcomes[0]['status'] == 200
+            assert json.loads(outcomes[0]['result']) == {'0': [0, 0], '1': [1, 1]}
+            assert [outcome['status'] for outcome in outcomes[1:]] == [404, 400, 400]
+            async with session.post(f'http://localhost:{PORT}/_batch', data=b'not json') as resp:
+                assert resp.status == 400
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_client_cache(tmpdir):
+    import aiohttp
+    from class_rest_get import RestAPIExampleAsync, RestAPIExampleAsyncInterface
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get']))
+    try:
+        await asyncio.sleep(1)
+        RestAPIExampleAsync.reference_calls.clear()
+        async with RestAPIExampleAsyncInterface.ClientEndpointMapping() as client_mapping:
+            Client = client_mapping[f'http://localhost:{PORT}/']
+            # concurrent calls share one request
+            results = await asyncio.gather(*[Client.api_get_reference('a') for _ in range(10)])
+            assert results == [{'key': 'a', 'value': 'A'}] * 10
+            assert await Client.api_get_reference(key='a') == {'key': 'a', 'value': 'A'}
+            assert RestAPIExampleAsync.reference_calls == ['a']
+            # least recently used evicted beyond cache size
+            await Client.api_get_reference('b')
+            await Client.api_get_reference('a')
+            await Client.api_get_reference('c')
+            await Client.api_get_reference('a')
+            assert RestAPIExampleAsync.reference_calls == ['a', 'b', 'c']
+            await Client.api_get_reference('b')
+            assert RestAPIExampleAsync.reference_calls == ['a', 'b', 'c', 'b']
+            # expired responses are revalidated
+            await asyncio.sleep(0.6)
+            assert await Client.api_get_reference('a') == {'key': 'a', 'value': 'A'}
+            assert RestAPIExampleAsync.reference_calls[-1] == 'a'
+        url = f'http://localhost:{PORT}/RestAPIExampleAsync/api_get_reference'
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params={'key': 'a'}) as resp:
+                etag = resp.headers['ETag']
+                assert etag.startswith('W/')  # as the same for any content coding
+            async with session.get(url, params={'key': 'a'}, headers={'If-None-Match': etag}) as resp:
+                assert resp.status == 304
+            async with session.get(url, params={'key': 'b'}, headers={'If-None-Match': etag}) as resp:
+                assert resp.status == 200 and resp.headers['ETag'] != etag
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+def test_client_call_plan():
+    from bantam.client import ClientCallPlan
+    from class_rest_get import RestAPIExampleAsyncInterface
+    api = RestAPIExampleAsyncInterface.api_get_stream._bantam_web_api
+    plan = ClientCallPlan.compile(api, 'http://localhost', '/RestAPIExampleAsync/api_get_stream')
+    assert plan.is_get and plan.positional == ('param1', 'param2', 'param3', 'param4') and plan.vararg is None
+    kwargs = plan.bind(api.name, (1, True), {'param3': 2.5})
+    assert kwargs == {'param3': 2.5, 'param1': 1, 'param2': True}
+    assert plan.query(kwargs) == \
+        'http://localhost/RestAPIExampleAsync/api_get_stream?param3=2.5&param1=1&param2=true'
+    assert plan.query({}, self_id='abc') == 'http://localhost/RestAPIExampleAsync/api_get_stream?self=abc&'
+    with pytest.raises(TypeError):
+        plan.bind(api.name, (1, True, 2.5, 'x', 'y'), {})
@@ -7,7 +7,9 @@ if True:
     sys.path.insert(0, str(Path(__file__).parent / 'example'))
 from pathlib import Path
 
+import aiohttp
 import pytest
+from bantam.api import MSGPACK
 from bantam.http import WebApplication
 from class_rest_post import RestAPIExampleAsyncPostInterface, RestAPIExampleAsyncPost
 
@@ -118,3 +120,59 @@ async def test_client_instance_method_streamed_str(tmpdir):
         task.cancel()
         with suppress(CancelledError):
             await task
+
+
+@pytest.mark.asyncio
+async def test_client_msgpack(tmpdir):
+    msgpack = pytest.importorskip('msgpack')
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_post']))
+    try:
+        await asyncio.sleep(1)
+        Client = RestAPIExampleAsyncPostInterface.ClientEndpointMapping(use_msgpack=True)[f'http://localhost:{PORT}/']
+        response = await Client.api_post_basic(1, 2, 4, 5, 6, param1=42, param2=True, param3=992.123)
+        assert response == f"Response to test_api_basic 1.0 2"
+        instance = await Client.explicit_constructor(29)
+        assert await instance.my_value() == 29
+        assert [item async for item in instance.my_value_repeated(20)] == [29] * 20
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f'http://localhost:{PORT}/RestAPIExampleAsyncPost/my_value',
+                                    data=msgpack.packb({'self': instance.self_id}),
+                                    headers={'Content-Type': MSGPACK, 'Accept': MSGPACK}) as resp:
+                assert resp.content_type == MSGPACK
+                assert msgpack.unpackb(await resp.read()) == 29
+            async with session.post(f'http://localhost:{PORT}/RestAPIExampleAsyncPost/my_value',
+                                    json={'self': instance.self_id}) as resp:
+                assert resp.content_type != MSGPACK
+                assert await resp.text() == '29'
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_framed_stream_raising_partway(tmpdir):
+    from bantam.framing import FRAMED, FrameDecoder
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_post']))
+    try:
+        await asyncio.sleep(1)
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f'http://localhost:{PORT}/RestAPIExampleAsyncPost/api_post_stream_raises',
+                                    json={'count': 3}, headers={'Accept': FRAMED}) as resp:
+                assert resp.content_type == FRAMED
+                decoder = FrameDecoder()
+                items = decoder.feed(await asyncio.wait_for(resp.read(), 5))
+        # the stream is ended after the items produced, with no stray (unframed) error text
+        assert items == [b'0', b'1', b'2'] and decoder.pending == 0
+        Client = RestAPIExampleAsyncPostInterface.ClientEndpointMapping()[f'http://localhost:{PORT}/']
+        assert await asyncio.wait_for(_collect(Client.api_post_stream_raises(3)), 5) == [0, 1, 2]
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+async def _collect(items):
+    return [item async for item in items]
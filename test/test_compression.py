@@ -0,0 +1,38 @@
+import gzip
+import zlib
+from pathlib import Path
+
+import pytest
+
+from bantam.compression import DEFLATE, GZIP, StreamCompressor, negotiate, precompress
+
+
+@pytest.mark.parametrize('accept_encoding, coding', [
+    ('gzip, deflate, br', GZIP),
+    ('deflate', DEFLATE),
+    ('gzip;q=0.5, deflate', DEFLATE),
+    ('gzip;q=0, deflate;q=0', None),
+    ('*', GZIP),
+    ('br', None),
+    ('', None),
+])
+def test_negotiate(accept_encoding: str, coding: str):
+    assert negotiate(accept_encoding) == coding
+
+
+@pytest.mark.parametrize('coding, wbits', [(GZIP, 16 + zlib.MAX_WBITS), (DEFLATE, zlib.MAX_WBITS)])
+def test_stream_compressor_flushes_each_write(coding: str, wbits: int):
+    compressor = StreamCompressor(coding)
+    decompressor = zlib.decompressobj(wbits=wbits)
+    for item in (b'first\0', b'second\0' * 100):
+        assert decompressor.decompress(compressor.compress(item)) == item
+    assert decompressor.decompress(compressor.finish()) == b''
+    assert decompressor.eof
+
+
+def test_precompress(tmpdir):
+    path = Path(tmpdir).joinpath('bundle.js')
+    path.write_text('class bantam {}\n' * 100)
+    compressed = precompress(path)
+    assert compressed.name == 'bundle.js.gz'
+    assert gzip.decompress(compressed.read_bytes()) == path.read_bytes()
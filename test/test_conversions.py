@@ -1,9 +1,10 @@
+import base64
 import datetime
 import json
 import pickle
 import threading
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path, PosixPath
 from typing import Dict, List, Union, Tuple, Set, Optional
 
@@ -11,7 +12,21 @@ import pytest
 from frozenlist import FrozenList
 from frozendict import frozendict
 
-from bantam.conversions import to_str, from_str, normalize_from_json
+from bantam import json_backends
+from bantam.conversions import (
+    to_str, from_str, normalize_from_json, normalize_to_json_compat, json_decoder, str_decoder, is_opaque,
+    set_unpickle_allowlist, dataclass_encoder, dataclass_normalizer, to_json, str_encoder,
+)
+
+
+@pytest.fixture(autouse=True)
+def stdlib_json():
+    # expected images below are as formatted by the standard library's json module
+    previous = json_backends.get_backend()
+    json_backends.set_default_backend('json')
+    yield
+    json_backends.set_default_backend(previous)
+
 
 class Pickleable:
 
@@ -202,3 +217,107 @@ class Test:
         d['subdata'] = SubData(**d['subdata'])
         assert from_str(image, Data) == Data(**d)
         assert normalize_from_json(raw_data, Data) == Data(**d)
+
+    def test_decoders_compiled_once_per_type(self):
+
+        @dataclass
+        class Item:
+            name: str
+            count: Optional[int]
+
+        typ = List[Dict[str, Item]]
+        assert json_decoder(typ) is json_decoder(typ)
+        assert str_decoder(typ) is str_decoder(typ)
+        data = [{'a': {'name': 'A', 'count': 1}}, {'b': {'name': 'B', 'count': None}}]
+        expected = [{'a': Item('A', 1)}, {'b': Item('B', None)}]
+        assert json_decoder(typ)(data) == expected
+        assert from_str(json.dumps(data), typ) == expected
+
+    def test_decoder_recursive_dataclass(self):
+
+        @dataclass
+        class Node:
+            value: int
+            children: List['Node']
+
+        Node.__dataclass_fields__['children'].type = List[Node]
+        assert normalize_from_json({'value': 1, 'children': [{'value': 2, 'children': []}]}, Node) == \
+            Node(1, [Node(2, [])])
+
+    def test_str_encoder(self):
+        assert str_encoder(bool)(True) == 'true'
+        assert str_encoder(bool)(1) == '1'  # not of declared type
+        assert str_encoder(List[int])([1, 2]) == '[1, 2]'
+        assert str_encoder(Pickleable) is to_str
+
+    def test_dataclass_codecs(self):
+
+        @dataclass(slots=True)
+        class Point:
+            x: float
+            y: float
+
+        @dataclass(slots=True)
+        class Track:
+            name: str
+            points: List[Point]
+            origin: Optional[Point] = None
+            tags: Set[str] = field(default_factory=set)
+            when: datetime.datetime = datetime.datetime(2023, 1, 1)
+
+        track = Track('t', [Point(0.0, 1.5), Point(2.0, 3.0)], Point(1.0, 1.0), {'a'})
+        assert dataclass_encoder(Track) is dataclass_encoder(Track)
+        assert dataclass_normalizer(Track) is dataclass_normalizer(Track)
+        assert dataclass_encoder(Track)(track)['points'] is track.points  # not copied
+        normalized = normalize_to_json_compat(track)
+        assert normalized == {'name': 't', 'points': [{'x': 0.0, 'y': 1.5}, {'x': 2.0, 'y': 3.0}],
+                              'origin': {'x': 1.0, 'y': 1.0}, 'tags': ['a'], 'when': '2023-01-01T00:00:00'}
+        assert json.loads(to_json(track)) == normalized
+        assert normalize_from_json(normalized, Track) == track
+        # fields with defaults may be omitted
+        assert normalize_from_json({'name': 'u', 'points': []}, Track) == Track('u', [])
+
+    def test_to_str_nested_values_in_single_pass(self):
+
+        @dataclass
+        class Item:
+            name: str
+            when: datetime.datetime
+
+        when = datetime.datetime(2022, 3, 4, 5, 6, 7)
+        value = {'items': [Item('a', when)], 'ids': (uuid.UUID(int=1), ), 'paths': {Path('/tmp')}, 1: None}
+        assert json.loads(to_str(value)) == {
+            'items': [{'name': 'a', 'when': when.isoformat()}],
+            'ids': [str(uuid.UUID(int=1))],
+            'paths': ['/tmp'],
+            '1': None,
+        }
+        assert json.loads(to_str({Path('/tmp'): 1})) == {'/tmp': 1}
+
+    def test_pickled_values_as_base64(self):
+        image = to_str(Pickleable(port=8080))
+        assert image == base64.urlsafe_b64encode(pickle.dumps(Pickleable(port=8080))).decode('ascii')
+        assert from_str(image, Pickleable).port == 8080
+        assert normalize_from_json(normalize_to_json_compat(Pickleable(port=8080)), Pickleable).port == 8080
+        # images as lists of int's are still accepted
+        assert from_str(json.dumps(list(pickle.dumps(Pickleable(port=1)))), Pickleable).port == 1
+        assert from_str(to_str(b'\x00\xff'), bytes) == b'\x00\xff'
+        assert is_opaque(Pickleable)
+        assert not is_opaque(dict) and not is_opaque(List[int]) and not is_opaque(bytes)
+
+    def test_unpickle_allowlist(self):
+        image = to_str(Pickleable())
+        set_unpickle_allowlist([frozendict])
+        try:
+            with pytest.raises(TypeError):
+                from_str(image, Pickleable)
+            set_unpickle_allowlist([Pickleable])
+            assert from_str(image, Pickleable).host == 'localhost'
+        finally:
+            set_unpickle_allowlist(None)
+
+    def test_msgpack_big_int(self):
+        pytest.importorskip('msgpack')
+        from bantam.conversions import from_msgpack, to_msgpack
+        image = to_msgpack({'a': [2 ** 70, 1], 'b': [-2 ** 64]})
+        assert json_decoder(Dict[str, List[int]])(from_msgpack(image)) == {'a': [2 ** 70, 1], 'b': [-2 ** 64]}
@@ -117,3 +117,32 @@ class TestDecoratorUtils:
         assert param1 == 1
         assert param2 == 'text'
         return "RESULT"
+
+
+class TestInvocationPlan:
+
+    @staticmethod
+    async def func(param1: int, *args: float, param2: Dict[str, int], **kwargs: str) -> str:
+        return "RESULT"
+
+    def test_plan_compiled_once(self):
+        api = API(None, self.func, method=RestMethod.GET, content_type='text/plain; charset=latin-1',
+                  is_instance_method=False, is_class_method=False, is_constructor=False)
+        plan = api.plan
+        assert plan.encoding == 'latin-1'
+        assert plan.allowed_params == frozenset({'param1', 'args', 'param2', 'kwargs', 'self'})
+        assert plan.query_decoders['param1']("42") == 42
+        assert plan.json_decoders['param2']({'a': '1'}) == {'a': 1}
+        assert plan.serialize("é") == "é".encode('latin-1')
+        with pytest.raises(TypeError):
+            plan.query_decoders['param1']("not an int")
+        with pytest.raises(TypeError):
+            plan.query_decoders['extra'] = None
+        assert api.plan is plan
+
+    def test_plan_bind(self):
+        api = API(None, self.func, method=RestMethod.GET, content_type='text/plain',
+                  is_instance_method=False, is_class_method=False, is_constructor=False)
+        kwargs, varargs = api.plan.bind({'param1': 1, 'args': (1.0, 2.0), 'param2': {}, 'kwargs': {'extra': 'x'}})
+        assert kwargs == {'param1': 1, 'param2': {}, 'extra': 'x'}
+        assert varargs == (1.0, 2.0)
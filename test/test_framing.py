@@ -0,0 +1,41 @@
+import pytest
+
+from bantam.framing import FrameDecoder, SeparatedDecoder, encode_varint, frame
+
+
+@pytest.mark.parametrize('value, image', [(0, b'\x00'), (127, b'\x7f'), (128, b'\x80\x01'), (300, b'\xac\x02')])
+def test_encode_varint(value: int, image: bytes):
+    assert encode_varint(value) == image
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024])
+def test_frame_decoder(chunk_size: int):
+    items = [b'"a"', b'', b'\0' * 200, 'é'.encode('utf-8') * 10000]
+    stream = b''.join(frame(item) for item in items)
+    decoder = FrameDecoder()
+    decoded = []
+    for offset in range(0, len(stream), chunk_size):
+        decoded += decoder.feed(stream[offset:offset + chunk_size])
+    assert decoded == items
+    assert decoder.pending == 0
+
+
+def test_frame_decoder_partial_length():
+    decoder = FrameDecoder()
+    image = frame(b'x' * 300)
+    assert decoder.feed(image[:1]) == []
+    assert decoder.pending == 1
+    assert decoder.feed(image[1:]) == [b'x' * 300]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024])
+def test_separated_decoder(chunk_size: int):
+    items = ['"a"', '', 'é' * 10000, '{"key": "ü€"}']
+    stream = b''.join(item.encode('utf-8') + b'\0' for item in items) + b'"partial'
+    decoder = SeparatedDecoder()
+    decoded = []
+    for offset in range(0, len(stream), chunk_size):
+        decoded += decoder.feed(stream[offset:offset + chunk_size])
+    # multi-byte characters split across chunks are decoded whole
+    assert [item.decode('utf-8') for item in decoded] == items
+    assert decoder.pending == len(b'"partial')
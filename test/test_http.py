@@ -1,8 +1,201 @@
+import asyncio
+
 import pytest
 
-from bantam.http import WebApplication
+from bantam.api import StreamBuffering
+from bantam.http import WebApplication, _StreamWriter
+from bantam.spill import DirectorySpillStore, SqliteSpillStore
+
+
+class Counter:
+
+    def __init__(self, count: int):
+        self.count = count
+
+
+class CustomSpill(Counter):
+
+    def spill(self) -> bytes:
+        return str(self.count).encode()
+
+    @classmethod
+    def restore(cls, data: bytes) -> "CustomSpill":
+        return cls(int(data) + 1)
+
+
+class RecordingResponse:
+
+    def __init__(self):
+        self.writes = []
+
+    async def write(self, data: bytes) -> None:
+        self.writes.append(data)
 
 
 def test_preprocess_module_errors():
     with pytest.raises(ValueError):
         WebApplication.preprocess_module('class_rest_errors')
+
+
+@pytest.mark.asyncio
+async def test_main_thread_dispatch_runs_on_owning_loop(monkeypatch):
+    # restored on teardown, so that later tests do not dispatch to this test's (then closed) loop
+    monkeypatch.setattr(WebApplication.MainThread, 'loop', WebApplication.MainThread.loop)
+    main_task = asyncio.create_task(WebApplication.MainThread.main(None, WebApplication.DispatchMode.DIRECT))
+    await main_task
+    owning_loop = asyncio.get_running_loop()
+
+    async def handler():
+        return asyncio.get_running_loop()
+
+    assert await WebApplication.MainThread.dispatch(handler()) is owning_loop
+
+    def from_other_thread():
+        return asyncio.run(WebApplication.MainThread.dispatch(handler()))
+
+    assert await owning_loop.run_in_executor(None, from_other_thread) is owning_loop
+
+
+class TestObjectRepo:
+
+    class Resource:
+
+        def __init__(self):
+            self.closed = False
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            self.closed = True
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, monkeypatch):
+        repo = WebApplication.ObjectRepo
+        monkeypatch.setattr(repo, 'max_instances', 2)
+        resources = [self.Resource() for _ in range(3)]
+        try:
+            await repo.add('lru-0', resources[0])
+            await repo.add('lru-1', resources[1])
+            assert repo.get('lru-0') is resources[0]  # now most recently used
+            await repo.add('lru-2', resources[2])
+            assert repo.get('lru-1') is None
+            assert resources[1].closed
+            assert resources[1] not in repo.by_instance
+            assert repo.get('lru-0') is resources[0] and repo.get('lru-2') is resources[2]
+            assert not resources[0].closed and not resources[2].closed
+        finally:
+            for obj_id in ('lru-0', 'lru-1', 'lru-2'):
+                await repo.remove(obj_id)
+
+    @pytest.mark.asyncio
+    async def test_sliding_expiry(self, monkeypatch):
+        repo = WebApplication.ObjectRepo
+        monkeypatch.setattr(repo, 'SWEEP_INTERVAL', 0.05)
+        idle, active = self.Resource(), self.Resource()
+        try:
+            await repo.add('idle', idle, lease_time=0.3)
+            await repo.add('active', active, lease_time=0.3)
+            for _ in range(6):
+                await asyncio.sleep(0.1)
+                assert repo.get('active') is active
+            assert idle.closed and repo.get('idle') is None
+            assert not active.closed
+            await repo.expire_obj('active', 0)
+            assert active.closed and repo.get('active') is None
+        finally:
+            for obj_id in ('idle', 'active'):
+                await repo.remove(obj_id)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('store_type', [DirectorySpillStore, SqliteSpillStore])
+    async def test_spill_idle_and_restore(self, monkeypatch, tmpdir, store_type):
+        repo = WebApplication.ObjectRepo
+        store = store_type(tmpdir.join('spill'))
+        monkeypatch.setattr(repo, 'SWEEP_INTERVAL', 0.05)
+        monkeypatch.setattr(repo, 'spill_store', store)
+        monkeypatch.setattr(repo, 'spill_idle_time', 0.1)
+        try:
+            await repo.add('spilled', Counter(42))
+            await repo.add('custom', CustomSpill(42))
+            await asyncio.sleep(0.3)
+            assert 'spilled' not in repo.instances and 'custom' not in repo.instances
+            assert store.get('spilled') is not None
+            restored = await repo.lookup('spilled')
+            assert isinstance(restored, Counter) and restored.count == 42
+            assert repo.by_instance[restored] == 'spilled'
+            assert store.get('spilled') is None
+            assert (await repo.lookup('custom')).count == 43
+            await asyncio.sleep(0.3)
+            await repo.remove('spilled')
+            assert store.get('spilled') is None and await repo.lookup('spilled') is None
+        finally:
+            for obj_id in ('spilled', 'custom'):
+                await repo.remove(obj_id)
+
+    @pytest.mark.asyncio
+    async def test_spill_on_eviction(self, monkeypatch, tmpdir):
+        repo = WebApplication.ObjectRepo
+        monkeypatch.setattr(repo, 'max_instances', 1)
+        monkeypatch.setattr(repo, 'spill_store', DirectorySpillStore(tmpdir))
+        unspillable = self.Resource()
+        unspillable.callback = lambda: None  # not picklable
+        try:
+            await repo.add('first', Counter(1))
+            await repo.add('second', Counter(2))
+            assert list(repo.instances) == ['second'] and 'first' in repo.spilled
+            assert (await repo.lookup('first')).count == 1
+            assert list(repo.instances) == ['first'] and 'second' in repo.spilled
+            await repo.add('unspillable', unspillable)
+            await repo.lookup('first')
+            assert unspillable.closed and 'unspillable' not in repo.spilled
+        finally:
+            for obj_id in ('first', 'second', 'unspillable'):
+                await repo.remove(obj_id)
+
+
+@pytest.mark.asyncio
+async def test_stream_writer_coalesces():
+    response = RecordingResponse()
+    writer = _StreamWriter(response, StreamBuffering(max_size=10, max_delay=0.05))
+    for item in (b'abc', b'def', b'ghij'):
+        await writer.write(item)
+    assert response.writes == [b'abcdefghij']  # buffer size reached
+    await writer.write(b'k')
+    await writer.write(b'l')
+    assert response.writes == [b'abcdefghij']
+    await asyncio.sleep(0.1)
+    assert response.writes == [b'abcdefghij', b'kl']  # delay reached
+    await writer.write(b'm')
+    await writer.flush()
+    assert response.writes == [b'abcdefghij', b'kl', b'm']
+
+
+@pytest.mark.asyncio
+async def test_stream_writer_unbuffered():
+    response = RecordingResponse()
+    writer = _StreamWriter(response, None)
+    await writer.write(b'a')
+    await writer.write(b'b')
+    await writer.flush()
+    assert response.writes == [b'a', b'b']
+
+
+def test_object_repo_settings_kept_unless_given(monkeypatch, tmpdir):
+    repo = WebApplication.ObjectRepo
+    monkeypatch.setattr(repo, 'max_instances', 3)
+    WebApplication(static_path=tmpdir)
+    assert repo.max_instances == 3
+    WebApplication(static_path=tmpdir, max_instances=5)
+    assert repo.max_instances == 5
+
+
+def test_spill_settings_kept_unless_given(monkeypatch, tmpdir):
+    repo = WebApplication.ObjectRepo
+    store = DirectorySpillStore(tmpdir)
+    monkeypatch.setattr(repo, 'spill_store', store)
+    monkeypatch.setattr(repo, 'spill_idle_time', 5.0)
+    WebApplication(static_path=tmpdir)
+    assert repo.spill_store is store and repo.spill_idle_time == 5.0
+    WebApplication(static_path=tmpdir, spill_idle_time=1.0)
+    assert repo.spill_store is store and repo.spill_idle_time == 1.0
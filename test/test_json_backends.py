@@ -0,0 +1,69 @@
+import datetime
+import json
+import math
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from bantam.conversions import to_json, to_str
+from bantam import json_backends
+from bantam.json_backends import BACKENDS, StdlibJsonBackend, get_backend
+
+
+@dataclass
+class Record:
+    name: str
+    when: datetime.datetime
+    ids: List[uuid.UUID]
+    path: Path
+
+
+@pytest.mark.parametrize('name', list(BACKENDS))
+def test_round_trip(name: str):
+    backend = get_backend(name)
+    assert backend.name == name
+    value = {'a': [1, 2.5, None, True], 'b': {'c': 'é'}}
+    image = backend.dumps(value)
+    assert isinstance(image, bytes)
+    assert backend.loads(image) == value
+    assert backend.loads(image.decode('utf-8')) == value
+    with pytest.raises(ValueError):
+        backend.loads(b'{"a": ')
+
+
+@pytest.mark.parametrize('name', list(BACKENDS))
+def test_to_json(name: str):
+    when = datetime.datetime(2023, 1, 2, 3, 4, 5, 6)
+    value = {'records': [Record('r', when, [uuid.UUID(int=1)], Path('/tmp'))], 'tags': {'x'}, 1: Path('/a')}
+    assert json.loads(to_json(value, name)) == {
+        'records': [{'name': 'r', 'when': when.isoformat(), 'ids': [str(uuid.UUID(int=1))], 'path': '/tmp'}],
+        'tags': ['x'],
+        '1': '/a',
+    }
+
+
+@pytest.mark.parametrize('name', list(BACKENDS))
+def test_to_json_big_int(name: str):
+    value = {'a': 2 ** 70, 'b': [-2 ** 64, Path('/a')]}
+    assert json.loads(to_json(value, name)) == {'a': 2 ** 70, 'b': [-2 ** 64, '/a']}
+    assert to_str(value) == to_json(value).decode('utf-8')
+
+
+def test_get_backend():
+    assert get_backend('auto').name == next(iter(BACKENDS))
+    backend = StdlibJsonBackend()
+    assert get_backend(backend) is backend
+    assert get_backend() is get_backend()
+    with pytest.raises(ValueError):
+        get_backend('yaml')
+
+
+def test_default_backend_non_finite_floats(monkeypatch):
+    monkeypatch.setattr(json_backends, '_default', None)
+    assert get_backend().name == 'json'
+    image = to_json({'nan': float('nan'), 'inf': [float('inf'), float('-inf')]})
+    value = get_backend().loads(image)
+    assert math.isnan(value['nan']) and value['inf'] == [float('inf'), float('-inf')]
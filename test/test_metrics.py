@@ -0,0 +1,31 @@
+from bantam.metrics import Histogram, Metrics
+
+
+def test_histogram_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    out = []
+    histogram.render('latency', 'route="/a"', out)
+    assert out == [
+        'latency_bucket{route="/a",le="0.1"} 2',
+        'latency_bucket{route="/a",le="1.0"} 3',
+        'latency_bucket{route="/a",le="+Inf"} 4',
+        'latency_sum{route="/a"} 2.65',
+        'latency_count{route="/a"} 4',
+    ]
+
+
+def test_render_streamed_route():
+    metrics = Metrics()
+    metrics.route('/a').record(status=200, latency=0.01, queue_wait=0.0, request_bytes=10, response_bytes=20,
+                               stream_items=4)
+    metrics.route('/a').record(status=500, latency=0.01, queue_wait=0.0, request_bytes=0, response_bytes=5,
+                               stream_items=None)
+    lines = metrics.render([('bantam_instances', 'gauge', 'Instances', 3)]).splitlines()
+    assert 'bantam_responses_total{route="/a",status="500"} 1' in lines
+    assert 'bantam_response_bytes_total{route="/a"} 25' in lines
+    assert 'bantam_stream_bytes_total{route="/a"} 20' in lines
+    assert 'bantam_stream_items_total{route="/a"} 4' in lines
+    assert lines[-3:] == ['# HELP bantam_instances Instances', '# TYPE bantam_instances gauge', 'bantam_instances 3']
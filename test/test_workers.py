@@ -0,0 +1,71 @@
+import asyncio
+import os
+import signal
+from asyncio import CancelledError
+from contextlib import suppress
+from pathlib import Path
+import sys
+
+if True:
+    sys.path.insert(0, str(Path(__file__).parent / 'example'))
+
+import pytest
+from bantam.http import WebApplication
+
+PORT = 8241
+
+
+async def _wait_for_workers(app: WebApplication, count: int):
+    while len([w for w in app._workers if w.is_alive()]) < count:
+        await asyncio.sleep(0.1)
+
+
+@pytest.mark.asyncio
+async def test_workers_serve_requests(tmpdir):
+    from class_rest_get import RestAPIExampleAsyncInterface
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get'], workers=2,
+                                         shutdown_timeout=5.0))
+    try:
+        await asyncio.sleep(1)
+        assert Path(tmpdir).joinpath('js', 'generated.js').exists()
+        client = RestAPIExampleAsyncInterface.ClientEndpointMapping()[f'http://localhost:{PORT}/']
+        responses = await asyncio.gather(*[client.api_get_basic(param1=n, param2=True, param3=1.0)
+                                           for n in range(20)])
+        assert responses == ["Response to test_api_basic 1.0 2"] * 20
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+    assert app._workers == []
+
+
+@pytest.mark.asyncio
+async def test_workers_restarted(tmpdir):
+    from class_rest_get import RestAPIExampleAsyncInterface
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    task = asyncio.create_task(app.start(host='localhost', port=PORT, modules=['class_rest_get'], workers=2,
+                                         reuse_port=True, shutdown_timeout=5.0))
+    try:
+        await asyncio.wait_for(_wait_for_workers(app, 2), 5)
+        dead = app._workers[0]
+        os.kill(dead.pid, signal.SIGKILL)
+        await asyncio.sleep(2 * WebApplication.WORKER_SUPERVISION_INTERVAL + 0.5)
+        await asyncio.wait_for(_wait_for_workers(app, 2), 5)
+        assert dead not in app._workers
+        await asyncio.sleep(0.5)
+        client = RestAPIExampleAsyncInterface.ClientEndpointMapping()[f'http://localhost:{PORT}/']
+        assert await client.api_get_basic(param1=1, param2=True, param3=1.0) == "Response to test_api_basic 1.0 2"
+        await app.shutdown()
+        await asyncio.wait_for(task, 10)
+    finally:
+        task.cancel()
+        with suppress(CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_workers_reuse_port_with_path(tmpdir):
+    app = WebApplication(static_path=Path(tmpdir), js_bundle_name='generated', using_async=False)
+    with pytest.raises(ValueError):
+        await app.start(path=str(Path(tmpdir) / 'sock'), modules=['class_rest_get'], workers=2, reuse_port=True)